@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import AnyHttpUrl, validator
 from pydantic_settings import BaseSettings
 
@@ -17,6 +17,63 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     ALGORITHM: str = os.getenv("ALGORITHM")
     ENCRYPTION_KEY: str = os.getenv("ENCRYPTION_KEY")
+    # Modo assíncrono opcional (AsyncEngine): aiosqlite para SQLite, asyncpg para PostgreSQL
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false")
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    # Pool de conexões (PostgreSQL/MySQL e SQLite em arquivo)
+    DB_POOL_SIZE: int = os.getenv("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW: int = os.getenv("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT: int = os.getenv("DB_POOL_TIMEOUT", 30)
+    DB_POOL_RECYCLE: int = os.getenv("DB_POOL_RECYCLE", 1800)
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true")
+    # PRAGMAs aplicados a cada conexão SQLite
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = os.getenv("SQLITE_MMAP_SIZE", 268435456)
+    SQLITE_CACHE_SIZE: int = os.getenv("SQLITE_CACHE_SIZE", -64000)
+    SQLITE_BUSY_TIMEOUT: int = os.getenv("SQLITE_BUSY_TIMEOUT", 5000)
+    # Cache dos usuários autenticados (evita uma consulta ao banco por requisição)
+    AUTH_CACHE_TTL_SECONDS: int = os.getenv("AUTH_CACHE_TTL_SECONDS", 60)
+    AUTH_CACHE_MAX_SIZE: int = os.getenv("AUTH_CACHE_MAX_SIZE", 1024)
+    # Inclui nome/email no token e dispensa a consulta do usuário na validação
+    JWT_EMBED_USER_CLAIMS: bool = os.getenv("JWT_EMBED_USER_CLAIMS", "false")
+    # Custo do bcrypt; hashes com outro custo são refeitos no próximo login
+    BCRYPT_ROUNDS: int = os.getenv("BCRYPT_ROUNDS", 12)
+    # Processos dedicados ao bcrypt (0 = pool de threads)
+    PASSWORD_HASH_WORKERS: int = os.getenv("PASSWORD_HASH_WORKERS", 2)
+    # Logins simultâneos por worker e tempo máximo de espera na fila (segundos)
+    LOGIN_MAX_CONCURRENCY: int = os.getenv("LOGIN_MAX_CONCURRENCY", 4)
+    LOGIN_QUEUE_TIMEOUT: float = os.getenv("LOGIN_QUEUE_TIMEOUT", 10)
+    # Catálogo de produtos em memória (0 desativa) e conferência da versão
+    # gravada por outros workers (versoes_tabelas)
+    CATALOG_CACHE_TTL_SECONDS: int = os.getenv("CATALOG_CACHE_TTL_SECONDS", 300)
+    CATALOG_CROSS_WORKER_INVALIDATION: bool = os.getenv("CATALOG_CROSS_WORKER_INVALIDATION", "true")
+    CATALOG_VERSION_CHECK_SECONDS: float = os.getenv("CATALOG_VERSION_CHECK_SECONDS", 1)
+    # GET /sync: recuo aplicado ao token e por quanto tempo as exclusões são guardadas
+    SYNC_OVERLAP_SECONDS: int = os.getenv("SYNC_OVERLAP_SECONDS", 5)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+    # Linhas por página do GET /sync (estado completo ou delta, continuado por `cursor`)
+    SYNC_PAGE_SIZE: int = os.getenv("SYNC_PAGE_SIZE", 500)
+    # Índice da busca textual: auto (pelo banco), fts5, trigram ou like
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "auto")
+    # Linhas lidas do banco por lote nas exportações (GET /exports)
+    EXPORT_BATCH_SIZE: int = os.getenv("EXPORT_BATCH_SIZE", 2000)
+    # Importação de CSV: linhas por transação e limite de linhas com erro no relatório
+    IMPORT_CHUNK_SIZE: int = os.getenv("IMPORT_CHUNK_SIZE", 5000)
+    IMPORT_MAX_REPORTED_ERRORS: int = os.getenv("IMPORT_MAX_REPORTED_ERRORS", 1000)
+    # Projeção do caixa: dias até receber uma venda a prazo, dia do mês em que
+    # o salário do mês anterior é pago e validade do cache (por dia e versão)
+    CASHFLOW_RECEIVABLE_DAYS: int = os.getenv("CASHFLOW_RECEIVABLE_DAYS", 30)
+    CASHFLOW_PAYDAY: int = os.getenv("CASHFLOW_PAYDAY", 5)
+    CASHFLOW_CACHE_TTL_SECONDS: int = os.getenv("CASHFLOW_CACHE_TTL_SECONDS", 3600)
+    # Tarefas agendadas: intervalo entre verificações e prazo da concessão de
+    # uma tarefa exclusiva (se o worker cair, outro assume depois do prazo)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true")
+    SCHEDULER_TICK_SECONDS: float = os.getenv("SCHEDULER_TICK_SECONDS", 30)
+    SCHEDULER_LEASE_SECONDS: int = os.getenv("SCHEDULER_LEASE_SECONDS", 600)
+    # Curva ABC (GET /reports/products): % acumulado do faturamento que fecha as classes A e B
+    ABC_CLASS_A_PERCENT: float = os.getenv("ABC_CLASS_A_PERCENT", 80)
+    ABC_CLASS_B_PERCENT: float = os.getenv("ABC_CLASS_B_PERCENT", 95)
 
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
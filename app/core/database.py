@@ -1,16 +1,18 @@
+import functools
+import inspect
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.pool import engine_options, instrument
 
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+instrument(engine, SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -21,3 +23,69 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_URL = settings.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_URL, **engine_options(ASYNC_URL, use_async=True))
+    instrument(async_engine.sync_engine, ASYNC_URL)
+    # expire_on_commit=False: a resposta é serializada depois do commit,
+    # fora do contexto assíncrono, e não pode disparar lazy loads.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class DbRunner:
+    # Executa código síncrono de sessão (consultas ORM, services) sem prender
+    # o event loop: no modo DB_ASYNC via AsyncSession.run_sync, que aguarda o
+    # banco de forma assíncrona; senão no threadpool, como as rotas `def`.
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        if AsyncSessionLocal is not None:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+async def get_db_runner():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield DbRunner(session)
+    else:
+        db = SessionLocal()
+        try:
+            yield DbRunner(db)
+        finally:
+            db.close()
+
+
+def async_db_route(fn):
+    # Transforma uma rota `def rota(..., db: Session = Depends(get_db))` em
+    # `async def` que recebe um DbRunner e executa o corpo original com ele.
+    signature = inspect.signature(fn)
+    parameters = [
+        param.replace(default=Depends(get_db_runner), annotation=DbRunner) if name == "db" else param
+        for name, param in signature.parameters.items()
+    ]
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        runner = kwargs.pop("db")
+        return await runner.run(lambda session: fn(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
@@ -0,0 +1,170 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from app.core.database import Base
+
+# Base.metadata.create_all cria tabelas novas com todas as colunas e índices
+# dos models, mas não altera tabelas que já existem. Cada migração leva um
+# banco antigo ao estado dos models; todas verificam o que já existe, então
+# rodam sem efeito em bancos recém-criados.
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("versao", Integer, primary_key=True, autoincrement=False),
+    Column("nome", String(100), nullable=False),
+    Column("aplicada_em", DateTime, nullable=False),
+)
+
+
+def add_column(conn: Connection, table: str, name: str, ddl: str) -> bool:
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if name in existing:
+        return False
+    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+    return True
+
+
+def create_indexes(conn: Connection, *names: str) -> None:
+    # Índices declarados nos models (__table_args__), pelo nome
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(bind=conn, checkfirst=True)
+
+
+def _sale_balances(conn: Connection) -> None:
+    added = [
+        add_column(conn, "vendas", "valor_pago_total", "DECIMAL(10, 2) NOT NULL DEFAULT 0"),
+        add_column(conn, "vendas", "saldo_aberto", "DECIMAL(10, 2) NOT NULL DEFAULT 0"),
+    ]
+    if any(added):
+        # SQL fixo (e não receivables.reconcile_statement): o model de hoje pode
+        # ter colunas que só migrações posteriores criam
+        pago = (
+            "(SELECT COALESCE(SUM(p.valor_pago), 0) FROM venda_pagamentos p"
+            " WHERE p.id_vendas = vendas.id_vendas)"
+        )
+        conn.execute(text(
+            f"UPDATE vendas SET valor_pago_total = {pago},"
+            f" saldo_aberto = COALESCE(valor_total, 0) - {pago}"
+        ))
+
+
+def _sale_idempotency_key(conn: Connection) -> None:
+    add_column(conn, "vendas", "chave_idempotencia", "VARCHAR(64)")
+    create_indexes(conn, "ux_vendas_chave_idempotencia")
+
+
+def _receivables_indexes(conn: Connection) -> None:
+    create_indexes(
+        conn,
+        "ix_vendas_cliente_status_data",
+        "ix_vendas_data_venda",
+        "ix_vendas_status_data",
+        "ix_venda_pagamentos_venda",
+        "ix_venda_pagamentos_data",
+        "ix_venda_itens_venda",
+        "ix_venda_itens_produto",
+        "ix_contas_pagar_vencimento",
+        "ix_contas_pagar_status_vencimento",
+        "ix_contas_pagar_itens_conta",
+        "ix_adiantamentos_funcionario_mes",
+    )
+
+
+def _table_versions(conn: Connection) -> None:
+    from app.services import versions
+
+    versions.seed(conn)
+
+
+SYNCED_TABLES = (
+    "categorias", "produtos", "clientes", "fornecedores",
+    "funcionarios", "adiantamentos", "contas_pagar", "vendas",
+)
+
+
+def _updated_at(conn: Connection) -> None:
+    agora = datetime.utcnow()
+    for table in SYNCED_TABLES:
+        if add_column(conn, table, "atualizado_em", "TIMESTAMP"):
+            conn.execute(text(f"UPDATE {table} SET atualizado_em = :agora"), {"agora": agora})
+    create_indexes(conn, *(f"ix_{table}_atualizado_em" for table in SYNCED_TABLES))
+
+
+def _name_search_keys(conn: Connection) -> None:
+    from app.core.text import search_key
+
+    for table, key in (("clientes", "id_cliente"), ("produtos", "id_produto")):
+        if add_column(conn, table, "nome_busca", "VARCHAR(100)"):
+            rows = conn.execute(text(f"SELECT {key}, nome FROM {table}")).all()
+            if rows:
+                conn.execute(
+                    text(f"UPDATE {table} SET nome_busca = :nome_busca WHERE {key} = :id"),
+                    [{"id": row[0], "nome_busca": search_key(row[1])} for row in rows],
+                )
+    create_indexes(conn, "ix_clientes_nome_busca", "ix_produtos_nome_busca")
+
+
+def _text_search(conn: Connection) -> None:
+    from app.services import search
+
+    # FTS5 + triggers no SQLite, índices pg_trgm no PostgreSQL (já populados)
+    search.install(conn)
+
+
+def _sales_rollups(conn: Connection) -> None:
+    from sqlalchemy.orm import Session
+    from app.services import rollups
+
+    # Tabelas criadas pelo create_all; preenche com o histórico de vendas
+    with Session(bind=conn) as db:
+        rollups.rebuild(db)
+        db.flush()
+
+
+def _advances_month_index(conn: Connection) -> None:
+    create_indexes(conn, "ix_adiantamentos_mes_funcionario")
+
+
+MIGRATIONS = [
+    (1, "saldo das vendas", _sale_balances),
+    (2, "chave de idempotência das vendas", _sale_idempotency_key),
+    (3, "índices de recebíveis", _receivables_indexes),
+    (4, "versões das tabelas", _table_versions),
+    (5, "versões de clientes, fornecedores, funcionários e vendas", _table_versions),
+    (6, "data de alteração para sincronização", _updated_at),
+    (7, "chave de busca por nome", _name_search_keys),
+    (8, "índice de busca textual", _text_search),
+    (9, "versões de contas a pagar e adiantamentos", _table_versions),
+    (10, "resumos de vendas", _sales_rollups),
+    (11, "índice de adiantamentos por mês", _advances_month_index),
+]
+
+
+def applied_versions(engine: Engine) -> set:
+    metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.versao)).scalars())
+
+
+def run_migrations(engine: Engine) -> list:
+    # Aplica as migrações pendentes, cada uma em sua transação
+    done = applied_versions(engine)
+    applied = []
+    for versao, nome, migrate in MIGRATIONS:
+        if versao in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(versao=versao, nome=nome, aplicada_em=datetime.utcnow()))
+        except IntegrityError:
+            # Outro worker registrou a mesma versão ao mesmo tempo
+            continue
+        applied.append((versao, nome))
+    return applied
@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+# bcrypt é CPU-bound: rodar no processo da API disputa o GIL com as demais rotas.
+# O hash/verificação vai para um pool de processos limitado (PASSWORD_HASH_WORKERS);
+# com 0 usa um pool de threads do mesmo tamanho de LOGIN_MAX_CONCURRENCY.
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    # min = max = padrão: hashes com outro custo são marcados para atualização
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    if not hashed:
+        return False, None
+    return _context(rounds).verify_and_update(password, hashed)
+
+pwd_context = _context(settings.BCRYPT_ROUNDS)
+
+_executor: Optional[Executor] = None
+
+def executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_WORKERS > 0:
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.LOGIN_MAX_CONCURRENCY, thread_name_prefix="bcrypt"
+            )
+    return _executor
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        # Sem cancel_futures (só existe a partir do Python 3.9): os poucos
+        # hashes na fila terminam em segundo plano
+        _executor.shutdown(wait=False)
+        _executor = None
+
+# Versões síncronas (rotas def): a thread só espera, o cálculo roda no pool
+def hash_password_sync(password: str) -> str:
+    return executor().submit(_hash, password, settings.BCRYPT_ROUNDS).result()
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    return executor().submit(_verify_and_update, password, hashed, settings.BCRYPT_ROUNDS).result()[0]
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), _hash, password, settings.BCRYPT_ROUNDS)
+
+# Retorna (senha confere, novo hash se o custo mudou)
+async def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor(), _verify_and_update, password, hashed, settings.BCRYPT_ROUNDS
+    )
+
+_login_slots: Optional[asyncio.Semaphore] = None
+
+@asynccontextmanager
+async def login_slot():
+    # Limita os logins simultâneos; quem esperar mais que LOGIN_QUEUE_TIMEOUT recebe 429
+    global _login_slots
+    if _login_slots is None:
+        _login_slots = asyncio.Semaphore(settings.LOGIN_MAX_CONCURRENCY)
+    try:
+        await asyncio.wait_for(_login_slots.acquire(), timeout=settings.LOGIN_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        _login_slots.release()
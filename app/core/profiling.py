@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Engine):
+    # Conta quantos comandos SQL o engine enviou ao banco dentro do bloco
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, maximum: int):
+    # Falha se o bloco executar mais do que `maximum` comandos SQL
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > maximum:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(f"{counter.count} queries executadas (máximo {maximum}):\n{statements}")
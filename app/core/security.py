@@ -1,38 +1,72 @@
+import time
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Union
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core import passwords
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import DbRunner, get_db_runner
 from app.models import user as user_model
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = passwords.pwd_context
 
 ALGORITHM = settings.ALGORITHM
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+# Usuários já validados, por (sub, token); a validade nunca passa do "exp" do token
+principal_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+def create_access_token(
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[dict] = None
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_password_sync(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return passwords.hash_password_sync(password)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login/access-token")
 
+def user_claims(user: user_model.User) -> dict:
+    if not settings.JWT_EMBED_USER_CLAIMS:
+        return {}
+    return {"nome": user.nome, "email": user.email}
+
+# Cópia desanexada da sessão (sem a senha), segura para reaproveitar entre requisições
+def _principal(user_id: int, nome: str, email: Optional[str]) -> user_model.User:
+    return user_model.User(id_usuario=user_id, nome=nome, email=email)
+
+def _load_user(db: Session, user_id: int):
+    user = db.query(user_model.User).filter(user_model.User.id_usuario == user_id).first()
+    if user is None:
+        return None
+    return _principal(user.id_usuario, user.nome, user.email)
+
+def invalidate_user(user_id: Any) -> int:
+    sub = str(user_id)
+    return principal_cache.delete_where(lambda key: key[0] == sub)
+
+@event.listens_for(user_model.User, "after_update")
+@event.listens_for(user_model.User, "after_delete")
+def _user_changed(mapper, connection, target) -> None:
+    invalidate_user(target.id_usuario)
+
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: DbRunner = Depends(get_db_runner), token: str = Depends(oauth2_scheme)
 ) -> user_model.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,7 +80,15 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(user_model.User).filter(user_model.User.id_usuario == int(user_id)).first()
+    cache_key = (user_id, token)
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
+    if settings.JWT_EMBED_USER_CLAIMS and "nome" in payload:
+        user = _principal(int(user_id), payload["nome"], payload.get("email"))
+    else:
+        user = await db.run(_load_user, int(user_id))
     if user is None:
         raise credentials_exception
+    principal_cache.set(cache_key, user, ttl=payload.get("exp", 0) - time.time())
     return user
@@ -0,0 +1,35 @@
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+# Chave de busca por nome: sem acentos, minúscula e com espaços simples.
+# Gravada em nome_busca (clientes, produtos) e comparada por faixa de prefixo,
+# o que usa o índice comum em qualquer banco.
+
+
+@lru_cache(maxsize=None)
+def _combining_marks() -> dict:
+    # Tabela para str.translate que remove os acentos (montada uma vez)
+    return {cp: None for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))}
+
+
+def search_key(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).translate(_combining_marks())
+    return " ".join(text.casefold().split())
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    # Toda chave que começa com `prefix` fica em [prefix, limite), com o último
+    # caractere incrementado ("caf" -> "cag"). Não depende de U+FFFF ordenar
+    # depois de tudo, o que a collation do PostgreSQL não garante.
+    for i in range(len(prefix) - 1, -1, -1):
+        code = ord(prefix[i]) + 1
+        if code <= sys.maxunicode:
+            # Pula os substitutos (surrogates), que não são caracteres válidos
+            return prefix[:i] + chr(0xE000 if 0xD800 <= code <= 0xDFFF else code)
+    # Prefixo vazio: qualquer chave comum
+    return "\uffff"
@@ -3,12 +3,18 @@ from fastapi.responses import RedirectResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
+from app.core import passwords
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.routers import users, auth, clients, products, finance, sales
+from app.routers import users, auth, clients, products, finance, sales, admin, sync, search, exports, imports, reports
+from app.core.migrations import run_migrations
+from app.services import pagination
+from app.services.scheduler import scheduler
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+# Colunas e índices novos em bancos já existentes
+run_migrations(engine)
 
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
@@ -41,6 +47,17 @@ app = FastAPI(
 def startup_event():
     ensure_default_client()
 
+@app.on_event("startup")
+async def start_scheduler():
+    # Tarefas periódicas (contas atrasadas, agregados do dia, limpeza de caches)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await scheduler.stop()
+    passwords.shutdown()
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -49,6 +66,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[pagination.NEXT_CURSOR_HEADER, pagination.TOTAL_COUNT_HEADER, "ETag", "Last-Modified", "Content-Disposition"],
     )
 
 app.include_router(auth.router, prefix=f"/login", tags=["login"])
@@ -57,6 +75,12 @@ app.include_router(clients.router, prefix=f"/clients", tags=["clients"])
 app.include_router(products.router, prefix=f"/products", tags=["products"])
 app.include_router(finance.router, prefix=f"/finance", tags=["finance"])
 app.include_router(sales.router, prefix=f"/sales", tags=["sales"])
+app.include_router(admin.router, prefix=f"/admin", tags=["admin"])
+app.include_router(sync.router, prefix=f"/sync", tags=["sync"])
+app.include_router(search.router, prefix=f"/search", tags=["search"])
+app.include_router(exports.router, prefix=f"/exports", tags=["exports"])
+app.include_router(imports.router, prefix=f"/imports", tags=["imports"])
+app.include_router(reports.router, prefix=f"/reports", tags=["reports"])
 
 
 # Serve arquivos estáticos da pasta `templates` em /templates
@@ -1,5 +1,8 @@
 from .user import User
 from .client import Client
 from .product import Product, Category
-from .finance import Supplier, Employee, Advance, AccountsPayable, AccountsPayableItem
+from .finance import Supplier, Employee, Advance, AccountsPayable, AccountsPayableItem, StatusConta, TipoAdiantamento
 from .sales import Sale, SaleItem, SalePayment, StatusPagamento, FormaPagamento
+from .version import TableVersion, Tombstone
+from .job import ScheduledJob
+from .rollup import DailyPaymentRollup, DailyProductRollup, MonthlyClientRollup
@@ -1,12 +1,28 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, TIMESTAMP, func
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, DECIMAL, TIMESTAMP, Index, func
+from sqlalchemy.orm import validates
 from app.core.database import Base
+from app.core.text import search_key
 
 class Client(Base):
     __tablename__ = "clientes"
 
     id_cliente = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nome = Column(String(100), nullable=False)
+    # Nome sem acentos/minúsculo para busca por prefixo (inserts Core usam o default)
+    nome_busca = Column(String(100), default=lambda ctx: search_key(ctx.get_current_parameters().get("nome")))
     telefone = Column(String(20))
     email = Column(String(255))
     limite_credito = Column(DECIMAL(10, 2), default=0.00)
     data_cadastro = Column(TIMESTAMP, server_default=func.now())
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_clientes_atualizado_em", "atualizado_em"),
+        Index("ix_clientes_nome_busca", "nome_busca"),
+    )
+
+    @validates("nome")
+    def _set_nome_busca(self, key, value):
+        self.nome_busca = search_key(value)
+        return value
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey, DATE, TIMESTAMP, Enum, func
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, DECIMAL, ForeignKey, DATE, TIMESTAMP, Enum, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -22,9 +23,14 @@ class Supplier(Base):
     nome = Column(String(100), nullable=False)
     telefone = Column(String(20))
     contato = Column(String(50))
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     contas_pagar = relationship("AccountsPayable", back_populates="fornecedor")
 
+    __table_args__ = (
+        Index("ix_fornecedores_atualizado_em", "atualizado_em"),
+    )
+
 class Employee(Base):
     __tablename__ = "funcionarios"
 
@@ -33,9 +39,14 @@ class Employee(Base):
     telefone = Column(String(20))
     salario = Column(DECIMAL(10, 2), nullable=False)
     data_admissao = Column(DATE)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     adiantamentos = relationship("Advance", back_populates="funcionario")
 
+    __table_args__ = (
+        Index("ix_funcionarios_atualizado_em", "atualizado_em"),
+    )
+
 class Advance(Base):
     __tablename__ = "adiantamentos"
 
@@ -45,9 +56,17 @@ class Advance(Base):
     valor = Column(DECIMAL(10, 2), nullable=False)
     data_registro = Column(TIMESTAMP, server_default=func.now())
     mes_referencia = Column(String(7))
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     funcionario = relationship("Employee", back_populates="adiantamentos")
 
+    __table_args__ = (
+        Index("ix_adiantamentos_funcionario_mes", "id_funcionario", "mes_referencia"),
+        # Resumo por mês de referência (GET /finance/advances/summary)
+        Index("ix_adiantamentos_mes_funcionario", "mes_referencia", "id_funcionario"),
+        Index("ix_adiantamentos_atualizado_em", "atualizado_em"),
+    )
+
 class AccountsPayable(Base):
     __tablename__ = "contas_pagar"
 
@@ -57,10 +76,18 @@ class AccountsPayable(Base):
     data_vencimento = Column(DATE, nullable=False)
     valor_total_nota = Column(DECIMAL(10, 2), nullable=False)
     status = Column(Enum(StatusConta), default=StatusConta.a_vencer)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     fornecedor = relationship("Supplier", back_populates="contas_pagar")
     itens = relationship("AccountsPayableItem", back_populates="conta_pagar")
 
+    __table_args__ = (
+        # Listagem paginada por vencimento e contas em aberto/atrasadas por data
+        Index("ix_contas_pagar_vencimento", "data_vencimento", "id_contas_pagar"),
+        Index("ix_contas_pagar_status_vencimento", "status", "data_vencimento"),
+        Index("ix_contas_pagar_atualizado_em", "atualizado_em"),
+    )
+
 class AccountsPayableItem(Base):
     __tablename__ = "contas_pagar_itens"
 
@@ -71,3 +98,7 @@ class AccountsPayableItem(Base):
     valor_unitario = Column(DECIMAL(10, 2))
 
     conta_pagar = relationship("AccountsPayable", back_populates="itens")
+
+    __table_args__ = (
+        Index("ix_contas_pagar_itens_conta", "id_contas_pagar"),
+    )
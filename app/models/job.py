@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from app.core.database import Base
+
+# Tarefas agendadas executadas por um único worker de cada vez: quem consegue
+# gravar o próprio nome em `dono` (com prazo em `expira_em`) executa a tarefa.
+class ScheduledJob(Base):
+    __tablename__ = "tarefas_agendadas"
+
+    nome = Column(String(50), primary_key=True)
+    dono = Column(String(100))
+    expira_em = Column(DateTime)
+    proxima_execucao = Column(DateTime)
+    ultima_execucao = Column(DateTime)
+    ultima_duracao_ms = Column(Float)
+    ultimo_status = Column(String(10))
+    ultimo_resultado = Column(String(500))
+    execucoes = Column(Integer, nullable=False, default=0, server_default="0")
+    falhas = Column(Integer, nullable=False, default=0, server_default="0")
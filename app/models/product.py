@@ -1,22 +1,42 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, DECIMAL, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from app.core.database import Base
+from app.core.text import search_key
 
 class Category(Base):
     __tablename__ = "categorias"
 
     id_categoria = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nome = Column(String(100), nullable=False)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     produtos = relationship("Product", back_populates="categoria")
 
+    __table_args__ = (
+        Index("ix_categorias_atualizado_em", "atualizado_em"),
+    )
+
 class Product(Base):
     __tablename__ = "produtos"
 
     id_produto = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nome = Column(String(100), nullable=False)
+    # Nome sem acentos/minúsculo para busca por prefixo (inserts Core usam o default)
+    nome_busca = Column(String(100), default=lambda ctx: search_key(ctx.get_current_parameters().get("nome")))
     id_categoria = Column(Integer, ForeignKey("categorias.id_categoria"))
     preco_custo = Column(DECIMAL(10, 2))
     preco_venda = Column(DECIMAL(10, 2), nullable=False)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     categoria = relationship("Category", back_populates="produtos")
+
+    __table_args__ = (
+        Index("ix_produtos_atualizado_em", "atualizado_em"),
+        Index("ix_produtos_nome_busca", "nome_busca"),
+    )
+
+    @validates("nome")
+    def _set_nome_busca(self, key, value):
+        self.nome_busca = search_key(value)
+        return value
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, DECIMAL, Integer, String
+from app.core.database import Base
+
+# Resumos das vendas mantidos a cada venda/pagamento gravado (ver
+# app.services.rollups). Dia 'YYYY-MM-DD' e mês 'YYYY-MM' como em period_bucket.
+
+# Recebimentos por dia e forma de pagamento ('' quando a forma não foi informada)
+class DailyPaymentRollup(Base):
+    __tablename__ = "resumo_dia_forma"
+
+    dia = Column(String(10), primary_key=True)
+    forma_pagamento = Column(String(20), primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+# Itens vendidos por dia da venda e produto
+class DailyProductRollup(Base):
+    __tablename__ = "resumo_dia_produto"
+
+    dia = Column(String(10), primary_key=True)
+    id_produto = Column(Integer, primary_key=True)
+    itens = Column(Integer, nullable=False, default=0)
+    qtde = Column(DECIMAL(14, 2), nullable=False, default=0)
+    valor = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+# Vendas (pelo mês da venda) e recebimentos (pelo mês do pagamento) por cliente;
+# id_cliente 0 para vendas sem cliente
+class MonthlyClientRollup(Base):
+    __tablename__ = "resumo_mes_cliente"
+
+    mes = Column(String(7), primary_key=True)
+    id_cliente = Column(Integer, primary_key=True)
+    vendas = Column(Integer, nullable=False, default=0)
+    valor_total = Column(DECIMAL(14, 2), nullable=False, default=0)
+    valor_recebido = Column(DECIMAL(14, 2), nullable=False, default=0)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, DECIMAL, ForeignKey, TIMESTAMP, Enum, func, String
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, DECIMAL, ForeignKey, TIMESTAMP, Enum, func, String, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -23,10 +24,27 @@ class Sale(Base):
     status_pagamento = Column(Enum(StatusPagamento), default=StatusPagamento.pendente)
     forma_pagamento = Column(Enum(FormaPagamento), nullable=True) # Pode ser null se pendente? Schema doesn't say NOT NULL
     valor_total = Column(DECIMAL(10, 2))
+    # Mantidos a cada pagamento registrado/removido (ver app.services.receivables)
+    valor_pago_total = Column(DECIMAL(10, 2), nullable=False, default=0, server_default="0")
+    saldo_aberto = Column(DECIMAL(10, 2), nullable=False, default=0, server_default="0")
+    # Chave enviada pelo PDV ao reenviar vendas offline (POST /sales/batch)
+    chave_idempotencia = Column(String(64), nullable=True)
+    # Alterada também quando itens/pagamentos mudam (GET /sync, ver app.services.sync)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     itens = relationship("SaleItem", back_populates="venda")
     pagamentos = relationship("SalePayment", back_populates="venda")
 
+    __table_args__ = (
+        Index("ux_vendas_chave_idempotencia", "chave_idempotencia", unique=True),
+        # Saldo por cliente e baixa FIFO: id_cliente = ? AND status <> 'Pago' ORDER BY data_venda
+        Index("ix_vendas_cliente_status_data", "id_cliente", "status_pagamento", "data_venda"),
+        # Resumo/relatórios por período e recebíveis em aberto por data
+        Index("ix_vendas_data_venda", "data_venda"),
+        Index("ix_vendas_status_data", "status_pagamento", "data_venda"),
+        Index("ix_vendas_atualizado_em", "atualizado_em"),
+    )
+
 class SalePayment(Base):
     __tablename__ = "venda_pagamentos"
 
@@ -40,6 +58,11 @@ class SalePayment(Base):
     venda = relationship("Sale", back_populates="pagamentos")
     # Add relationship to client if needed later, but Client model wasn't updated with back_populates yet.
 
+    __table_args__ = (
+        Index("ix_venda_pagamentos_venda", "id_vendas"),
+        Index("ix_venda_pagamentos_data", "data_pagamento"),
+    )
+
 class SaleItem(Base):
     __tablename__ = "venda_itens"
 
@@ -53,3 +76,8 @@ class SaleItem(Base):
     venda = relationship("Sale", back_populates="itens")
     # Product relationship
     produto = relationship("app.models.product.Product")
+
+    __table_args__ = (
+        Index("ix_venda_itens_venda", "id_vendas"),
+        Index("ix_venda_itens_produto", "id_produto"),
+    )
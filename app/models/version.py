@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from app.core.database import Base
+
+# Contador de alterações por tabela: cada commit que altera a tabela soma 1.
+# Compartilhado entre workers, serve para invalidar caches e gerar ETags.
+class TableVersion(Base):
+    __tablename__ = "versoes_tabelas"
+
+    tabela = Column(String(50), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0, server_default="0")
+    atualizado_em = Column(DateTime)
+
+# Registro das exclusões, para que GET /sync informe o que o cliente deve remover
+class Tombstone(Base):
+    __tablename__ = "exclusoes"
+
+    id_exclusao = Column(Integer, primary_key=True, autoincrement=True)
+    tabela = Column(String(50), nullable=False)
+    id_registro = Column(Integer, nullable=False)
+    excluido_em = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_exclusoes_excluido_em", "excluido_em"),
+    )
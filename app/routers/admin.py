@@ -0,0 +1,48 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core import database, security
+from app.core.database import get_db
+from app.core.pool import pool_metrics
+from app.services import cashflow, catalog
+from app.services.scheduler import JobNotRegistered, scheduler
+
+router = APIRouter(dependencies=[Depends(security.get_current_user)])
+
+@router.get("/pool")
+def read_pool_metrics() -> Any:
+    engine = database.async_engine.sync_engine if database.async_engine is not None else database.engine
+    return {
+        "dialect": engine.dialect.name,
+        "async": database.async_engine is not None,
+        **pool_metrics.snapshot(engine.pool),
+    }
+
+@router.post("/pool/reset")
+def reset_pool_metrics() -> Any:
+    pool_metrics.reset()
+    return {"message": "Pool metrics reset"}
+
+@router.get("/caches")
+def read_cache_stats() -> Any:
+    return {
+        "principals": security.principal_cache.stats(),
+        "catalog": catalog.catalog_cache.stats(),
+        "cashflow": cashflow.cache.stats(),
+    }
+
+@router.get("/jobs")
+def read_jobs(db: Session = Depends(get_db)) -> Any:
+    return scheduler.status(db)
+
+@router.post("/jobs/{nome}/run")
+def run_job(nome: str) -> Any:
+    if nome not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        run = scheduler.run(nome, force=True)
+    except JobNotRegistered:
+        raise HTTPException(status_code=503, detail="Job is not registered in tarefas_agendadas")
+    if run is None:
+        raise HTTPException(status_code=409, detail="Job is running on another worker")
+    return run
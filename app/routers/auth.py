@@ -6,26 +6,43 @@ from sqlalchemy.orm import Session
 
 from app.models import user as user_model
 from app import schemas
-from app.core import security
+from app.core import passwords, security
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import DbRunner, get_db_runner
 
 router = APIRouter()
 
+def _find_user(db: Session, email: str):
+    return db.query(user_model.User).filter(user_model.User.email == email).first()
+
+def _store_password_hash(db: Session, user_id: int, senha: str) -> None:
+    db.query(user_model.User).filter(user_model.User.id_usuario == user_id).update(
+        {"senha": senha}, synchronize_session=False
+    )
+    db.commit()
+
 @router.post("/access-token", response_model=dict)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: DbRunner = Depends(get_db_runner), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = db.query(user_model.User).filter(user_model.User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.senha):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-        )
+    async with passwords.login_slot():
+        user = await db.run(_find_user, form_data.username)
+        valid, new_hash = False, None
+        if user:
+            valid, new_hash = await passwords.verify_and_update(form_data.password, user.senha)
+        if not valid:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect email or password",
+            )
+        user_id, claims = user.id_usuario, security.user_claims(user)
+        if new_hash:
+            # Custo do bcrypt mudou (BCRYPT_ROUNDS): regrava o hash com a senha já validada
+            await db.run(_store_password_hash, user_id, new_hash)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id_usuario, expires_delta=access_token_expires
+            user_id, expires_delta=access_token_expires, claims=claims
         ),
         "token_type": "bearer",
     }
@@ -1,37 +1,37 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import async_db_route, get_db
+from app.services import etags, pagination, receivables
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Client])
+@async_db_route
 def read_clients(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    nome: Optional[str] = None,
+    com_debito: Optional[bool] = None,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    clients = db.query(models.Client).offset(skip).limit(limit).all()
-    
-    # Calcular saldo devedor para cada cliente
+    # O saldo devedor vem das vendas: o ETag muda com clientes ou vendas
+    cached = etags.conditional(db, request, page.response, "clientes", "vendas")
+    if cached:
+        return cached
+    query = receivables.filter_clients(db.query(models.Client), nome=nome, com_debito=com_debito)
+    clients = page.apply(query, (models.Client.id_cliente,))
+
+    # Calcular saldo devedor da página inteira em uma única consulta agregada
+    balances = receivables.get_client_balances(db, [c.id_cliente for c in clients])
     for client in clients:
-        # Busca apenas as vendas que NÃO estão pagas
-        sales = db.query(models.Sale).filter(
-            models.Sale.id_cliente == client.id_cliente,
-            models.Sale.status_pagamento != models.StatusPagamento.pago
-        ).all()
-        
-        total_debt = 0
-        for sale in sales:
-            total_paid = sum([p.valor_pago for p in sale.pagamentos])
-            total_debt += (sale.valor_total - total_paid)
-            
-        client.saldo_devedor = total_debt
-        
+        client.saldo_devedor = balances.get(client.id_cliente, receivables.money(0))
+
     return clients
 
 @router.post("/", response_model=schemas.Client)
+@async_db_route
 def create_client(
     *,
     db: Session = Depends(get_db),
@@ -44,6 +44,7 @@ def create_client(
     return client
 
 @router.put("/{client_id}", response_model=schemas.Client)
+@async_db_route
 def update_client(
     *,
     db: Session = Depends(get_db),
@@ -64,6 +65,7 @@ def update_client(
     return client
 
 @router.delete("/{client_id}")
+@async_db_route
 def delete_client(
     *,
     db: Session = Depends(get_db),
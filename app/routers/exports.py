@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.core import security
+from app.services import exports
+
+router = APIRouter(dependencies=[Depends(security.get_current_user)])
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def _download(content, media_type: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        content, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/{dataset}.csv")
+def export_csv(
+    dataset: Literal["vendas", "venda_itens", "venda_pagamentos", "contas_pagar", "contas_pagar_itens", "adiantamentos"],
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> StreamingResponse:
+    return _download(
+        exports.stream_csv(dataset, data_inicio, data_fim),
+        "text/csv; charset=utf-8",
+        exports.filename(dataset, "csv", data_inicio, data_fim),
+    )
+
+@router.get("/{workbook}.xlsx")
+def export_xlsx(
+    workbook: Literal["vendas", "contas_pagar", "adiantamentos"],
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> StreamingResponse:
+    # vendas: abas de vendas, itens e pagamentos; contas_pagar: contas e itens
+    return _download(
+        exports.stream_xlsx(workbook, data_inicio, data_fim),
+        XLSX_MEDIA_TYPE,
+        exports.filename(workbook, "xlsx", data_inicio, data_fim),
+    )
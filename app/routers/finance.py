@@ -1,11 +1,16 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.core.database import get_db
+from app.services import cashflow, etags, loading, pagination, payroll
 
 router = APIRouter()
 
+MES = r"^\d{4}-(0[1-9]|1[0-2])$"
+
 # Suppliers
 @router.post("/suppliers/", response_model=schemas.Supplier)
 def create_supplier(
@@ -21,11 +26,14 @@ def create_supplier(
 
 @router.get("/suppliers/", response_model=List[schemas.Supplier])
 def read_suppliers(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    suppliers = db.query(models.Supplier).offset(skip).limit(limit).all()
+    cached = etags.conditional(db, request, page.response, "fornecedores")
+    if cached:
+        return cached
+    suppliers = page.apply(db.query(models.Supplier), (models.Supplier.id_fornecedor,))
     return suppliers
 
 @router.put("/suppliers/{supplier_id}", response_model=schemas.Supplier)
@@ -77,11 +85,14 @@ def create_employee(
 
 @router.get("/employees/", response_model=List[schemas.Employee])
 def read_employees(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    employees = db.query(models.Employee).offset(skip).limit(limit).all()
+    cached = etags.conditional(db, request, page.response, "funcionarios")
+    if cached:
+        return cached
+    employees = page.apply(db.query(models.Employee), (models.Employee.id_funcionario,))
     return employees
 
 @router.put("/employees/{employee_id}", response_model=schemas.Employee)
@@ -133,13 +144,32 @@ def create_advance(
 
 @router.get("/advances/", response_model=List[schemas.Advance])
 def read_advances(
-    skip: int = 0,
-    limit: int = 100,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    advances = db.query(models.Advance).offset(skip).limit(limit).all()
+    query = loading.load_for(db.query(models.Advance), schemas.Advance)
+    advances = page.apply(query, (models.Advance.id_lancamento,))
     return advances
 
+@router.get("/advances/summary", response_model=schemas.AdvancesSummary)
+def read_advances_summary(
+    mes_referencia: Optional[str] = Query(None, pattern=MES),
+    mes_inicio: Optional[str] = Query(None, pattern=MES),
+    mes_fim: Optional[str] = Query(None, pattern=MES),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Um mês (mes_referencia, padrão: o mês atual) ou o intervalo mes_inicio..mes_fim
+    if mes_referencia:
+        mes_inicio = mes_fim = mes_referencia
+    else:
+        mes_inicio = mes_inicio or mes_fim or date.today().strftime("%Y-%m")
+        mes_fim = mes_fim or mes_inicio
+    if mes_inicio > mes_fim:
+        raise HTTPException(status_code=400, detail="mes_inicio must not be after mes_fim")
+    if len(payroll.months(mes_inicio, mes_fim)) > payroll.MAX_MESES:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {payroll.MAX_MESES} months")
+    return payroll.advances_summary(db, mes_inicio, mes_fim)
+
 @router.put("/advances/{advance_id}", response_model=schemas.Advance)
 def update_advance(
     *,
@@ -204,20 +234,30 @@ def create_accounts_payable(
 
 @router.get("/accounts-payable/", response_model=List[schemas.AccountsPayable])
 def read_accounts_payable(
-    skip: int = 0,
-    limit: int = 100,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    accounts = db.query(models.AccountsPayable).offset(skip).limit(limit).all()
+    query = loading.load_for(db.query(models.AccountsPayable), schemas.AccountsPayable)
+    accounts = page.apply(
+        query,
+        (models.AccountsPayable.data_vencimento, models.AccountsPayable.id_contas_pagar),
+    )
     return accounts
 
+@router.get("/accounts-payable/aging", response_model=schemas.PayablesAging)
+def read_accounts_payable_aging(
+    db: Session = Depends(get_db),
+) -> Any:
+    return cashflow.payables_aging(db)
+
 @router.get("/accounts-payable/{ap_id}", response_model=schemas.AccountsPayable)
 def read_account_payable(
     *,
     db: Session = Depends(get_db),
     ap_id: int,
 ) -> Any:
-    account = db.query(models.AccountsPayable).filter(models.AccountsPayable.id_contas_pagar == ap_id).first()
+    query = loading.load_for(db.query(models.AccountsPayable), schemas.AccountsPayable)
+    account = query.filter(models.AccountsPayable.id_contas_pagar == ap_id).first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
@@ -240,6 +280,8 @@ def update_accounts_payable(
     
     # Refresh items: drop and recreate
     db.query(models.AccountsPayableItem).filter(models.AccountsPayableItem.id_contas_pagar == ap_id).delete()
+    # A exclusão em lote não passa pelos eventos do ORM: marca a conta como alterada para o /sync
+    db_account.atualizado_em = datetime.utcnow()
     
     if ap_in.itens:
         for item in ap_in.itens:
@@ -268,3 +310,12 @@ def delete_accounts_payable(
     db.delete(account)
     db.commit()
     return {"message": "Account deleted successfully"}
+
+# Cash flow
+@router.get("/cash-flow", response_model=schemas.CashFlowProjection)
+def read_cash_flow(
+    dias: int = Query(30, ge=1, le=366),
+    saldo_inicial: Decimal = Decimal(0),
+    db: Session = Depends(get_db),
+) -> Any:
+    return cashflow.cash_flow(db, dias=dias, saldo_inicial=saldo_inicial)
@@ -0,0 +1,19 @@
+from typing import Any, Literal
+from fastapi import APIRouter, Depends, File, UploadFile
+from sqlalchemy.orm import Session
+from app.core import security
+from app.core.database import async_db_route, get_db
+from app.services import imports
+
+router = APIRouter(dependencies=[Depends(security.get_current_user)])
+
+@router.post("/{entidade}")
+@async_db_route
+def import_csv(
+    entidade: Literal["produtos", "clientes", "fornecedores"],
+    arquivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+) -> Any:
+    # CSV com cabeçalho (nomes dos campos do cadastro; produtos aceitam `categoria`
+    # pelo nome). Linhas com id atualizam; sem id, casam pelo nome ou são criadas.
+    return imports.import_csv(db, entidade, imports.text_stream(arquivo.file))
@@ -1,8 +1,9 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.core.database import get_db
+from app.services import catalog, etags, pagination
 
 router = APIRouter()
 
@@ -21,11 +22,15 @@ def create_category(
 
 @router.get("/categories/", response_model=List[schemas.Category])
 def read_categories(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    categories = db.query(models.Category).offset(skip).limit(limit).all()
+    current = catalog.catalog_cache.get(db)
+    cached = etags.not_modified(request, page.response, catalog.etag(current))
+    if cached:
+        return cached
+    categories = page.apply_sorted(current.category_rows, (models.Category.id_categoria,))
     return categories
 
 # Products
@@ -44,11 +49,20 @@ def create_product(
 
 @router.get("/", response_model=List[schemas.Product])
 def read_products(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    nome: Optional[str] = None,
+    id_categoria: Optional[int] = None,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    products = db.query(models.Product).offset(skip).limit(limit).all()
+    # Lista servida do catálogo em memória; 304 se o cliente já tem esta versão.
+    # `nome` filtra por prefixo sem diferenciar acentos/maiúsculas.
+    current = catalog.catalog_cache.get(db)
+    cached = etags.not_modified(request, page.response, catalog.etag(current))
+    if cached:
+        return cached
+    rows = current.find_products(nome=nome, id_categoria=id_categoria)
+    products = page.apply_sorted(rows, (models.Product.id_produto,))
     return products
 
 @router.put("/{product_id}", response_model=schemas.Product)
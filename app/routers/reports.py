@@ -0,0 +1,67 @@
+from datetime import date
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app import schemas
+from app.core.database import async_db_route, get_db
+from app.services import product_analytics, rollups
+
+router = APIRouter()
+
+MES = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+@router.get("/receipts", response_model=schemas.ReceiptsReport)
+@async_db_route
+def read_receipts(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    agrupamento: Literal["dia", "mes"] = "dia",
+    db: Session = Depends(get_db),
+) -> Any:
+    # Recebimentos por forma de pagamento e por dia/mês do pagamento
+    return rollups.receipts(db, data_inicio, data_fim, agrupamento)
+
+@router.get("/monthly", response_model=List[schemas.MonthlyRevenue])
+@async_db_route
+def read_monthly_revenue(
+    mes_inicio: Optional[str] = Query(None, pattern=MES),
+    mes_fim: Optional[str] = Query(None, pattern=MES),
+    db: Session = Depends(get_db),
+) -> Any:
+    return rollups.monthly_revenue(db, mes_inicio, mes_fim)
+
+@router.get("/clients", response_model=List[schemas.ClientRevenue])
+@async_db_route
+def read_top_clients(
+    mes_inicio: Optional[str] = Query(None, pattern=MES),
+    mes_fim: Optional[str] = Query(None, pattern=MES),
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Clientes que mais compraram no período (meses da venda)
+    return rollups.top_clients(db, mes_inicio, mes_fim, limit)
+
+@router.get("/top-products", response_model=List[schemas.ProductRanking])
+@async_db_route
+def read_top_products(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Produtos mais vendidos (valor) no período
+    return rollups.top_products(db, data_inicio, data_fim, limit)
+
+@router.get("/products", response_model=schemas.ProductSalesReport)
+@async_db_route
+def read_product_sales(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Quantidade, faturamento, margem, curva ABC e crescimento sobre o período
+    # anterior de mesma duração, por produto e por categoria (padrão: últimos 30 dias)
+    if data_inicio and data_fim and data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="data_inicio must not be after data_fim")
+    return product_analytics.product_sales(db, data_inicio, data_fim, limit)
@@ -1,81 +1,45 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from decimal import Decimal
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.core.database import get_db
+from app.core.database import async_db_route, get_db
+from app.services import etags, loading, pagination, receivables, rollups
+from app.services import sales as sale_service
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Sale)
+@async_db_route
 def create_sale(
     *,
     db: Session = Depends(get_db),
     sale_in: schemas.SaleCreate,
 ) -> Any:
-    items_data = sale_in.itens
-    sale_data = sale_in.dict(exclude={"itens", "valor_entrada"})
-    valor_entrada_manual = sale_in.valor_entrada
-    
-    # Se o valor total não foi enviado, calculamos com base nos itens
-    total_calculado = 0
-    itens_processados = []
-    
-    if items_data:
-        for item in items_data:
-            # Busca o produto para garantir que existe e pegar o preço se necessário
-            product = db.query(models.Product).filter(models.Product.id_produto == item.id_produto).first()
-            if not product:
-                raise HTTPException(status_code=404, detail=f"Produto com ID {item.id_produto} não encontrado")
-            
-            # Usa o valor enviado ou o preço atual do produto
-            v_unitario = item.valor_unitario if item.valor_unitario is not None else product.preco_venda
-            subtotal = item.qtde * v_unitario
-            total_calculado += subtotal
-            
-            itens_processados.append({
-                "id_produto": item.id_produto,
-                "qtde": item.qtde,
-                "valor_unitario": v_unitario,
-                "subtotal": subtotal
-            })
-
-    # Se valor_total for None ou 0, usa o calculado
-    final_total = sale_data.get("valor_total") or total_calculado
-    sale_data["valor_total"] = final_total
-
-    sale = models.Sale(**sale_data)
-    db.add(sale)
-    db.commit()
-    db.refresh(sale)
-    
-    for item_data in itens_processados:
-        db_item = models.SaleItem(
-            id_vendas=sale.id_vendas,
-            **item_data
-        )
-        db.add(db_item)
-
-    # Lógica de Pagamento Inicial
-    amount_to_record = 0
-    if sale.status_pagamento == models.StatusPagamento.pago:
-        amount_to_record = final_total
-    elif valor_entrada_manual and valor_entrada_manual > 0:
-        amount_to_record = valor_entrada_manual
-
-    if amount_to_record > 0:
-        db_payment = models.SalePayment(
-            id_vendas=sale.id_vendas,
-            valor_pago=amount_to_record,
-            forma_pagamento=sale.forma_pagamento,
-            observacao="Pagamento inicial / Entrada"
-        )
-        db.add(db_payment)
-    
+    # Preços de todos os itens em uma única consulta
+    prices = sale_service.fetch_prices(db, [item.id_produto for item in sale_in.itens or []])
+    itens_processados, total_calculado, missing = sale_service.price_items(sale_in.itens, prices)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Produto com ID {missing[0]} não encontrado")
+
+    # Cabeçalho, itens e pagamento inicial em uma única transação
+    sale = sale_service.add_sale(db, sale_in, itens_processados, total_calculado)
     db.commit()
-    db.refresh(sale)
-    return sale
+    return sale_service.get_sale(db, sale.id_vendas)
+
+@router.post("/batch", response_model=schemas.SaleBatchResponse)
+@async_db_route
+def create_sales_batch(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: schemas.SaleBatchRequest,
+) -> Any:
+    # Reenvio das vendas registradas offline pelo PDV (idempotente pela chave)
+    return sale_service.import_sales(db, batch_in.vendas)
 
 @router.put("/{sale_id}", response_model=schemas.Sale)
+@async_db_route
 def update_sale(
     *,
     db: Session = Depends(get_db),
@@ -85,6 +49,8 @@ def update_sale(
     db_sale = db.query(models.Sale).filter(models.Sale.id_vendas == sale_id).first()
     if not db_sale:
         raise HTTPException(status_code=404, detail="Sale not found")
+    # Resumos: retira a venda como estava e soma de novo depois de alterada
+    rollups.sales_changed(db, [sale_id], -1)
     
     # Update main sale data
     update_data = sale_in.dict(exclude={"itens"}, exclude_unset=True)
@@ -93,53 +59,85 @@ def update_sale(
     
     # Drop old items and recreate (simplest way for updates)
     db.query(models.SaleItem).filter(models.SaleItem.id_vendas == sale_id).delete()
-    
-    total_calculado = 0
-    if sale_in.itens:
-        for item in sale_in.itens:
-            product = db.query(models.Product).filter(models.Product.id_produto == item.id_produto).first()
-            v_unitario = item.valor_unitario if item.valor_unitario is not None else (product.preco_venda if product else 0)
-            subtotal = item.qtde * v_unitario
-            total_calculado += subtotal
-            
-            db_item = models.SaleItem(
-                id_vendas=sale_id,
-                id_produto=item.id_produto,
-                qtde=item.qtde,
-                valor_unitario=v_unitario,
-                subtotal=subtotal
-            )
-            db.add(db_item)
-            
+
+    prices = sale_service.fetch_prices(db, [item.id_produto for item in sale_in.itens or []])
+    itens_processados, total_calculado, _ = sale_service.price_items(sale_in.itens, prices)
+    sale_service.add_items(db, sale_id, itens_processados)
+
     # Update total if not provided
-    if not sale_in.valor_total:
-        db_sale.valor_total = total_calculado
+    receivables.apply_total_change(db_sale, sale_in.valor_total or total_calculado)
         
     db.add(db_sale)
+    db.flush()
+    rollups.sales_changed(db, [sale_id])
     db.commit()
-    db.refresh(db_sale)
-    return db_sale
+    return sale_service.get_sale(db, sale_id)
+
+# Itens trazem o produto e a categoria: o ETag também depende do catálogo
+SALE_VERSIONS = ("vendas", "produtos", "categorias")
+
 @router.get("/", response_model=List[schemas.Sale])
+@async_db_route
 def read_sales(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    id_cliente: Optional[int] = None,
+    status_pagamento: Optional[models.StatusPagamento] = None,
+    forma_pagamento: Optional[models.FormaPagamento] = None,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    sales = db.query(models.Sale).offset(skip).limit(limit).all()
+    cached = etags.conditional(db, request, page.response, *SALE_VERSIONS)
+    if cached:
+        return cached
+    query = receivables.filter_sales(
+        loading.load_for(db.query(models.Sale), schemas.Sale),
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        id_cliente=id_cliente,
+        status_pagamento=status_pagamento,
+        forma_pagamento=forma_pagamento,
+    )
+    sales = page.apply(query, (models.Sale.id_vendas,))
     return sales
 
+@router.get("/summary", response_model=schemas.SalesSummary)
+@async_db_route
+def read_sales_summary(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    agrupamento: Literal["dia", "mes"] = "dia",
+    limite_devedores: int = 10,
+    db: Session = Depends(get_db),
+) -> Any:
+    return receivables.sales_summary(
+        db,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        agrupamento=agrupamento,
+        limite_devedores=limite_devedores,
+    )
+
 @router.get("/{sale_id}", response_model=schemas.Sale)
+@async_db_route
 def read_sale(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     sale_id: int,
 ) -> Any:
-    sale = db.query(models.Sale).filter(models.Sale.id_vendas == sale_id).first()
+    cached = etags.conditional(db, request, response, *SALE_VERSIONS)
+    if cached:
+        return cached
+    sale = sale_service.get_sale(db, sale_id)
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     return sale
 
 @router.delete("/{sale_id}")
+@async_db_route
 def delete_sale(
     *,
     db: Session = Depends(get_db),
@@ -149,6 +147,7 @@ def delete_sale(
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     
+    rollups.sales_changed(db, [sale_id], -1)
     db.query(models.SaleItem).filter(models.SaleItem.id_vendas == sale_id).delete()
     db.query(models.SalePayment).filter(models.SalePayment.id_vendas == sale_id).delete()
     db.delete(sale)
@@ -157,6 +156,7 @@ def delete_sale(
 
 # Payments
 @router.post("/{sale_id}/payments", response_model=schemas.SalePayment)
+@async_db_route
 def create_payment(
     *,
     db: Session = Depends(get_db),
@@ -172,11 +172,16 @@ def create_payment(
         id_vendas=sale_id
     )
     db.add(db_payment)
+    receivables.apply_payment(sale, payment_in.valor_pago)
+    db.add(sale)
+    db.flush()
+    rollups.payments_changed(db, [db_payment.id_venda_pagamento])
     db.commit()
     db.refresh(db_payment)
     return db_payment
 
 @router.delete("/payments/{payment_id}")
+@async_db_route
 def delete_payment(
     *,
     db: Session = Depends(get_db),
@@ -186,68 +191,37 @@ def delete_payment(
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
-    db_delete = payment
+    rollups.payments_changed(db, [payment_id], -1)
+    if payment.venda:
+        receivables.apply_payment(payment.venda, -(payment.valor_pago or 0))
+        db.add(payment.venda)
     db.delete(payment)
     db.commit()
     return {"message": "Payment deleted successfully"}
 
 @router.post("/batch-payment/{client_id}")
+@async_db_route
 def batch_payment_client(
     *,
     db: Session = Depends(get_db),
     client_id: int,
     payment_in: schemas.BatchPaymentRequest,
+    dry_run: bool = False,
 ) -> Any:
-    # 1. Buscar todas as vendas não quitadas do cliente, ordenadas por data (mais antigas primeiro)
-    sales = db.query(models.Sale).filter(
-        models.Sale.id_cliente == client_id,
-        models.Sale.status_pagamento != models.StatusPagamento.pago
-    ).order_by(models.Sale.data_venda.asc()).all()
-
-    if not sales:
+    # Plano FIFO calculado no banco (vendas mais antigas primeiro)
+    plan = receivables.plan_fifo_settlement(db, client_id, payment_in.valor_total)
+    if not plan:
         raise HTTPException(status_code=404, detail="Nenhuma venda em aberto encontrada para este cliente")
 
-    total_to_distribute = payment_in.valor_total
-    payments_made = []
+    distributed = sum((entry["amount"] for entry in plan), Decimal(0))
+    if not dry_run:
+        receivables.apply_settlement(db, plan, payment_in.forma_pagamento, payment_in.observacao)
+        db.commit()
 
-    for sale in sales:
-        if total_to_distribute <= 0:
-            break
-
-        # Calcular saldo devedor da venda
-        total_paid_on_sale = sum([p.valor_pago for p in sale.pagamentos])
-        current_debt = sale.valor_total - total_paid_on_sale
-
-        if current_debt <= 0:
-            continue
-
-        # Quanto podemos pagar nesta nota agora?
-        amount_to_pay = min(current_debt, total_to_distribute)
-
-        # Registrar o pagamento
-        db_payment = models.SalePayment(
-            id_vendas=sale.id_vendas,
-            valor_pago=amount_to_pay,
-            forma_pagamento=payment_in.forma_pagamento,
-            observacao=payment_in.observacao
-        )
-        db.add(db_payment)
-        
-        # Atualizar status da venda
-        new_total_paid = total_paid_on_sale + amount_to_pay
-        if new_total_paid >= sale.valor_total:
-            sale.status_pagamento = models.StatusPagamento.pago
-        else:
-            sale.status_pagamento = models.StatusPagamento.parcial
-        
-        db.add(sale)
-        total_to_distribute -= amount_to_pay
-        payments_made.append({"sale_id": sale.id_vendas, "amount": amount_to_pay})
-
-    db.commit()
     return {
         "message": f"Processado recebimento de {payment_in.valor_total}",
-        "distributed_amount": payment_in.valor_total - total_to_distribute,
-        "remaining_credit": total_to_distribute,
-        "affected_sales": payments_made
+        "dry_run": dry_run,
+        "distributed_amount": distributed,
+        "remaining_credit": payment_in.valor_total - distributed,
+        "affected_sales": plan
     }
@@ -0,0 +1,19 @@
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app import schemas
+from app.core.database import async_db_route, get_db
+from app.services import search as search_service
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SearchResults)
+@async_db_route
+def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    tipo: Optional[List[Literal["clientes", "produtos"]]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Clientes por trecho do nome, telefone ou email e produtos por trecho do nome
+    return search_service.search(db, q, tipo or list(search_service.INDEXED), limit)
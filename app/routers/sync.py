@@ -0,0 +1,23 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app import schemas
+from app.core.database import async_db_route, get_db
+from app.services import sync as sync_service
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SyncResponse)
+@async_db_route
+def read_changes(
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    db: Session = Depends(get_db),
+) -> Any:
+    # Tudo o que foi criado, alterado ou excluído desde o token anterior; sem
+    # token, o estado completo. Em páginas: continuar com `cursor`
+    if cursor:
+        return sync_service.page(db, sync_service.decode_cursor(cursor), limit)
+    desde = sync_service.decode_token(since) if since else None
+    return sync_service.changes_since(db, desde, limit)
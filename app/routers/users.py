@@ -4,17 +4,17 @@ from sqlalchemy.orm import Session
 from app.models import user as user_model
 from app import schemas
 from app.core.database import get_db
+from app.services import pagination
 from app.core.security import get_password_hash
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.User])
 def read_users(
-    skip: int = 0,
-    limit: int = 100,
+    page: pagination.PageParams = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
-    users = db.query(user_model.User).offset(skip).limit(limit).all()
+    users = page.apply(db.query(user_model.User), (user_model.User.id_usuario,))
     return users
 
 @router.post("/", response_model=schemas.User)
@@ -1,5 +1,8 @@
 from .user import User, UserCreate, UserUpdate
 from .client import Client, ClientCreate
 from .product import Product, ProductCreate, Category, CategoryCreate
-from .finance import Supplier, SupplierCreate, Employee, EmployeeCreate, Advance, AdvanceCreate, AccountsPayable, AccountsPayableCreate
-from .sales import Sale, SaleCreate, SaleItem, SaleItemCreate, SalePayment, SalePaymentCreate, BatchPaymentRequest
+from .finance import Supplier, SupplierCreate, Employee, EmployeeCreate, Advance, AdvanceCreate, AccountsPayable, AccountsPayableCreate, PayablesAging, CashFlowProjection, AdvancesSummary
+from .sales import Sale, SaleCreate, SaleItem, SaleItemCreate, SalePayment, SalePaymentCreate, BatchPaymentRequest, SalesSummary, SaleBatchItem, SaleBatchRequest, SaleBatchResponse
+from .sync import SyncChanges, SyncResponse
+from .search import ClientSearchResult, ProductSearchResult, SearchResults
+from .reports import ReceiptsReport, MonthlyRevenue, ClientRevenue, ProductRanking, ProductSalesReport
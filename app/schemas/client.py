@@ -15,7 +15,7 @@ class ClientCreate(ClientBase):
 class Client(ClientBase):
     id_cliente: int
     data_cadastro: Optional[datetime] = None
-    saldo_devedor: Optional[Decimal] = 0.00
+    saldo_devedor: Optional[Decimal] = Decimal("0.00")
 
     class Config:
         from_attributes = True
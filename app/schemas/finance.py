@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 from decimal import Decimal
 from datetime import date, datetime
@@ -86,3 +86,68 @@ class AccountsPayable(AccountsPayableBase):
 
     class Config:
         from_attributes = True
+
+# Vencimentos por faixa e projeção do caixa
+class PayablesAgingBucket(BaseModel):
+    faixa: str
+    quantidade: int
+    valor: Decimal
+
+class PayablesAgingTotals(BaseModel):
+    quantidade: int
+    total: Decimal
+    pago: Decimal
+    aberto: Decimal
+    vencido: Decimal
+
+class PayablesAging(BaseModel):
+    data_base: date
+    faixas: List[PayablesAgingBucket]
+    totais: PayablesAgingTotals
+
+class CashFlowDay(BaseModel):
+    dia: date
+    entradas: Decimal
+    contas_pagar: Decimal
+    folha: Decimal
+    liquido: Decimal
+    saldo: Decimal
+
+class CashFlowTotals(BaseModel):
+    entradas: Decimal
+    contas_pagar: Decimal
+    folha: Decimal
+    liquido: Decimal
+    saldo_final: Decimal
+    saldo_minimo: Decimal
+    dia_saldo_minimo: date
+
+class CashFlowProjection(BaseModel):
+    data_base: date
+    data_fim: date
+    saldo_inicial: Decimal
+    totais: CashFlowTotals
+    dias: List[CashFlowDay]
+
+# Resumo dos adiantamentos por funcionário (ver app.services.payroll)
+class AdvanceTotals(BaseModel):
+    por_tipo: Dict[TipoAdiantamento, Decimal]
+    total_adiantado: Decimal
+    salario: Decimal
+    liquido_restante: Decimal
+
+class AdvanceMonth(AdvanceTotals):
+    mes_referencia: str
+
+class EmployeeAdvances(AdvanceTotals):
+    id_funcionario: int
+    nome: str
+    salario_mensal: Decimal
+    meses: List[AdvanceMonth]
+
+class AdvancesSummary(BaseModel):
+    mes_inicio: str
+    mes_fim: str
+    meses: int
+    totais: AdvanceTotals
+    funcionarios: List[EmployeeAdvances]
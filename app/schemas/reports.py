@@ -0,0 +1,78 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel
+from app.models.sales import FormaPagamento
+
+# Relatórios de vendas (lidos dos resumos, ver app.services.rollups)
+class ReceiptsByMethod(BaseModel):
+    forma_pagamento: Optional[FormaPagamento] = None
+    quantidade: int
+    valor_recebido: Decimal
+
+class ReceiptsByPeriod(ReceiptsByMethod):
+    periodo: str
+
+class ReceiptsReport(BaseModel):
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    por_forma_pagamento: List[ReceiptsByMethod] = []
+    por_periodo: List[ReceiptsByPeriod] = []
+
+class MonthlyRevenue(BaseModel):
+    mes: str
+    vendas: int
+    valor_total: Decimal
+    valor_recebido: Decimal
+
+class ClientRevenue(BaseModel):
+    id_cliente: Optional[int] = None
+    nome: Optional[str] = None
+    vendas: int
+    valor_total: Decimal
+    valor_recebido: Decimal
+
+class ProductRanking(BaseModel):
+    id_produto: int
+    nome: Optional[str] = None
+    itens: int
+    qtde: Decimal
+    valor: Decimal
+
+# Vendas por produto e categoria (ver app.services.product_analytics)
+class SalesMeasures(BaseModel):
+    itens: int
+    qtde: Decimal
+    valor: Decimal
+    custo: Optional[Decimal] = None
+    margem: Optional[Decimal] = None
+    margem_percentual: Optional[float] = None
+    valor_anterior: Decimal
+    crescimento: Optional[float] = None
+
+class ProductSales(SalesMeasures):
+    id_produto: Optional[int] = None
+    nome: Optional[str] = None
+    id_categoria: Optional[int] = None
+    categoria: Optional[str] = None
+    preco_custo: Optional[Decimal] = None
+    preco_venda: Optional[Decimal] = None
+    margem_unitaria: Optional[Decimal] = None
+    participacao: Optional[float] = None
+    classe_abc: str
+
+class CategorySales(SalesMeasures):
+    id_categoria: Optional[int] = None
+    nome: Optional[str] = None
+    produtos: int
+    participacao: Optional[float] = None
+    classe_abc: str
+
+class ProductSalesReport(BaseModel):
+    data_inicio: date
+    data_fim: date
+    anterior_inicio: date
+    anterior_fim: date
+    totais: SalesMeasures
+    produtos: List[ProductSales] = []
+    categorias: List[CategorySales] = []
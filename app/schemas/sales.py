@@ -1,7 +1,7 @@
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from app.models.sales import StatusPagamento, FormaPagamento
 from app.schemas.product import Product
 
@@ -39,7 +39,8 @@ class SalePayment(SalePaymentBase):
         from_attributes = True
 
 class BatchPaymentRequest(BaseModel):
-    valor_total: Decimal
+    # Valor recebido: precisa ser maior que zero (senão 422)
+    valor_total: Decimal = Field(..., gt=0)
     forma_pagamento: FormaPagamento
     observacao: Optional[str] = "Baixa Automática (FIFO)"
 
@@ -53,11 +54,72 @@ class SaleCreate(SaleBase):
     itens: Optional[List[SaleItemCreate]] = []
     valor_entrada: Optional[Decimal] = None
 
+class SaleBatchItem(SaleCreate):
+    chave_idempotencia: str = Field(..., min_length=1, max_length=64)
+    data_venda: Optional[datetime] = None
+
+class SaleBatchRequest(BaseModel):
+    vendas: List[SaleBatchItem]
+
+class SaleBatchResult(BaseModel):
+    chave_idempotencia: str
+    status: Literal["criada", "duplicada", "erro"]
+    id_vendas: Optional[int] = None
+    erro: Optional[str] = None
+
+class SaleBatchResponse(BaseModel):
+    criadas: int
+    duplicadas: int
+    erros: int
+    resultados: List[SaleBatchResult]
+
 class Sale(SaleBase):
     id_vendas: int
     data_venda: datetime
+    valor_pago_total: Optional[Decimal] = None
+    saldo_aberto: Optional[Decimal] = None
     itens: List[SaleItem] = []
     pagamentos: List[SalePayment] = []
 
     class Config:
         from_attributes = True
+
+# Sales summary (dashboard)
+class SalesSummaryTotals(BaseModel):
+    total: Decimal
+    pago: Decimal
+    pendente: Decimal
+    parcial: Decimal
+    a_receber: Decimal
+
+class SalesSummaryByStatus(BaseModel):
+    status_pagamento: Optional[StatusPagamento] = None
+    quantidade: int
+    valor_total: Decimal
+    valor_pago: Decimal
+    saldo_aberto: Decimal
+
+class SalesSummaryByPaymentMethod(BaseModel):
+    forma_pagamento: Optional[FormaPagamento] = None
+    quantidade: int
+    valor_recebido: Decimal
+
+class SalesSummaryByPeriod(BaseModel):
+    periodo: str
+    quantidade: int
+    valor_total: Decimal
+    saldo_aberto: Decimal
+
+class SalesSummaryDebtor(BaseModel):
+    id_cliente: int
+    nome: str
+    saldo_devedor: Decimal
+
+class SalesSummary(BaseModel):
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    totais: SalesSummaryTotals
+    por_status: List[SalesSummaryByStatus] = []
+    por_forma_pagamento: List[SalesSummaryByPaymentMethod] = []
+    por_periodo: List[SalesSummaryByPeriod] = []
+    maiores_devedores: List[SalesSummaryDebtor] = []
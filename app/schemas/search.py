@@ -0,0 +1,15 @@
+from typing import List
+from pydantic import BaseModel
+from .client import Client
+from .product import Product
+
+class ClientSearchResult(Client):
+    relevancia: float
+
+class ProductSearchResult(Product):
+    relevancia: float
+
+class SearchResults(BaseModel):
+    # Cada lista vem do mais para o menos relevante
+    clientes: List[ClientSearchResult] = []
+    produtos: List[ProductSearchResult] = []
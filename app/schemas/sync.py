@@ -0,0 +1,27 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from .client import Client
+from .finance import AccountsPayable, Advance, Employee, Supplier
+from .product import Category, Product
+from .sales import Sale
+
+class SyncChanges(BaseModel):
+    categorias: List[Category] = []
+    produtos: List[Product] = []
+    clientes: List[Client] = []
+    fornecedores: List[Supplier] = []
+    funcionarios: List[Employee] = []
+    adiantamentos: List[Advance] = []
+    contas_pagar: List[AccountsPayable] = []
+    vendas: List[Sale] = []
+
+class SyncResponse(BaseModel):
+    # Só na última página (estado completo ou delta)
+    token: Optional[str] = None
+    # Próxima página (GET /sync/?cursor=...); None quando terminou
+    cursor: Optional[str] = None
+    # true: estado completo, o cliente deve substituir o que tem ao receber a última página
+    completo: bool
+    alteracoes: SyncChanges
+    # ids excluídos por entidade (mesmas chaves de `alteracoes`), na última página do delta
+    exclusoes: Dict[str, List[int]] = {}
@@ -0,0 +1,256 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.orm import Session
+from app import models
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services import versions
+from app.services.periods import add_days, period_bucket
+from app.services.receivables import money
+
+# Vencimento das contas a pagar por faixa e projeção diária do caixa
+# (GET /finance/accounts-payable/aging e /finance/cash-flow). Cada fonte da
+# projeção (recebíveis, contas a pagar e folha) é agregada por dia no banco,
+# com o acumulado calculado por SUM() OVER, e fica em cache pelo dia e pela
+# versão das tabelas de que depende: uma venda nova recalcula só os recebíveis.
+
+AccountsPayable, Sale = models.AccountsPayable, models.Sale
+
+CONTAS_ABERTAS = (models.StatusConta.a_vencer, models.StatusConta.atrasado)
+VENDAS_ABERTAS = (models.StatusPagamento.pendente, models.StatusPagamento.parcial)
+
+# Faixas de vencimento das contas em aberto: (nome, até quantos dias a partir de hoje)
+VENCIDAS = "vencidas"
+FAIXAS: Tuple[Tuple[str, Optional[int]], ...] = (("0-7", 7), ("8-30", 30), ("31-60", 60), ("60+", None))
+PAGAS = "pagas"
+
+# Contadores de versoes_tabelas de que cada cálculo depende
+SOURCES = {
+    "aging": ("contas_pagar",),
+    "receber": ("vendas",),
+    "pagar": ("contas_pagar",),
+    "folha": ("funcionarios", "adiantamentos"),
+}
+
+cache = TTLCache(max_size=256, ttl=settings.CASHFLOW_CACHE_TTL_SECONDS)
+
+# (dia, valor do dia, acumulado até o dia)
+Daily = List[Tuple[date, Decimal, Decimal]]
+
+
+def _versions(db: Session, *sources: str) -> Dict[str, int]:
+    tables = sorted({table for source in sources for table in SOURCES[source]})
+    return {name: versao for name, (versao, _) in versions.current(db, tables).items()}
+
+
+def _cached(source: str, key: tuple, current: Dict[str, int], compute: Callable):
+    key = (source, *key, tuple(current[table] for table in SOURCES[source]))
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+
+@versions.on_change
+def _invalidate_on_commit(tables: set) -> None:
+    stale = {source for source, depends in SOURCES.items() if tables & set(depends)}
+    if stale:
+        cache.delete_where(lambda key: key[0] in stale)
+
+
+def _aging(db: Session, hoje: date) -> dict:
+    vencimento = AccountsPayable.data_vencimento
+    faixa = case(
+        (AccountsPayable.status == models.StatusConta.pago, PAGAS),
+        (vencimento < hoje, VENCIDAS),
+        *[(vencimento <= hoje + timedelta(days=dias), nome) for nome, dias in FAIXAS if dias is not None],
+        else_=FAIXAS[-1][0],
+    )
+    # Subconsulta: o GROUP BY usa a coluna já calculada (portável entre bancos)
+    contas = select(faixa.label("faixa"), AccountsPayable.valor_total_nota.label("valor")).subquery()
+    rows = db.execute(
+        select(contas.c.faixa, func.count(), func.coalesce(func.sum(contas.c.valor), 0)).group_by(contas.c.faixa)
+    ).all()
+    found = {nome: (quantidade, money(valor)) for nome, quantidade, valor in rows}
+
+    faixas = [
+        {"faixa": nome, "quantidade": found.get(nome, (0,))[0], "valor": found.get(nome, (0, money(0)))[1]}
+        for nome in (VENCIDAS, *(nome for nome, _ in FAIXAS))
+    ]
+    pagas = found.get(PAGAS, (0, money(0)))
+    aberto = sum((faixa["valor"] for faixa in faixas), money(0))
+    return {
+        "data_base": hoje,
+        "faixas": faixas,
+        "totais": {
+            "quantidade": pagas[0] + sum(faixa["quantidade"] for faixa in faixas),
+            "total": pagas[1] + aberto,
+            "pago": pagas[1],
+            "aberto": aberto,
+            "vencido": faixas[0]["valor"],
+        },
+    }
+
+
+def mark_overdue_payables(db: Session, hoje: Optional[date] = None) -> int:
+    # Um UPDATE: "A Vencer" vencida passa a "Atrasado"; "Atrasado" com o
+    # vencimento adiado volta a "A Vencer"
+    hoje = hoje or date.today()
+    vencimento, status = AccountsPayable.data_vencimento, AccountsPayable.status
+    atrasado = literal(models.StatusConta.atrasado, status.type)
+    a_vencer = literal(models.StatusConta.a_vencer, status.type)
+    result = db.execute(
+        update(AccountsPayable.__table__)
+        .where(
+            ((status == models.StatusConta.a_vencer) & (vencimento < hoje))
+            | ((status == models.StatusConta.atrasado) & (vencimento >= hoje))
+        )
+        .values(status=case((vencimento < hoje, atrasado), else_=a_vencer))
+    )
+    if result.rowcount:
+        versions.bump(db, "contas_pagar")
+    db.commit()
+    return result.rowcount
+
+
+def payables_aging(db: Session, hoje: Optional[date] = None) -> dict:
+    hoje = hoje or date.today()
+    return _cached("aging", (hoje,), _versions(db, "aging"), lambda: _aging(db, hoje))
+
+
+def _daily(db: Session, rows) -> Daily:
+    # Soma por dia e acumulado na ordem dos dias (função de janela sobre o GROUP BY)
+    valor = func.sum(rows.c.valor)
+    statement = (
+        select(rows.c.dia, valor, func.sum(valor).over(order_by=rows.c.dia))
+        .group_by(rows.c.dia)
+        .order_by(rows.c.dia)
+    )
+    return [(date.fromisoformat(dia), money(total), money(acumulado)) for dia, total, acumulado in db.execute(statement)]
+
+
+def _overdue_today(dia, hoje: date):
+    # O que já deveria ter entrado/saído conta no primeiro dia da projeção
+    return case((dia < hoje.isoformat(), hoje.isoformat()), else_=dia)
+
+
+def _receivables(db: Session, hoje: date, fim: date, prazo: int) -> Daily:
+    # Saldo em aberto das vendas, esperado `prazo` dias depois da venda
+    esperado = period_bucket(db, add_days(db, Sale.data_venda, prazo))
+    rows = (
+        select(_overdue_today(esperado, hoje).label("dia"), Sale.saldo_aberto.label("valor"))
+        .where(
+            Sale.status_pagamento.in_(VENDAS_ABERTAS),
+            Sale.saldo_aberto > 0,
+            Sale.data_venda < fim - timedelta(days=prazo - 1),
+        )
+        .subquery()
+    )
+    return _daily(db, rows)
+
+
+def _payables(db: Session, hoje: date, fim: date) -> Daily:
+    vencimento = AccountsPayable.data_vencimento
+    rows = (
+        select(
+            _overdue_today(period_bucket(db, vencimento), hoje).label("dia"),
+            AccountsPayable.valor_total_nota.label("valor"),
+        )
+        .where(AccountsPayable.status.in_(CONTAS_ABERTAS), vencimento <= fim)
+        .subquery()
+    )
+    return _daily(db, rows)
+
+
+def _paydays(hoje: date, fim: date, dia_pagamento: int) -> Dict[str, date]:
+    # mes_referencia -> dia em que o salário do mês é pago (no mês seguinte)
+    paydays = {}
+    ano, mes = (hoje.year, hoje.month - 1) if hoje.month > 1 else (hoje.year - 1, 12)
+    while True:
+        seguinte = (ano, mes + 1) if mes < 12 else (ano + 1, 1)
+        pagamento = date(*seguinte, min(dia_pagamento, 28))
+        if pagamento > fim:
+            return paydays
+        if pagamento >= hoje:
+            paydays[f"{ano:04d}-{mes:02d}"] = pagamento
+        ano, mes = seguinte
+
+
+def _payroll(db: Session, hoje: date, fim: date, dia_pagamento: int) -> Daily:
+    # Salários menos os adiantamentos já lançados para o mês de referência
+    paydays = _paydays(hoje, fim, dia_pagamento)
+    if not paydays:
+        return []
+    Advance = models.Advance
+    salarios = dict(db.execute(select(models.Employee.id_funcionario, models.Employee.salario)).all())
+    adiantado: Dict[str, Dict[int, Decimal]] = {mes: {} for mes in paydays}
+    for mes, id_funcionario, valor in db.execute(
+        select(Advance.mes_referencia, Advance.id_funcionario, func.sum(Advance.valor))
+        .where(Advance.mes_referencia.in_(list(paydays)))
+        .group_by(Advance.mes_referencia, Advance.id_funcionario)
+    ).all():
+        adiantado[mes][id_funcionario] = Decimal(valor or 0)
+
+    daily, acumulado = [], money(0)
+    for mes, pagamento in sorted(paydays.items(), key=lambda item: item[1]):
+        total = money(sum(
+            max(Decimal(salario or 0) - adiantado[mes].get(id_funcionario, 0), 0)
+            for id_funcionario, salario in salarios.items()
+        ))
+        acumulado += total
+        daily.append((pagamento, total, acumulado))
+    return daily
+
+
+def cash_flow(db: Session, dias: int = 30, saldo_inicial: Decimal = Decimal(0), hoje: Optional[date] = None) -> dict:
+    hoje = hoje or date.today()
+    fim = hoje + timedelta(days=dias - 1)
+    prazo, dia_pagamento = settings.CASHFLOW_RECEIVABLE_DAYS, settings.CASHFLOW_PAYDAY
+    current = _versions(db, "receber", "pagar", "folha")
+    series = {
+        "receber": _cached("receber", (hoje, fim, prazo), current, lambda: _receivables(db, hoje, fim, prazo)),
+        "pagar": _cached("pagar", (hoje, fim), current, lambda: _payables(db, hoje, fim)),
+        "folha": _cached("folha", (hoje, fim, dia_pagamento), current, lambda: _payroll(db, hoje, fim, dia_pagamento)),
+    }
+
+    # Dias sem movimento repetem o último acumulado de cada fonte
+    by_day = {source: {dia: (valor, acumulado) for dia, valor, acumulado in rows} for source, rows in series.items()}
+    acumulados = {source: money(0) for source in series}
+    saldo_inicial = money(saldo_inicial)
+    rows = []
+    for offset in range(dias):
+        dia = hoje + timedelta(days=offset)
+        valores = {}
+        for source, days in by_day.items():
+            valor, acumulado = days.get(dia, (money(0), None))
+            valores[source] = valor
+            if acumulado is not None:
+                acumulados[source] = acumulado
+        rows.append({
+            "dia": dia,
+            "entradas": valores["receber"],
+            "contas_pagar": valores["pagar"],
+            "folha": valores["folha"],
+            "liquido": valores["receber"] - valores["pagar"] - valores["folha"],
+            "saldo": saldo_inicial + acumulados["receber"] - acumulados["pagar"] - acumulados["folha"],
+        })
+
+    menor = min(rows, key=lambda row: row["saldo"])
+    return {
+        "data_base": hoje,
+        "data_fim": fim,
+        "saldo_inicial": saldo_inicial,
+        "totais": {
+            "entradas": acumulados["receber"],
+            "contas_pagar": acumulados["pagar"],
+            "folha": acumulados["folha"],
+            "liquido": acumulados["receber"] - acumulados["pagar"] - acumulados["folha"],
+            "saldo_final": rows[-1]["saldo"],
+            "saldo_minimo": menor["saldo"],
+            "dia_saldo_minimo": menor["dia"],
+        },
+        "dias": rows,
+    }
@@ -0,0 +1,192 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.core.text import prefix_upper_bound, search_key
+from app.services import versions
+
+# Catálogo de produtos e categorias em memória, por processo. Muda pouco e é
+# lido em toda venda e em toda abertura do PDV. Commits neste processo limpam
+# o cache na hora; alterações feitas por outros workers são percebidas pela
+# versão em versoes_tabelas (conferida a cada CATALOG_VERSION_CHECK_SECONDS).
+
+CATALOG_TABLES = ("categorias", "produtos")
+
+
+class CatalogProduct(NamedTuple):
+    id_produto: int
+    nome: str
+    id_categoria: Optional[int]
+    preco_custo: Optional[Decimal]
+    preco_venda: Decimal
+
+
+class Catalog:
+    def __init__(self, version: Tuple[int, ...], products: List[CatalogProduct], categories: Dict[int, str]):
+        self.version = version
+        self.etag = 'W/"catalogo-' + "-".join(str(v) for v in version) + '"'
+        self.products = {p.id_produto: p for p in products}
+        self.categories = categories
+        self.product_rows = [self._product_row(p) for p in products]
+        self.category_rows = [{"id_categoria": id_categoria, "nome": nome} for id_categoria, nome in categories.items()]
+        # Índices em memória: (nome sem acento, id) ordenado para busca por prefixo
+        # com bisect, e produtos por categoria
+        self._rows_by_id = {row["id_produto"]: row for row in self.product_rows}
+        self._name_index = sorted((search_key(p.nome), p.id_produto) for p in products)
+        self._by_category = defaultdict(list)
+        for row in self.product_rows:
+            self._by_category[row["id_categoria"]].append(row)
+
+    def _product_row(self, product: CatalogProduct) -> dict:
+        row = product._asdict()
+        nome_categoria = self.categories.get(product.id_categoria)
+        row["categoria"] = (
+            {"id_categoria": product.id_categoria, "nome": nome_categoria} if nome_categoria is not None else None
+        )
+        return row
+
+    def find_products(self, nome: Optional[str] = None, id_categoria: Optional[int] = None) -> List[dict]:
+        # Produtos (ordenados por id) cujo nome começa com `nome`, sem diferenciar acentos
+        if not nome:
+            return self._by_category.get(id_categoria, []) if id_categoria is not None else self.product_rows
+        key = search_key(nome)
+        start = bisect.bisect_left(self._name_index, (key,))
+        end = bisect.bisect_left(self._name_index, (prefix_upper_bound(key),))
+        rows = [self._rows_by_id[id_produto] for id_produto in sorted(id for _, id in self._name_index[start:end])]
+        if id_categoria is not None:
+            rows = [row for row in rows if row["id_categoria"] == id_categoria]
+        return rows
+
+
+def _catalog_version(db: Session) -> Tuple[int, ...]:
+    current = versions.current(db, CATALOG_TABLES)
+    return tuple(current[name][0] for name in CATALOG_TABLES)
+
+
+def load_catalog(db: Session) -> Catalog:
+    # Versão lida antes dos dados: uma alteração concorrente gera versão maior
+    # e o próximo get() recarrega
+    version = _catalog_version(db)
+    categories = dict(
+        db.query(models.Category.id_categoria, models.Category.nome).order_by(models.Category.id_categoria).all()
+    )
+    products = [
+        CatalogProduct(*row)
+        for row in db.query(
+            models.Product.id_produto,
+            models.Product.nome,
+            models.Product.id_categoria,
+            models.Product.preco_custo,
+            models.Product.preco_venda,
+        ).order_by(models.Product.id_produto)
+    ]
+    return Catalog(version, products, categories)
+
+
+class CatalogCache:
+    def __init__(self, ttl: float, check_interval: float, cross_worker: bool):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.cross_worker = cross_worker
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.invalidations = 0
+        self._catalog: Optional[Catalog] = None
+        self._expires = 0.0
+        self._next_check = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, db: Session, catalog: Optional[Catalog], now: float) -> bool:
+        # Com a versão pendente recarrega sempre (a leitura da versão tenta subi-la de novo)
+        if catalog is None or now >= self._expires or versions.pending(CATALOG_TABLES):
+            return False
+        if self.cross_worker and now >= self._next_check:
+            self._next_check = now + self.check_interval
+            return _catalog_version(db) == catalog.version
+        return True
+
+    def get(self, db: Session) -> Catalog:
+        if self.ttl <= 0:
+            self.misses += 1
+            return load_catalog(db)
+        now = time.monotonic()
+        catalog = self._catalog
+        if self._fresh(db, catalog, now):
+            self.hits += 1
+            return catalog
+        with self._lock:
+            # Outra thread pode ter recarregado enquanto esta esperava
+            if self._catalog is not None and self._catalog is not catalog and now < self._expires:
+                self.hits += 1
+                return self._catalog
+            self.misses += 1
+            self.reloads += 1
+            generation = self._generation
+            loaded = load_catalog(db)
+            # Invalidado durante a carga: usa nesta requisição, mas não guarda
+            if generation == self._generation:
+                self._catalog = loaded
+                self._expires = time.monotonic() + self.ttl
+                self._next_check = time.monotonic() + self.check_interval
+            return loaded
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._catalog = None
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "version": list(self._catalog.version) if self._catalog else None,
+            "products": len(self._catalog.products) if self._catalog else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+catalog_cache = CatalogCache(
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    check_interval=settings.CATALOG_VERSION_CHECK_SECONDS,
+    cross_worker=settings.CATALOG_CROSS_WORKER_INVALIDATION,
+)
+
+
+def etag(current: Catalog) -> Optional[str]:
+    # Sem ETag enquanto a versão do catálogo não sobe no banco (versions.pending)
+    return None if versions.pending(CATALOG_TABLES) else current.etag
+
+
+@versions.on_change
+def _invalidate_on_commit(tables: set) -> None:
+    if tables & set(CATALOG_TABLES):
+        catalog_cache.invalidate()
+
+
+def fetch_prices(db: Session, product_ids: Iterable[int]) -> Dict[int, Decimal]:
+    # Preços do catálogo em cache; ids que ainda não estão nele (produto recém-criado
+    # em outro worker) são buscados no banco
+    product_ids = set(product_ids)
+    if not product_ids:
+        return {}
+    products = catalog_cache.get(db).products
+    prices = {id_produto: products[id_produto].preco_venda for id_produto in product_ids if id_produto in products}
+    unknown = product_ids - prices.keys()
+    if unknown:
+        rows = (
+            db.query(models.Product.id_produto, models.Product.preco_venda)
+            .filter(models.Product.id_produto.in_(unknown))
+            .all()
+        )
+        prices.update({id_produto: preco for id_produto, preco in rows})
+    return prices
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app.services import versions
+
+# GET condicional: o ETag vem de uma versão barata (contador da tabela em
+# versoes_tabelas), então a resposta 304 sai antes de consultar ou serializar
+# a lista. Os contadores são globais por tabela: qualquer alteração muda o
+# ETag de todas as páginas e filtros daquele recurso.
+
+
+def _strong(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca: W/"x" e "x" são equivalentes
+    tags = {_strong(tag.strip()) for tag in if_none_match.split(",")}
+    return _strong(etag) in tags
+
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(
+    request: Request, response: Response, etag: Optional[str], last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    # Define ETag/Last-Modified na resposta; devolve um 304 quando o cliente já tem essa versão.
+    # Sem etag (versão ainda pendente, ver versions.pending) a resposta sai sem cache condicional
+    if etag is None:
+        return None
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if _matches(if_none_match, etag) or (
+        if_none_match is None and _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def conditional(db: Session, request: Request, response: Response, *tables: str) -> Optional[Response]:
+    current = versions.current(db, tables)
+    if versions.pending(tables):
+        return not_modified(request, response, None)
+    etag = 'W/"' + "-".join(f"{name}.{versao}" for name, (versao, _) in current.items()) + '"'
+    modified = [atualizado_em for _, atualizado_em in current.values() if atualizado_em is not None]
+    return not_modified(request, response, etag, max(modified) if modified else None)
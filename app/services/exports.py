@@ -0,0 +1,201 @@
+import csv
+import enum
+import io
+import tempfile
+from datetime import date
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.periods import in_period
+
+# Exportação para a contabilidade (GET /exports). As linhas são lidas em lotes
+# de EXPORT_BATCH_SIZE com yield_per (cursor no servidor no PostgreSQL) e
+# escritas conforme chegam: a memória não cresce com o período exportado.
+# A sessão é aberta pelo próprio gerador, porque a resposta continua sendo
+# enviada depois que a rota retorna.
+
+Sale, SaleItem, SalePayment = models.Sale, models.SaleItem, models.SalePayment
+AccountsPayable, AccountsPayableItem = models.AccountsPayable, models.AccountsPayableItem
+
+# Limite de linhas de uma planilha do Excel (o restante continua em outra aba)
+XLSX_MAX_ROWS = 1048576
+
+
+def _sales(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    return (
+        select(
+            Sale.id_vendas, Sale.data_venda, Sale.id_cliente, models.Client.nome.label("cliente"),
+            Sale.status_pagamento, Sale.forma_pagamento,
+            Sale.valor_total, Sale.valor_pago_total, Sale.saldo_aberto,
+        )
+        .outerjoin(models.Client, models.Client.id_cliente == Sale.id_cliente)
+        .where(*in_period(Sale.data_venda, data_inicio, data_fim))
+        .order_by(Sale.data_venda, Sale.id_vendas)
+    )
+
+
+def _sale_items(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    # Itens das vendas do período
+    return (
+        select(
+            SaleItem.id_venda_item, SaleItem.id_vendas, Sale.data_venda,
+            SaleItem.id_produto, models.Product.nome.label("produto"),
+            SaleItem.qtde, SaleItem.valor_unitario, SaleItem.subtotal,
+        )
+        .join(Sale, Sale.id_vendas == SaleItem.id_vendas)
+        .outerjoin(models.Product, models.Product.id_produto == SaleItem.id_produto)
+        .where(*in_period(Sale.data_venda, data_inicio, data_fim))
+        .order_by(Sale.data_venda, SaleItem.id_vendas, SaleItem.id_venda_item)
+    )
+
+
+def _sale_payments(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    # Recebimentos pela data do pagamento (inclui vendas de períodos anteriores)
+    return (
+        select(
+            SalePayment.id_venda_pagamento, SalePayment.id_vendas, Sale.id_cliente,
+            SalePayment.data_pagamento, SalePayment.valor_pago,
+            SalePayment.forma_pagamento, SalePayment.observacao,
+        )
+        .join(Sale, Sale.id_vendas == SalePayment.id_vendas)
+        .where(*in_period(SalePayment.data_pagamento, data_inicio, data_fim))
+        .order_by(SalePayment.data_pagamento, SalePayment.id_venda_pagamento)
+    )
+
+
+def _payables(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    return (
+        select(
+            AccountsPayable.id_contas_pagar, AccountsPayable.id_fornecedor, models.Supplier.nome.label("fornecedor"),
+            AccountsPayable.numero_nota, AccountsPayable.data_vencimento,
+            AccountsPayable.valor_total_nota, AccountsPayable.status,
+        )
+        .outerjoin(models.Supplier, models.Supplier.id_fornecedor == AccountsPayable.id_fornecedor)
+        .where(*in_period(AccountsPayable.data_vencimento, data_inicio, data_fim))
+        .order_by(AccountsPayable.data_vencimento, AccountsPayable.id_contas_pagar)
+    )
+
+
+def _payable_items(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    return (
+        select(
+            AccountsPayableItem.id_contas_pagar_item, AccountsPayableItem.id_contas_pagar,
+            AccountsPayable.data_vencimento, AccountsPayableItem.descricao_item,
+            AccountsPayableItem.qtde, AccountsPayableItem.valor_unitario,
+        )
+        .join(AccountsPayable, AccountsPayable.id_contas_pagar == AccountsPayableItem.id_contas_pagar)
+        .where(*in_period(AccountsPayable.data_vencimento, data_inicio, data_fim))
+        .order_by(AccountsPayable.data_vencimento, AccountsPayableItem.id_contas_pagar_item)
+    )
+
+
+def _advances(data_inicio: Optional[date], data_fim: Optional[date]) -> Select:
+    return (
+        select(
+            models.Advance.id_lancamento, models.Advance.id_funcionario, models.Employee.nome.label("funcionario"),
+            models.Advance.tipo, models.Advance.valor, models.Advance.data_registro, models.Advance.mes_referencia,
+        )
+        .outerjoin(models.Employee, models.Employee.id_funcionario == models.Advance.id_funcionario)
+        .where(*in_period(models.Advance.data_registro, data_inicio, data_fim))
+        .order_by(models.Advance.data_registro, models.Advance.id_lancamento)
+    )
+
+
+DATASETS: Dict[str, Callable[[Optional[date], Optional[date]], Select]] = {
+    "vendas": _sales,
+    "venda_itens": _sale_items,
+    "venda_pagamentos": _sale_payments,
+    "contas_pagar": _payables,
+    "contas_pagar_itens": _payable_items,
+    "adiantamentos": _advances,
+}
+
+# Abas de cada planilha XLSX
+WORKBOOKS: Dict[str, Tuple[str, ...]] = {
+    "vendas": ("vendas", "venda_itens", "venda_pagamentos"),
+    "contas_pagar": ("contas_pagar", "contas_pagar_itens"),
+    "adiantamentos": ("adiantamentos",),
+}
+
+
+def _batches(db: Session, statement: Select) -> Iterator[list]:
+    result = db.execute(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    for batch in result.partitions():
+        yield batch
+
+
+def _csv_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return "" if value is None else value
+
+
+def stream_csv(dataset: str, data_inicio: Optional[date], data_fim: Optional[date]) -> Iterator[bytes]:
+    statement = DATASETS[dataset](data_inicio, data_fim)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(statement.selected_columns.keys())
+    # Cabeçalho sai antes da consulta; o BOM faz o Excel reconhecer o UTF-8
+    yield ("\ufeff" + buffer.getvalue()).encode()
+
+    db = SessionLocal()
+    try:
+        for batch in _batches(db, statement):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode()
+    finally:
+        db.close()
+
+
+def _xlsx_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def write_xlsx(db: Session, workbook: str, data_inicio: Optional[date], data_fim: Optional[date], target) -> None:
+    # write_only: cada linha vai direto para um arquivo temporário da aba
+    book = Workbook(write_only=True)
+    for dataset in WORKBOOKS[workbook]:
+        statement = DATASETS[dataset](data_inicio, data_fim)
+        headers = list(statement.selected_columns.keys())
+        sheet, sheets, rows = None, 0, XLSX_MAX_ROWS
+        for batch in _batches(db, statement):
+            for row in batch:
+                if rows >= XLSX_MAX_ROWS:
+                    sheets += 1
+                    sheet = book.create_sheet(dataset if sheets == 1 else f"{dataset} ({sheets})")
+                    sheet.append(headers)
+                    rows = 1
+                sheet.append([_xlsx_value(value) for value in row])
+                rows += 1
+        if sheet is None:
+            book.create_sheet(dataset).append(headers)
+    book.save(target)
+
+
+def stream_xlsx(workbook: str, data_inicio: Optional[date], data_fim: Optional[date]) -> Iterator[bytes]:
+    # O XLSX é um zip com o índice no final: só pode ser enviado depois de
+    # montado. O arquivo fica em disco (acima de 8 MB) e sai em blocos.
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as target:
+        db = SessionLocal()
+        try:
+            write_xlsx(db, workbook, data_inicio, data_fim, target)
+        finally:
+            db.close()
+        target.seek(0)
+        while True:
+            chunk = target.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+
+def filename(name: str, extension: str, data_inicio: Optional[date], data_fim: Optional[date]) -> str:
+    period = "_".join(str(d) for d in (data_inicio, data_fim) if d)
+    return f"{name}_{period}.{extension}" if period else f"{name}.{extension}"
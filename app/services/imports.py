@@ -0,0 +1,248 @@
+import csv
+import io
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core.config import settings
+from app.core.text import search_key
+from app.services import versions
+
+# Importação de cadastros por CSV (POST /imports/{entidade} e manage.py
+# import-csv). O arquivo é lido linha a linha; cada lote de IMPORT_CHUNK_SIZE
+# linhas é validado com os schemas de criação, casado com os registros que já
+# existem e gravado em uma transação (insert/update em executemany).
+# Linhas inválidas não interrompem a importação: voltam no relatório.
+
+
+class ImportSpec(NamedTuple):
+    model: type
+    schema: type
+    key: str
+    # Colunas que identificam um registro já cadastrado quando o CSV não traz o id
+    match: Tuple[str, ...]
+    table: str
+
+
+SPECS = {
+    "produtos": ImportSpec(models.Product, schemas.ProductCreate, "id_produto", ("nome_busca",), "produtos"),
+    "clientes": ImportSpec(models.Client, schemas.ClientCreate, "id_cliente", ("nome_busca", "telefone"), "clientes"),
+    "fornecedores": ImportSpec(models.Supplier, schemas.SupplierCreate, "id_fornecedor", ("nome",), "fornecedores"),
+}
+
+# Campos numéricos aceitos no formato brasileiro ("1.234,56")
+DECIMAL_FIELDS = ("preco_custo", "preco_venda", "limite_credito")
+
+
+def _decimal_text(value: str) -> str:
+    if "," in value:
+        return value.replace(".", "").replace(",", ".")
+    return value
+
+
+def read_rows(stream: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    # (número da linha no arquivo, campos preenchidos); aceita "," ou ";"
+    lines = iter(stream)
+    header = next(lines, "")
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    reader = csv.reader(lines, delimiter=delimiter)
+    columns = [column.strip().lower() for column in next(csv.reader([header], delimiter=delimiter), [])]
+    for values in reader:
+        row = {}
+        for column, value in zip(columns, values):
+            value = value.strip()
+            if value:
+                row[column] = _decimal_text(value) if column in DECIMAL_FIELDS else value
+        if row:
+            yield reader.line_num + 1, row
+
+
+def _chunks(rows: Iterator[Tuple[int, dict]], size: int) -> Iterator[List[Tuple[int, dict]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _error_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()]
+
+
+def _validate(spec: ImportSpec, chunk: List[Tuple[int, dict]], report: dict) -> List[Tuple[int, dict, BaseModel]]:
+    # O lote inteiro em uma chamada; só se houver erro valida linha a linha
+    # para saber quais falharam
+    adapter = _adapter(spec.schema)
+    try:
+        validated = adapter.validate_python([row for _, row in chunk])
+        return [(line, row, obj) for (line, row), obj in zip(chunk, validated)]
+    except ValidationError:
+        pass
+    valid = []
+    for line, row in chunk:
+        try:
+            valid.append((line, row, spec.schema.model_validate(row)))
+        except ValidationError as error:
+            _add_error(report, line, _error_messages(error))
+    return valid
+
+
+_adapters: Dict[type, TypeAdapter] = {}
+
+
+def _adapter(schema: type) -> TypeAdapter:
+    if schema not in _adapters:
+        _adapters[schema] = TypeAdapter(List[schema])
+    return _adapters[schema]
+
+
+def _add_error(report: dict, line: int, messages: List[str]) -> None:
+    report["erros"] += 1
+    if len(report["linhas_com_erro"]) < settings.IMPORT_MAX_REPORTED_ERRORS:
+        report["linhas_com_erro"].append({"linha": line, "erros": messages})
+
+
+class CategoryMap:
+    # Nome da categoria (sem acento/maiúscula) -> id; carregado uma vez por
+    # importação, as categorias que faltam são criadas a cada lote
+    def __init__(self, db: Session):
+        self.ids = {search_key(nome): id_categoria for id_categoria, nome in db.execute(
+            select(models.Category.id_categoria, models.Category.nome)
+        )}
+
+    def resolve(self, db: Session, names: Iterable[str]) -> None:
+        missing = {}
+        for nome in names:
+            key = search_key(nome)
+            if key and key not in self.ids:
+                missing.setdefault(key, nome.strip())
+        if not missing:
+            return
+        db.execute(insert(models.Category), [{"nome": nome} for nome in missing.values()])
+        created = db.execute(
+            select(models.Category.id_categoria, models.Category.nome)
+            .where(models.Category.nome.in_(list(missing.values())))
+            .order_by(models.Category.id_categoria)
+        )
+        for id_categoria, nome in created:
+            self.ids.setdefault(search_key(nome), id_categoria)
+        versions.bump(db, "categorias")
+
+    def get(self, nome: Optional[str]) -> Optional[int]:
+        return self.ids.get(search_key(nome)) if nome else None
+
+
+def _match_values(spec: ImportSpec, values: dict) -> tuple:
+    return tuple(search_key(values["nome"]) if column == "nome_busca" else values.get(column) for column in spec.match)
+
+
+def _existing(db: Session, spec: ImportSpec, ids: List[int], matches: List[tuple]) -> Tuple[Dict[tuple, int], set]:
+    # Uma consulta por lote para os ids informados e outra para os registros
+    # casados pelas colunas de `match`
+    table = spec.model.__table__
+    key = table.c[spec.key]
+    known_ids = set(db.execute(select(key).where(key.in_(ids))).scalars()) if ids else set()
+    first = sorted({match[0] for match in matches})
+    matched = {}
+    if first:
+        columns = [table.c[column] for column in spec.match]
+        for found in db.execute(select(key, *columns).where(columns[0].in_(first)).order_by(key)):
+            matched.setdefault(tuple(found[1:]), found[0])
+    return matched, known_ids
+
+
+def _write_chunk(db: Session, spec: ImportSpec, rows: List[Tuple[int, dict, set]], report: dict) -> None:
+    keyed = [(line, values, fields, values.pop(spec.key, None), _match_values(spec, values)) for line, values, fields in rows]
+    matched, known_ids = _existing(
+        db, spec,
+        [id_registro for *_, id_registro, _ in keyed if id_registro is not None],
+        [match for *_, id_registro, match in keyed if id_registro is None],
+    )
+    inserts: Dict[tuple, dict] = {}
+    updates: Dict[int, dict] = {}
+    for line, values, fields, id_registro, match in keyed:
+        if id_registro is not None and id_registro not in known_ids:
+            _add_error(report, line, [f"{spec.key}: registro {id_registro} não encontrado"])
+            continue
+        id_registro = id_registro if id_registro is not None else matched.get(match)
+        if id_registro is not None:
+            # Só as colunas presentes no arquivo: as demais ficam como estão
+            changes = updates.setdefault(id_registro, {})
+            changes.update({field: values[field] for field in fields if field != spec.key})
+        else:
+            # Repetido no mesmo lote: a última linha vale
+            inserts[match] = values
+
+    if inserts:
+        # nome_busca vem do default da coluna (contexto do insert)
+        db.execute(insert(spec.model.__table__), list(inserts.values()))
+
+    # executemany exige as mesmas colunas em todas as linhas: agrupa por colunas
+    table = spec.model.__table__
+    groups: Dict[tuple, list] = {}
+    for id_registro, changes in updates.items():
+        if "nome" in changes and "nome_busca" in table.c:
+            changes["nome_busca"] = search_key(changes["nome"])
+        groups.setdefault(tuple(sorted(changes)), []).append(dict(changes, _id=id_registro))
+    for columns, params in groups.items():
+        if columns:
+            db.execute(
+                update(table)
+                .where(table.c[spec.key] == bindparam("_id"))
+                .values({column: bindparam(column) for column in columns}),
+                params,
+            )
+
+    if inserts or updates:
+        versions.bump(db, spec.table)
+    report["inseridos"] += len(inserts)
+    report["atualizados"] += len(updates)
+
+
+def import_csv(db: Session, entidade: str, stream: Iterable[str], chunk_size: Optional[int] = None) -> dict:
+    spec = SPECS[entidade]
+    report = {"entidade": entidade, "linhas": 0, "inseridos": 0, "atualizados": 0, "erros": 0, "linhas_com_erro": []}
+    categories = CategoryMap(db) if spec.model is models.Product else None
+
+    for chunk in _chunks(read_rows(stream), chunk_size or settings.IMPORT_CHUNK_SIZE):
+        report["linhas"] += len(chunk)
+        rows = []
+        for line, row, obj in _validate(spec, chunk, report):
+            values, fields = obj.model_dump(), set(obj.model_fields_set)
+            if row.get(spec.key):
+                try:
+                    values[spec.key] = int(row[spec.key])
+                except ValueError:
+                    _add_error(report, line, [f"{spec.key}: não é um número"])
+                    continue
+            rows.append((line, values, fields, row.get("categoria")))
+
+        try:
+            if categories is not None:
+                pending = [(values, fields, categoria) for _, values, fields, categoria in rows
+                           if categoria and not values.get("id_categoria")]
+                categories.resolve(db, [categoria for _, _, categoria in pending])
+                for values, fields, categoria in pending:
+                    values["id_categoria"] = categories.get(categoria)
+                    fields.add("id_categoria")
+            _write_chunk(db, spec, [(line, values, fields) for line, values, fields, _ in rows], report)
+            db.commit()
+        except SQLAlchemyError as error:
+            # Lote inteiro descartado (inclusive as categorias criadas nele)
+            db.rollback()
+            if categories is not None:
+                categories = CategoryMap(db)
+            detail = str(getattr(error, "orig", None) or error).splitlines()[0][:200]
+            for line, _, _, _ in rows:
+                _add_error(report, line, [f"banco: {detail}"])
+    return report
+
+
+def text_stream(binary) -> io.TextIOWrapper:
+    # Arquivo binário (upload) lido como texto UTF-8, com ou sem BOM
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Query, joinedload, selectinload
+from app import models, schemas
+
+# Relacionamentos que cada schema de resposta serializa. Carregá-los junto com
+# a consulta principal evita uma consulta extra por linha durante a
+# serialização do Pydantic (N+1): muitos-para-um via JOIN, coleções via
+# um SELECT ... IN por relacionamento.
+LOAD_OPTIONS = {
+    schemas.Product: (
+        joinedload(models.Product.categoria),
+    ),
+    schemas.Sale: (
+        selectinload(models.Sale.itens)
+        .joinedload(models.SaleItem.produto)
+        .joinedload(models.Product.categoria),
+        selectinload(models.Sale.pagamentos),
+    ),
+    schemas.Advance: (
+        joinedload(models.Advance.funcionario),
+    ),
+    schemas.AccountsPayable: (
+        joinedload(models.AccountsPayable.fornecedor),
+        selectinload(models.AccountsPayable.itens),
+    ),
+}
+
+
+def load_for(query: Query, schema) -> Query:
+    # Subclasses (ex.: ProductSearchResult) usam as opções do schema de origem
+    for base in getattr(schema, "__mro__", (schema,)):
+        if base in LOAD_OPTIONS:
+            return query.options(*LOAD_OPTIONS[base])
+    return query
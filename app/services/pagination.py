@@ -0,0 +1,114 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query as OrmQuery
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def decode_cursor(cursor: str, key_columns: Sequence) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError(cursor)
+        decoded = []
+        for column, value in zip(key_columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif value is not None:
+                value = python_type(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise invalid_cursor()
+
+
+def _after(key_columns: Sequence, values: Sequence):
+    # (a, b) > (va, vb) expandido em OR/AND, aceito por todos os dialetos
+    # e resolvido com uma busca no índice da chave.
+    column, value = key_columns[0], values[0]
+    if len(key_columns) == 1:
+        return column > value
+    return or_(column > value, and_(column == value, _after(key_columns[1:], values[1:])))
+
+
+def _bisect_right(rows: Sequence, target: tuple, key) -> int:
+    # bisect.bisect_right(rows, target, key=key), que só existe a partir do Python 3.10
+    lo, hi = 0, len(rows)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if target < key(rows[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+class PageParams:
+    # Paginação por chave (keyset): o próximo lote começa depois da última
+    # chave devolvida, em vez de descartar `skip` linhas a cada página.
+    # O cursor da próxima página e o total (opcional) vão nos cabeçalhos
+    # para que o corpo continue sendo a lista de sempre.
+    def __init__(
+        self,
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ):
+        self.response = response
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.with_total = with_total
+
+    def apply(self, query: OrmQuery, key_columns: Sequence) -> list:
+        if self.with_total:
+            self.response.headers[TOTAL_COUNT_HEADER] = str(query.order_by(None).count())
+
+        query = query.order_by(*key_columns)
+        if self.cursor:
+            query = query.filter(_after(key_columns, decode_cursor(self.cursor, key_columns)))
+        elif self.skip:
+            query = query.offset(self.skip)
+
+        rows = query.limit(self.limit + 1).all()
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                [getattr(last, column.key) for column in key_columns]
+            )
+        return rows
+
+    def apply_sorted(self, rows: Sequence[dict], key_columns: Sequence) -> list:
+        # A mesma paginação sobre uma lista já ordenada pela chave (cache em memória)
+        if self.with_total:
+            self.response.headers[TOTAL_COUNT_HEADER] = str(len(rows))
+
+        key = lambda row: tuple(row[column.key] for column in key_columns)
+        if self.cursor:
+            start = _bisect_right(rows, tuple(decode_cursor(self.cursor, key_columns)), key)
+        else:
+            start = self.skip
+
+        page = list(rows[start:start + self.limit])
+        if start + self.limit < len(rows):
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(list(key(page[-1])))
+        return page
@@ -0,0 +1,127 @@
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.services.receivables import money
+
+# Resumo da folha por funcionário (GET /finance/advances/summary): adiantamentos
+# de cada mês de referência somados por tipo, o salário e o líquido que resta
+# a pagar (salário menos tudo o que já foi lançado no mês). Um mês ou um
+# intervalo de meses (relatório do ano), em uma consulta agrupada que parte
+# de funcionarios, então quem não tem lançamento aparece com o salário cheio.
+# Usa o salário atual (não há histórico) e não conta meses antes da admissão.
+
+Advance, Employee = models.Advance, models.Employee
+
+# Intervalo máximo do modo de vários meses
+MAX_MESES = 24
+
+
+def months(mes_inicio: str, mes_fim: str) -> List[str]:
+    # 'YYYY-MM' de mes_inicio a mes_fim, inclusive
+    ano, mes = map(int, mes_inicio.split("-"))
+    meses = []
+    while f"{ano:04d}-{mes:02d}" <= mes_fim:
+        meses.append(f"{ano:04d}-{mes:02d}")
+        ano, mes = (ano, mes + 1) if mes < 12 else (ano + 1, 1)
+    return meses
+
+
+def _by_type(values: Optional[Dict[models.TipoAdiantamento, Decimal]] = None) -> Dict[models.TipoAdiantamento, Decimal]:
+    values = values or {}
+    return {tipo: money(values.get(tipo)) for tipo in models.TipoAdiantamento}
+
+
+def _add_types(total: Dict[models.TipoAdiantamento, Decimal], values: Dict[models.TipoAdiantamento, Decimal]) -> None:
+    for tipo, valor in values.items():
+        total[tipo] += valor
+
+
+def advances_summary(db: Session, mes_inicio: str, mes_fim: Optional[str] = None) -> dict:
+    mes_fim = mes_fim or mes_inicio
+    meses = months(mes_inicio, mes_fim)
+    adiantamentos = (
+        select(
+            Advance.id_funcionario,
+            Advance.mes_referencia,
+            Advance.tipo,
+            func.sum(Advance.valor).label("valor"),
+        )
+        .where(Advance.mes_referencia >= mes_inicio, Advance.mes_referencia <= mes_fim)
+        .group_by(Advance.id_funcionario, Advance.mes_referencia, Advance.tipo)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Employee.id_funcionario,
+            Employee.nome,
+            Employee.salario,
+            Employee.data_admissao,
+            adiantamentos.c.mes_referencia,
+            adiantamentos.c.tipo,
+            adiantamentos.c.valor,
+        )
+        .outerjoin(adiantamentos, adiantamentos.c.id_funcionario == Employee.id_funcionario)
+        .order_by(Employee.nome, Employee.id_funcionario)
+    ).all()
+
+    # id_funcionario -> dados do funcionário e {mês: {tipo: valor}}
+    employees: Dict[int, dict] = {}
+    for id_funcionario, nome, salario, data_admissao, mes, tipo, valor in rows:
+        employee = employees.setdefault(id_funcionario, {
+            "id_funcionario": id_funcionario,
+            "nome": nome,
+            "salario": money(salario),
+            "admissao": data_admissao.strftime("%Y-%m") if data_admissao else None,
+            "lancado": {},
+        })
+        if mes is not None:
+            employee["lancado"].setdefault(mes, {})[tipo] = money(valor)
+
+    funcionarios = []
+    totais = {"por_tipo": _by_type(), "total_adiantado": money(0), "salario": money(0), "liquido_restante": money(0)}
+    for employee in employees.values():
+        por_tipo = _by_type()
+        por_mes = []
+        for mes in meses:
+            lancado = employee["lancado"].get(mes, {})
+            admitido = employee["admissao"] is None or employee["admissao"] <= mes
+            if not admitido and not lancado:
+                continue
+            salario = employee["salario"] if admitido else money(0)
+            adiantado = sum(lancado.values(), money(0))
+            _add_types(por_tipo, lancado)
+            por_mes.append({
+                "mes_referencia": mes,
+                "por_tipo": _by_type(lancado),
+                "total_adiantado": adiantado,
+                "salario": salario,
+                "liquido_restante": salario - adiantado,
+            })
+        if not por_mes:
+            continue
+        resumo = {
+            "por_tipo": por_tipo,
+            "total_adiantado": sum((linha["total_adiantado"] for linha in por_mes), money(0)),
+            "salario": sum((linha["salario"] for linha in por_mes), money(0)),
+            "liquido_restante": sum((linha["liquido_restante"] for linha in por_mes), money(0)),
+        }
+        _add_types(totais["por_tipo"], por_tipo)
+        for key in ("total_adiantado", "salario", "liquido_restante"):
+            totais[key] += resumo[key]
+        funcionarios.append({
+            "id_funcionario": employee["id_funcionario"],
+            "nome": employee["nome"],
+            "salario_mensal": employee["salario"],
+            **resumo,
+            "meses": por_mes,
+        })
+
+    return {
+        "mes_inicio": mes_inicio,
+        "mes_fim": mes_fim,
+        "meses": len(meses),
+        "totais": totais,
+        "funcionarios": funcionarios,
+    }
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import Date, cast, func, text
+from sqlalchemy.orm import Session
+
+AGRUPAMENTOS = ("dia", "mes")
+
+
+def period_bucket(db: Session, column, agrupamento: str = "dia"):
+    # Expressão SQL que converte uma data/hora em 'YYYY-MM-DD' ou 'YYYY-MM'
+    # no dialeto do banco configurado.
+    dialect = db.get_bind().dialect.name
+    fmt = "%Y-%m-%d" if agrupamento == "dia" else "%Y-%m"
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM-DD" if agrupamento == "dia" else "YYYY-MM")
+    if dialect in ("mysql", "mariadb"):
+        return func.date_format(column, fmt)
+    return func.strftime(fmt, column)
+
+
+def add_days(db: Session, column, dias: int):
+    # Data/hora da coluna + N dias (só a data) no dialeto do banco configurado
+    dialect = db.get_bind().dialect.name
+    dias = int(dias)
+    if dialect == "postgresql":
+        return cast(column, Date) + dias
+    if dialect in ("mysql", "mariadb"):
+        return func.date(func.date_add(column, text(f"INTERVAL {dias} DAY")))
+    return func.date(column, f"{dias:+d} days")
+
+
+def in_period(column, data_inicio: Optional[date], data_fim: Optional[date]):
+    # data_fim é inclusiva: tudo antes do dia seguinte
+    conditions = []
+    if data_inicio:
+        conditions.append(column >= data_inicio)
+    if data_fim:
+        conditions.append(column < data_fim + timedelta(days=1))
+    return conditions
@@ -0,0 +1,242 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.services import rollups
+from app.services.receivables import money
+
+# Vendas por produto e categoria (GET /reports/products): quantidade,
+# faturamento, margem bruta, curva ABC e crescimento sobre o período anterior
+# de mesma duração. Uma consulta traz, por produto e período (atual/anterior),
+# os totais de resumo_dia_produto (+ o dia corrente de venda_itens) com o custo
+# e a categoria do produto; as contas são feitas em colunas com NumPy, com os
+# valores em inteiros (centavos, quantidade em centésimos) para somar sem erro
+# de arredondamento.
+# A margem usa o preco_custo atual do produto (o custo não é gravado na venda).
+
+Product, Category = models.Product, models.Category
+
+SEM_CATEGORIA = 0
+
+# Escalas das colunas inteiras: valores e quantidades em centésimos; o custo
+# (quantidade x preço de custo) e a margem em centésimos de centavo
+CENTESIMOS = 100
+CUSTO = CENTESIMOS * CENTESIMOS
+
+
+def _cents(values: Iterable) -> np.ndarray:
+    # Decimal (ou float, no SQLite) em centésimos; nulo vira 0 (ver as máscaras)
+    return np.array(
+        [0 if value is None else round(Decimal(str(value)) * CENTESIMOS) for value in values], dtype=np.int64
+    )
+
+
+def _present(values: Iterable) -> np.ndarray:
+    return np.array([value is not None for value in values], dtype=bool)
+
+
+def _fetch(db: Session, anterior_inicio: date, inicio: date, fim: date) -> Dict[str, np.ndarray]:
+    rows = rollups.period_rows(db, rollups.ROLLUPS["resumo_dia_produto"], anterior_inicio, fim)
+    # Marca cada linha como do período atual ou anterior e soma por produto e período
+    marked = select(
+        rows.c.id_produto,
+        case((rows.c.dia >= inicio.isoformat(), 1), else_=0).label("atual"),
+        rows.c.itens,
+        rows.c.qtde,
+        rows.c.valor,
+    ).subquery()
+    totals = (
+        select(
+            marked.c.id_produto,
+            marked.c.atual,
+            func.sum(marked.c.itens).label("itens"),
+            func.sum(marked.c.qtde).label("qtde"),
+            func.sum(marked.c.valor).label("valor"),
+        )
+        .group_by(marked.c.id_produto, marked.c.atual)
+        .subquery()
+    )
+    statement = (
+        select(
+            totals.c.id_produto,
+            totals.c.atual,
+            totals.c.itens,
+            totals.c.qtde,
+            totals.c.valor,
+            Product.nome,
+            func.coalesce(Product.id_categoria, SEM_CATEGORIA),
+            Category.nome,
+            Product.preco_custo,
+            Product.preco_venda,
+        )
+        .select_from(totals)
+        .outerjoin(Product, Product.id_produto == totals.c.id_produto)
+        .outerjoin(Category, Category.id_categoria == Product.id_categoria)
+    )
+    columns = list(zip(*db.execute(statement).all())) or [()] * 10
+    # Preços nulos (produto sem custo, item sem produto) ficam 0 com a máscara em com_custo/com_preco
+    return {
+        "id_produto": np.array(columns[0], dtype=np.int64),
+        "atual": np.array(columns[1], dtype=bool),
+        "itens": np.array([itens or 0 for itens in columns[2]], dtype=np.int64),
+        "qtde": _cents(columns[3]),
+        "valor": _cents(columns[4]),
+        "nome": np.array(columns[5], dtype=object),
+        "id_categoria": np.array(columns[6], dtype=np.int64),
+        "categoria": np.array(columns[7], dtype=object),
+        "preco_custo": _cents(columns[8]),
+        "com_custo": _present(columns[8]),
+        "preco_venda": _cents(columns[9]),
+        "com_preco": _present(columns[9]),
+    }
+
+
+def _abc(valor: np.ndarray):
+    # Classe pelo faturamento acumulado antes do item (o maior é sempre A);
+    # sem faturamento no período é C
+    total = valor.sum()
+    classes = np.full(len(valor), "C", dtype="<U1")
+    if total <= 0:
+        return classes, np.zeros(len(valor))
+    ordem = np.argsort(-valor, kind="stable")
+    antes = (np.cumsum(valor[ordem]) - valor[ordem]) / total * 100
+    classes[ordem] = np.where(
+        antes < settings.ABC_CLASS_A_PERCENT, "A", np.where(antes < settings.ABC_CLASS_B_PERCENT, "B", "C")
+    )
+    classes[valor <= 0] = "C"
+    return classes, valor / total * 100
+
+
+def _ratio(numerador: np.ndarray, denominador: np.ndarray) -> np.ndarray:
+    # numerador / denominador em %, NaN onde o denominador não é positivo
+    result = np.full(len(numerador), np.nan)
+    np.divide(numerador * 100, denominador, out=result, where=denominador > 0)
+    return result
+
+
+def _measures(grupo: np.ndarray, n: int, data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Somas inteiras por grupo (produto ou categoria) com np.add.at
+    atual, anterior, com_custo = data["atual"], ~data["atual"], data["com_custo"]
+
+    def soma(values, mask):
+        total = np.zeros(n, dtype=np.int64)
+        np.add.at(total, grupo[mask], values[mask])
+        return total
+
+    valor = soma(data["valor"], atual)
+    valor_anterior = soma(data["valor"], anterior)
+    # Margem só dos produtos com custo cadastrado (sem margem se nenhum tem)
+    valor_com_custo = soma(data["valor"], atual & com_custo) * CENTESIMOS
+    custo_total = soma(data["qtde"] * data["preco_custo"], atual & com_custo)
+    margem = valor_com_custo - custo_total
+    classes, participacao = _abc(valor)
+    return {
+        "itens": soma(data["itens"], atual),
+        "qtde": soma(data["qtde"], atual),
+        "valor": valor,
+        "tem_custo": np.bincount(grupo, weights=com_custo, minlength=n) > 0,
+        "custo": custo_total,
+        "margem": margem,
+        "margem_percentual": _ratio(margem, valor_com_custo),
+        "participacao": participacao,
+        "classe_abc": classes,
+        "valor_anterior": valor_anterior,
+        "crescimento": _ratio(valor - valor_anterior, valor_anterior),
+    }
+
+
+def _money(value: int, escala: int = CENTESIMOS, presente: bool = True) -> Optional[Decimal]:
+    return money(Decimal(int(value)) / escala) if presente else None
+
+
+def _percent(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _row(measures: Dict[str, np.ndarray], i: int) -> dict:
+    tem_custo = bool(measures["tem_custo"][i])
+    return {
+        "itens": int(measures["itens"][i]),
+        "qtde": _money(measures["qtde"][i]),
+        "valor": _money(measures["valor"][i]),
+        "custo": _money(measures["custo"][i], CUSTO, tem_custo),
+        "margem": _money(measures["margem"][i], CUSTO, tem_custo),
+        "margem_percentual": _percent(measures["margem_percentual"][i]),
+        "participacao": _percent(measures["participacao"][i]),
+        "classe_abc": str(measures["classe_abc"][i]),
+        "valor_anterior": _money(measures["valor_anterior"][i]),
+        "crescimento": _percent(measures["crescimento"][i]),
+    }
+
+
+def _ranking(measures: Dict[str, np.ndarray]) -> np.ndarray:
+    # Maior faturamento primeiro; entre os sem venda, o maior do período anterior
+    return np.lexsort((-measures["valor_anterior"], -measures["valor"]))
+
+
+def product_sales(
+    db: Session,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limite: Optional[int] = None,
+) -> dict:
+    # Período padrão: os últimos 30 dias até hoje
+    fim = data_fim or date.today()
+    inicio = data_inicio or fim - timedelta(days=29)
+    dias = (fim - inicio).days + 1
+    anterior_inicio, anterior_fim = inicio - timedelta(days=dias), inicio - timedelta(days=1)
+    data = _fetch(db, anterior_inicio, inicio, fim)
+
+    # Uma linha por produto: índice do produto de cada linha lida e a primeira linha de cada um
+    ids, primeira, produto = np.unique(data["id_produto"], return_index=True, return_inverse=True)
+    custo_unitario, com_custo = data["preco_custo"][primeira], data["com_custo"][primeira]
+    preco_venda, com_preco = data["preco_venda"][primeira], data["com_preco"][primeira]
+    por_produto = _measures(produto, len(ids), data)
+    margem_unitaria = preco_venda - custo_unitario
+
+    categorias, categoria_primeira, categoria = np.unique(
+        data["id_categoria"], return_index=True, return_inverse=True
+    )
+    por_categoria = _measures(categoria, len(categorias), data)
+    produtos_categoria = np.bincount(
+        np.unique(np.stack([categoria, produto]), axis=1)[0], minlength=len(categorias)
+    )
+
+    produtos = []
+    for i in _ranking(por_produto)[:limite].tolist():
+        id_produto = int(ids[i])
+        linha = primeira[i]
+        produtos.append({
+            "id_produto": id_produto or None,
+            "nome": data["nome"][linha],
+            "id_categoria": int(data["id_categoria"][linha]) or None,
+            "categoria": data["categoria"][linha],
+            "preco_custo": _money(custo_unitario[i], presente=com_custo[i]),
+            "preco_venda": _money(preco_venda[i], presente=com_preco[i]),
+            "margem_unitaria": _money(margem_unitaria[i], presente=com_custo[i] and com_preco[i]),
+            **_row(por_produto, i),
+        })
+    por_categorias = []
+    for i in _ranking(por_categoria).tolist():
+        linha = categoria_primeira[i]
+        por_categorias.append({
+            "id_categoria": int(categorias[i]) or None,
+            "nome": data["categoria"][linha],
+            "produtos": int(produtos_categoria[i]),
+            **_row(por_categoria, i),
+        })
+
+    totais = _measures(np.zeros(len(data["valor"]), dtype=np.int64), 1, data)
+    return {
+        "data_inicio": inicio,
+        "data_fim": fim,
+        "anterior_inicio": anterior_inicio,
+        "anterior_fim": anterior_fim,
+        "totais": {key: value for key, value in _row(totais, 0).items() if key not in ("participacao", "classe_abc")},
+        "produtos": produtos,
+        "categorias": por_categorias,
+    }
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from app import models
+
+# Consultas dos caminhos quentes de recebíveis e o índice que cada uma deve
+# usar. O plano vem do EXPLAIN do próprio banco; no SQLite o nome do índice
+# aparece em "SEARCH ... USING INDEX".
+Sale, SalePayment = models.Sale, models.SalePayment
+
+
+def hot_queries():
+    return [
+        (
+            "saldo devedor por cliente",
+            select(Sale.id_cliente, func.sum(Sale.saldo_aberto))
+            .where(Sale.id_cliente.in_([1, 2, 3]), Sale.status_pagamento != models.StatusPagamento.pago)
+            .group_by(Sale.id_cliente),
+            "ix_vendas_cliente_status_data",
+        ),
+        (
+            "vendas em aberto do cliente (FIFO)",
+            select(Sale.id_vendas, Sale.saldo_aberto)
+            .where(Sale.id_cliente == 1, Sale.status_pagamento != models.StatusPagamento.pago)
+            .order_by(Sale.data_venda),
+            "ix_vendas_cliente_status_data",
+        ),
+        (
+            "vendas por período",
+            select(func.count(Sale.id_vendas))
+            .where(Sale.data_venda >= datetime(2026, 1, 1), Sale.data_venda < datetime(2026, 2, 1)),
+            "ix_vendas_data_venda",
+        ),
+        (
+            "pagamentos da venda",
+            select(SalePayment.valor_pago).where(SalePayment.id_vendas == 1),
+            "ix_venda_pagamentos_venda",
+        ),
+        (
+            "itens da venda",
+            select(models.SaleItem.id_venda_item).where(models.SaleItem.id_vendas.in_([1, 2])),
+            "ix_venda_itens_venda",
+        ),
+        (
+            "contas a pagar por status e vencimento",
+            select(models.AccountsPayable.id_contas_pagar).where(
+                models.AccountsPayable.status == models.finance.StatusConta.a_vencer,
+                models.AccountsPayable.data_vencimento < date(2026, 1, 1),
+            ),
+            "ix_contas_pagar_status_vencimento",
+        ),
+        (
+            "adiantamentos do funcionário no mês",
+            select(models.Advance.valor).where(
+                models.Advance.id_funcionario == 1, models.Advance.mes_referencia == "2026-01"
+            ),
+            "ix_adiantamentos_funcionario_mes",
+        ),
+        (
+            "adiantamentos por mês de referência",
+            select(models.Advance.id_funcionario, models.Advance.mes_referencia, func.sum(models.Advance.valor))
+            .where(models.Advance.mes_referencia >= "2026-01", models.Advance.mes_referencia <= "2026-12")
+            .group_by(models.Advance.id_funcionario, models.Advance.mes_referencia),
+            "ix_adiantamentos_mes_funcionario",
+        ),
+    ]
+
+
+def explain(engine: Engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + str(compiled)).all()
+    # SQLite devolve (id, parent, notused, detail); os demais, uma coluna de texto
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def check_hot_queries(engine: Engine) -> list:
+    results = []
+    for nome, statement, index in hot_queries():
+        plan = explain(engine, statement)
+        results.append({"consulta": nome, "indice": index, "usa_indice": index in plan, "plano": plan})
+    return results
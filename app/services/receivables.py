@@ -0,0 +1,305 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, exists, func, insert, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core.text import prefix_upper_bound, search_key
+from app.services import rollups, versions
+from app.services.periods import in_period, period_bucket
+
+CENTAVOS = Decimal("0.01")
+
+
+def money(value) -> Decimal:
+    return Decimal(value or 0).quantize(CENTAVOS)
+
+
+def get_client_balances(db: Session, client_ids: Iterable[int]) -> Dict[int, Decimal]:
+    # Saldo devedor de vários clientes em uma única ida ao banco,
+    # somando o saldo em aberto mantido em cada venda.
+    client_ids = list(client_ids)
+    if not client_ids:
+        return {}
+
+    rows = (
+        db.query(models.Sale.id_cliente, func.sum(models.Sale.saldo_aberto))
+        .filter(
+            models.Sale.id_cliente.in_(client_ids),
+            models.Sale.status_pagamento != models.StatusPagamento.pago,
+        )
+        .group_by(models.Sale.id_cliente)
+        .all()
+    )
+    return {id_cliente: Decimal(saldo or 0).quantize(CENTAVOS) for id_cliente, saldo in rows}
+
+
+def opening_balance(valor_total, valor_pago) -> dict:
+    return {"valor_pago_total": valor_pago, "saldo_aberto": (valor_total or 0) - valor_pago}
+
+
+def apply_payment(sale: models.Sale, valor) -> None:
+    # Atualização relativa (SET col = col + x) para não perder pagamentos
+    # gravados em paralelo; valor negativo estorna um pagamento.
+    sale.valor_pago_total = models.Sale.valor_pago_total + valor
+    sale.saldo_aberto = models.Sale.saldo_aberto - valor
+
+
+def apply_total_change(sale: models.Sale, valor_total) -> None:
+    sale.valor_total = valor_total
+    sale.saldo_aberto = (valor_total or 0) - models.Sale.valor_pago_total
+
+
+def _paid_by_sale():
+    return (
+        select(func.coalesce(func.sum(models.SalePayment.valor_pago), 0))
+        .where(models.SalePayment.id_vendas == models.Sale.id_vendas)
+        .scalar_subquery()
+    )
+
+
+def find_balance_drift(db: Session) -> List[dict]:
+    # Vendas cujo total pago/saldo gravado não bate com a soma dos pagamentos
+    pago_real = _paid_by_sale()
+    rows = db.execute(
+        select(
+            models.Sale.id_vendas,
+            models.Sale.valor_total,
+            models.Sale.valor_pago_total,
+            models.Sale.saldo_aberto,
+            pago_real.label("pago_real"),
+        ).where(
+            (func.round(models.Sale.valor_pago_total, 2) != func.round(pago_real, 2))
+            | (
+                func.round(models.Sale.saldo_aberto, 2)
+                != func.round(func.coalesce(models.Sale.valor_total, 0) - pago_real, 2)
+            )
+        )
+    ).all()
+    return [
+        {
+            "id_vendas": row.id_vendas,
+            "valor_pago_total": row.valor_pago_total,
+            "saldo_aberto": row.saldo_aberto,
+            "valor_pago_real": Decimal(row.pago_real).quantize(CENTAVOS),
+            "saldo_real": (Decimal(row.valor_total or 0) - Decimal(row.pago_real)).quantize(CENTAVOS),
+        }
+        for row in rows
+    ]
+
+
+def reconcile_statement():
+    # Recalcula todas as vendas a partir de venda_pagamentos em um único UPDATE
+    pago_real = _paid_by_sale()
+    return models.Sale.__table__.update().values(
+        valor_pago_total=pago_real,
+        saldo_aberto=func.coalesce(models.Sale.valor_total, 0) - pago_real,
+    )
+
+
+def reconcile_sale_balances(db: Session) -> int:
+    result = db.execute(reconcile_statement())
+    versions.bump(db, "vendas")
+    db.commit()
+    return result.rowcount
+
+
+def _open_sales_of_client():
+    return exists().where(
+        models.Sale.id_cliente == models.Client.id_cliente,
+        models.Sale.status_pagamento != models.StatusPagamento.pago,
+        models.Sale.saldo_aberto > 0,
+    )
+
+
+def filter_clients(query, nome: Optional[str] = None, com_debito: Optional[bool] = None):
+    # Prefixo do nome pela faixa [chave, prefix_upper_bound(chave)) em nome_busca (usa o índice)
+    if nome:
+        key = search_key(nome)
+        query = query.filter(
+            models.Client.nome_busca >= key,
+            models.Client.nome_busca < prefix_upper_bound(key),
+        )
+    if com_debito is not None:
+        query = query.filter(_open_sales_of_client() if com_debito else ~_open_sales_of_client())
+    return query
+
+
+def filter_sales(
+    query,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    id_cliente: Optional[int] = None,
+    status_pagamento: Optional[models.StatusPagamento] = None,
+    forma_pagamento: Optional[models.FormaPagamento] = None,
+):
+    query = query.filter(*in_period(models.Sale.data_venda, data_inicio, data_fim))
+    if id_cliente is not None:
+        query = query.filter(models.Sale.id_cliente == id_cliente)
+    if status_pagamento is not None:
+        query = query.filter(models.Sale.status_pagamento == status_pagamento)
+    if forma_pagamento is not None:
+        query = query.filter(models.Sale.forma_pagamento == forma_pagamento)
+    return query
+
+
+def sales_summary(
+    db: Session,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    agrupamento: str = "dia",
+    limite_devedores: int = 10,
+) -> dict:
+    # Estatísticas do painel de recebíveis calculadas no banco (GROUP BY),
+    # sem trafegar as vendas para o navegador.
+    Sale = models.Sale
+    filtro_vendas = in_period(Sale.data_venda, data_inicio, data_fim)
+
+    por_status = (
+        db.query(
+            Sale.status_pagamento,
+            func.count(Sale.id_vendas),
+            func.coalesce(func.sum(Sale.valor_total), 0),
+            func.coalesce(func.sum(Sale.valor_pago_total), 0),
+            func.coalesce(func.sum(Sale.saldo_aberto), 0),
+        )
+        .filter(*filtro_vendas)
+        .group_by(Sale.status_pagamento)
+        .all()
+    )
+
+    # Recebimentos por forma: resumo diário + pagamentos de hoje
+    por_forma = rollups.receipts(db, data_inicio, data_fim)["por_forma_pagamento"]
+
+    bucket = period_bucket(db, Sale.data_venda, agrupamento).label("periodo")
+    por_periodo = (
+        db.query(
+            bucket,
+            func.count(Sale.id_vendas),
+            func.coalesce(func.sum(Sale.valor_total), 0),
+            func.coalesce(func.sum(Sale.saldo_aberto), 0),
+        )
+        .filter(*filtro_vendas)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+
+    saldo_cliente = func.sum(Sale.saldo_aberto).label("saldo_devedor")
+    devedores = (
+        db.query(models.Client.id_cliente, models.Client.nome, saldo_cliente)
+        .join(Sale, Sale.id_cliente == models.Client.id_cliente)
+        .filter(Sale.status_pagamento != models.StatusPagamento.pago, *filtro_vendas)
+        .group_by(models.Client.id_cliente, models.Client.nome)
+        .having(saldo_cliente > 0)
+        .order_by(saldo_cliente.desc())
+        .limit(limite_devedores)
+        .all()
+    )
+
+    totais = {chave: money(0) for chave in ("total", "pago", "pendente", "parcial", "a_receber")}
+    status_rows = []
+    for status, quantidade, valor_total, valor_pago, saldo in por_status:
+        status_rows.append({
+            "status_pagamento": status,
+            "quantidade": quantidade,
+            "valor_total": money(valor_total),
+            "valor_pago": money(valor_pago),
+            "saldo_aberto": money(saldo),
+        })
+        totais["total"] += money(valor_total)
+        if status == models.StatusPagamento.pago:
+            totais["pago"] += money(valor_total)
+        else:
+            totais["a_receber"] += money(saldo)
+            if status == models.StatusPagamento.pendente:
+                totais["pendente"] += money(valor_total)
+            elif status == models.StatusPagamento.parcial:
+                totais["parcial"] += money(saldo)
+
+    return {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "totais": totais,
+        "por_status": status_rows,
+        "por_forma_pagamento": por_forma,
+        "por_periodo": [
+            {"periodo": periodo, "quantidade": quantidade, "valor_total": money(valor_total), "saldo_aberto": money(saldo)}
+            for periodo, quantidade, valor_total, saldo in por_periodo
+        ],
+        "maiores_devedores": [
+            {"id_cliente": id_cliente, "nome": nome, "saldo_devedor": money(saldo)}
+            for id_cliente, nome, saldo in devedores
+        ],
+    }
+
+
+def plan_fifo_settlement(db: Session, client_id: int, valor_total: Decimal) -> List[dict]:
+    # Distribui um recebimento pelas vendas em aberto do cliente, das mais
+    # antigas para as mais novas. O saldo acumulado (janela ordenada por
+    # data_venda) deixa o banco devolver só as vendas que o valor alcança.
+    Sale = models.Sale
+    acumulado = func.sum(Sale.saldo_aberto).over(order_by=(Sale.data_venda, Sale.id_vendas))
+    abertas = (
+        select(Sale.id_vendas, Sale.data_venda, Sale.saldo_aberto, acumulado.label("acumulado"))
+        .where(
+            Sale.id_cliente == client_id,
+            Sale.status_pagamento != models.StatusPagamento.pago,
+            Sale.saldo_aberto > 0,
+        )
+        .subquery()
+    )
+    rows = db.execute(
+        select(abertas.c.id_vendas, abertas.c.saldo_aberto, abertas.c.acumulado)
+        .where(abertas.c.acumulado - abertas.c.saldo_aberto < valor_total)
+        .order_by(abertas.c.data_venda, abertas.c.id_vendas)
+    ).all()
+
+    plan = []
+    for id_vendas, saldo, acumulado_venda in rows:
+        saldo = Decimal(saldo).quantize(CENTAVOS)
+        anterior = Decimal(acumulado_venda).quantize(CENTAVOS) - saldo
+        amount = min(saldo, valor_total - anterior)
+        if amount <= 0:
+            continue
+        plan.append({
+            "sale_id": id_vendas,
+            "amount": amount,
+            "status": models.StatusPagamento.pago if amount >= saldo else models.StatusPagamento.parcial,
+        })
+    return plan
+
+
+def apply_settlement(db: Session, plan: List[dict], forma_pagamento, observacao: Optional[str]) -> None:
+    # Pagamentos em um INSERT executemany e saldos/status em um UPDATE
+    # executemany relativo (col = col + x), sem carregar as vendas na sessão.
+    if not plan:
+        return
+    rows = [
+        {
+            "id_vendas": entry["sale_id"],
+            "valor_pago": entry["amount"],
+            "forma_pagamento": forma_pagamento,
+            "observacao": observacao,
+        }
+        for entry in plan
+    ]
+    # Ids dos pagamentos para os resumos (RETURNING quando o banco aceita em executemany)
+    statement = insert(models.SalePayment)
+    if db.get_bind().dialect.insert_executemany_returning:
+        payment_ids = db.execute(statement.returning(models.SalePayment.id_venda_pagamento), rows).scalars().all()
+    else:
+        payment_ids = [db.execute(statement, row).inserted_primary_key[0] for row in rows]
+    rollups.payments_changed(db, payment_ids)
+    vendas = models.Sale.__table__
+    db.execute(
+        vendas.update()
+        .where(vendas.c.id_vendas == bindparam("b_id"))
+        .values(
+            valor_pago_total=vendas.c.valor_pago_total + bindparam("b_amount", type_=vendas.c.valor_pago_total.type),
+            saldo_aberto=vendas.c.saldo_aberto - bindparam("b_amount", type_=vendas.c.saldo_aberto.type),
+            status_pagamento=bindparam("b_status", type_=vendas.c.status_pagamento.type),
+        ),
+        [{"b_id": e["sale_id"], "b_amount": e["amount"], "b_status": e["status"]} for e in plan],
+    )
+    versions.bump(db, "vendas")
@@ -0,0 +1,336 @@
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Integer, String, cast, delete, func, insert, literal_column, select, union_all
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import models
+from app.services import receivables
+from app.services.periods import in_period, period_bucket
+
+# Resumos das vendas (resumo_dia_forma, resumo_dia_produto, resumo_mes_cliente).
+# Cada gravação de venda ou pagamento soma (ou, antes de alterar/excluir,
+# subtrai) a sua parte nas linhas afetadas com INSERT ... ON CONFLICT DO UPDATE
+# relativo (col = col + x), calculada no banco a partir das próprias linhas.
+# Os relatórios leem os resumos dos períodos fechados e só o período corrente
+# (o dia ou o mês de hoje) das tabelas de vendas.
+
+Sale, SaleItem, SalePayment = models.Sale, models.SaleItem, models.SalePayment
+
+
+def _payment_rows(db: Session, *conditions):
+    return select(
+        period_bucket(db, SalePayment.data_pagamento, "dia").label("dia"),
+        func.coalesce(cast(SalePayment.forma_pagamento, String), "").label("forma_pagamento"),
+        literal_column("1").label("quantidade"),
+        func.coalesce(SalePayment.valor_pago, 0).label("valor"),
+    ).where(*conditions)
+
+
+def _item_rows(db: Session, *conditions):
+    return (
+        select(
+            period_bucket(db, Sale.data_venda, "dia").label("dia"),
+            func.coalesce(SaleItem.id_produto, 0).label("id_produto"),
+            literal_column("1").label("itens"),
+            func.coalesce(SaleItem.qtde, 0).label("qtde"),
+            func.coalesce(SaleItem.subtotal, 0).label("valor"),
+        )
+        .join(Sale, Sale.id_vendas == SaleItem.id_vendas)
+        .where(*conditions)
+    )
+
+
+def _client_sale_rows(db: Session, *conditions):
+    return select(
+        period_bucket(db, Sale.data_venda, "mes").label("mes"),
+        func.coalesce(Sale.id_cliente, 0).label("id_cliente"),
+        literal_column("1").label("vendas"),
+        func.coalesce(Sale.valor_total, 0).label("valor_total"),
+        literal_column("0").label("valor_recebido"),
+    ).where(*conditions)
+
+
+def _client_payment_rows(db: Session, *conditions):
+    return (
+        select(
+            period_bucket(db, SalePayment.data_pagamento, "mes").label("mes"),
+            func.coalesce(Sale.id_cliente, 0).label("id_cliente"),
+            literal_column("0").label("vendas"),
+            literal_column("0").label("valor_total"),
+            func.coalesce(SalePayment.valor_pago, 0).label("valor_recebido"),
+        )
+        .join(Sale, Sale.id_vendas == SalePayment.id_vendas)
+        .where(*conditions)
+    )
+
+
+class Part(NamedTuple):
+    # Linhas (uma por registro de origem) com as colunas do resumo
+    rows: Callable
+    # Data que define o dia/mês da linha
+    data: object
+    # Id da venda e do pagamento de origem, para recalcular só o que mudou
+    venda: object
+    pagamento: Optional[object] = None
+
+
+class Rollup(NamedTuple):
+    model: type
+    periodo: str
+    keys: Tuple[str, ...]
+    measures: Tuple[str, ...]
+    parts: Tuple[Part, ...]
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    def key(self, dia: date) -> str:
+        return dia.isoformat() if self.periodo == "dia" else dia.strftime("%Y-%m")
+
+
+ROLLUPS: Dict[str, Rollup] = {
+    "resumo_dia_forma": Rollup(
+        models.DailyPaymentRollup, "dia", ("dia", "forma_pagamento"), ("quantidade", "valor"),
+        (Part(_payment_rows, SalePayment.data_pagamento, SalePayment.id_vendas, SalePayment.id_venda_pagamento),),
+    ),
+    "resumo_dia_produto": Rollup(
+        models.DailyProductRollup, "dia", ("dia", "id_produto"), ("itens", "qtde", "valor"),
+        (Part(_item_rows, Sale.data_venda, SaleItem.id_vendas),),
+    ),
+    "resumo_mes_cliente": Rollup(
+        models.MonthlyClientRollup, "mes", ("mes", "id_cliente"), ("vendas", "valor_total", "valor_recebido"),
+        (
+            Part(_client_sale_rows, Sale.data_venda, Sale.id_vendas),
+            Part(_client_payment_rows, SalePayment.data_pagamento, SalePayment.id_vendas, SalePayment.id_venda_pagamento),
+        ),
+    ),
+}
+
+
+def _grouped(rollup: Rollup, selects: list):
+    rows = (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+    keys = [rows.c[key] for key in rollup.keys]
+    return select(*keys, *[func.sum(rows.c[m]).label(m) for m in rollup.measures]).group_by(*keys)
+
+
+def _upsert_add(db: Session, rollup: Rollup, rows: List[dict]) -> None:
+    table = rollup.table
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update({m: table.c[m] + statement.inserted[m] for m in rollup.measures})
+    else:
+        statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(rollup.keys),
+            set_={m: table.c[m] + statement.excluded[m] for m in rollup.measures},
+        )
+    db.execute(statement, rows)
+
+
+def _add(db: Session, rollup: Rollup, selects: list, sinal: int) -> None:
+    if not selects:
+        return
+    # Objetos ainda pendentes na sessão (ex.: pagamento de entrada) entram na conta
+    db.flush()
+    rows = [
+        {**{key: row[key] for key in rollup.keys}, **{m: sinal * (row[m] or 0) for m in rollup.measures}}
+        for row in db.execute(_grouped(rollup, selects)).mappings()
+    ]
+    if rows:
+        _upsert_add(db, rollup, rows)
+
+
+def sales_changed(db: Session, sale_ids: Iterable[int], sinal: int = 1) -> None:
+    # Venda inteira (cabeçalho, itens e pagamentos): sinal -1 antes de
+    # alterar/excluir, +1 depois de gravar. Sem commit.
+    sale_ids = list(sale_ids)
+    if not sale_ids:
+        return
+    for rollup in ROLLUPS.values():
+        _add(db, rollup, [part.rows(db, part.venda.in_(sale_ids)) for part in rollup.parts], sinal)
+
+
+def payments_changed(db: Session, payment_ids: Iterable[int], sinal: int = 1) -> None:
+    payment_ids = list(payment_ids)
+    if not payment_ids:
+        return
+    for rollup in ROLLUPS.values():
+        selects = [part.rows(db, part.pagamento.in_(payment_ids)) for part in rollup.parts if part.pagamento is not None]
+        _add(db, rollup, selects, sinal)
+
+
+def rebuild(db: Session, desde: Optional[date] = None) -> Dict[str, int]:
+    # Recalcula os resumos a partir de `desde` (ou todos) em INSERT ... SELECT. Sem commit.
+    counts = {}
+    for name, rollup in ROLLUPS.items():
+        table = rollup.table
+        inicio = desde if desde is None or rollup.periodo == "dia" else desde.replace(day=1)
+        deletion = delete(table)
+        if inicio:
+            deletion = deletion.where(table.c[rollup.keys[0]] >= rollup.key(inicio))
+        db.execute(deletion)
+        selects = [part.rows(db, *([part.data >= inicio] if inicio else [])) for part in rollup.parts]
+        result = db.execute(insert(table).from_select(list(rollup.keys + rollup.measures), _grouped(rollup, selects)))
+        counts[name] = result.rowcount
+    return counts
+
+
+def find_drift(db: Session) -> List[dict]:
+    # Linhas dos resumos que não batem com o que rebuild() gravaria
+    # (linhas zeradas, que sobram depois de subtrair uma venda, são ignoradas)
+    drift = []
+    for name, rollup in ROLLUPS.items():
+        table = rollup.table
+        inteiros = {m for m in rollup.measures if isinstance(table.c[m].type, Integer)}
+
+        def totals(rows):
+            result = {}
+            for row in rows:
+                values = tuple(int(row[m] or 0) if m in inteiros else receivables.money(row[m]) for m in rollup.measures)
+                if any(values):
+                    result[tuple(str(row[key]) for key in rollup.keys)] = values
+            return result
+
+        gravado = totals(db.execute(select(table)).mappings())
+        real = totals(db.execute(_grouped(rollup, [part.rows(db) for part in rollup.parts])).mappings())
+        for key in sorted(gravado.keys() | real.keys()):
+            if gravado.get(key) != real.get(key):
+                drift.append({
+                    "tabela": name,
+                    "chave": dict(zip(rollup.keys, key)),
+                    "gravado": dict(zip(rollup.measures, gravado.get(key, ()))),
+                    "real": dict(zip(rollup.measures, real.get(key, ()))),
+                })
+    return drift
+
+
+def period_rows(db: Session, rollup: Rollup, inicio: Optional[date], fim: Optional[date], hoje: Optional[date] = None):
+    # Linhas do resumo até o período anterior ao corrente + linhas das vendas
+    # do período corrente (dia ou mês de hoje), com as mesmas colunas
+    hoje = hoje or date.today()
+    corte = hoje if rollup.periodo == "dia" else hoje.replace(day=1)
+    table = rollup.table
+    key = table.c[rollup.keys[0]]
+    conditions = [key < rollup.key(corte)]
+    if inicio:
+        conditions.append(key >= rollup.key(inicio))
+    if fim:
+        conditions.append(key <= rollup.key(fim))
+    selects = [select(*[table.c[column] for column in rollup.keys + rollup.measures]).where(*conditions)]
+    if fim is None or fim >= corte:
+        desde = max(corte, inicio) if inicio else corte
+        selects += [part.rows(db, part.data >= desde, *in_period(part.data, None, fim)) for part in rollup.parts]
+    return union_all(*selects).subquery()
+
+
+def _forma(value: str) -> Optional[models.FormaPagamento]:
+    return models.FormaPagamento[value] if value else None
+
+
+def receipts(db: Session, data_inicio: Optional[date] = None, data_fim: Optional[date] = None, agrupamento: str = "dia") -> dict:
+    # Recebimentos por forma de pagamento e por período (dia ou mês do pagamento)
+    rows = period_rows(db, ROLLUPS["resumo_dia_forma"], data_inicio, data_fim)
+    periodo = rows.c.dia if agrupamento == "dia" else func.substr(rows.c.dia, 1, 7)
+    grouped = db.execute(
+        select(periodo, rows.c.forma_pagamento, func.sum(rows.c.quantidade), func.sum(rows.c.valor))
+        .group_by(periodo, rows.c.forma_pagamento)
+        .order_by(periodo, rows.c.forma_pagamento)
+    ).all()
+
+    por_forma: Dict[str, list] = {}
+    por_periodo = []
+    for periodo_linha, forma, quantidade, valor in grouped:
+        valor = receivables.money(valor)
+        por_periodo.append({
+            "periodo": periodo_linha,
+            "forma_pagamento": _forma(forma),
+            "quantidade": int(quantidade),
+            "valor_recebido": valor,
+        })
+        total = por_forma.setdefault(forma, [0, receivables.money(0)])
+        total[0] += int(quantidade)
+        total[1] += valor
+    return {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "por_forma_pagamento": [
+            {"forma_pagamento": _forma(forma), "quantidade": quantidade, "valor_recebido": valor}
+            for forma, (quantidade, valor) in sorted(por_forma.items())
+        ],
+        "por_periodo": por_periodo,
+    }
+
+
+def _month_bounds(mes_inicio: Optional[str], mes_fim: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+    # 'YYYY-MM' -> primeiro dia do mês inicial e último dia do mês final
+    inicio = date.fromisoformat(f"{mes_inicio}-01") if mes_inicio else None
+    fim = None
+    if mes_fim:
+        primeiro = date.fromisoformat(f"{mes_fim}-01")
+        fim = (primeiro + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return inicio, fim
+
+
+def monthly_revenue(db: Session, mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> List[dict]:
+    rows = period_rows(db, ROLLUPS["resumo_mes_cliente"], *_month_bounds(mes_inicio, mes_fim))
+    grouped = db.execute(
+        select(rows.c.mes, func.sum(rows.c.vendas), func.sum(rows.c.valor_total), func.sum(rows.c.valor_recebido))
+        .group_by(rows.c.mes)
+        .order_by(rows.c.mes)
+    ).all()
+    return [
+        {"mes": mes, "vendas": int(vendas), "valor_total": receivables.money(total), "valor_recebido": receivables.money(recebido)}
+        for mes, vendas, total, recebido in grouped
+    ]
+
+
+def top_clients(db: Session, mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None, limite: int = 20) -> List[dict]:
+    rows = period_rows(db, ROLLUPS["resumo_mes_cliente"], *_month_bounds(mes_inicio, mes_fim))
+    valor_total = func.sum(rows.c.valor_total)
+    grouped = db.execute(
+        select(rows.c.id_cliente, func.sum(rows.c.vendas), valor_total, func.sum(rows.c.valor_recebido))
+        .group_by(rows.c.id_cliente)
+        .order_by(valor_total.desc(), rows.c.id_cliente)
+        .limit(limite)
+    ).all()
+    ids = [id_cliente for id_cliente, *_ in grouped]
+    nomes = dict(db.execute(
+        select(models.Client.id_cliente, models.Client.nome).where(models.Client.id_cliente.in_(ids))
+    ).all()) if ids else {}
+    return [
+        {
+            "id_cliente": id_cliente or None,
+            "nome": nomes.get(id_cliente),
+            "vendas": int(vendas),
+            "valor_total": receivables.money(total),
+            "valor_recebido": receivables.money(recebido),
+        }
+        for id_cliente, vendas, total, recebido in grouped
+    ]
+
+
+def top_products(db: Session, data_inicio: Optional[date] = None, data_fim: Optional[date] = None, limite: int = 20) -> List[dict]:
+    rows = period_rows(db, ROLLUPS["resumo_dia_produto"], data_inicio, data_fim)
+    valor = func.sum(rows.c.valor)
+    grouped = db.execute(
+        select(rows.c.id_produto, func.sum(rows.c.itens), func.sum(rows.c.qtde), valor)
+        .group_by(rows.c.id_produto)
+        .order_by(valor.desc(), rows.c.id_produto)
+        .limit(limite)
+    ).all()
+    ids = [id_produto for id_produto, *_ in grouped]
+    nomes = dict(db.execute(
+        select(models.Product.id_produto, models.Product.nome).where(models.Product.id_produto.in_(ids))
+    ).all()) if ids else {}
+    return [
+        {
+            "id_produto": id_produto,
+            "nome": nomes.get(id_produto),
+            "itens": int(itens),
+            "qtde": receivables.money(qtde),
+            "valor": receivables.money(total),
+        }
+        for id_produto, itens, qtde, total in grouped
+    ]
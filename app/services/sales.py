@@ -0,0 +1,223 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.services import loading, receivables, rollups, versions
+from app.services.catalog import fetch_prices
+
+
+def price_items(
+    items: Iterable[schemas.SaleItemCreate],
+    prices: Dict[int, Decimal],
+) -> Tuple[List[dict], Decimal, List[int]]:
+    # Usa o valor enviado ou o preço atual do produto. Devolve as linhas de
+    # venda_itens, o total calculado e os produtos que não existem.
+    itens_processados = []
+    total_calculado = Decimal(0)
+    missing = []
+    for item in items or []:
+        if item.id_produto not in prices:
+            missing.append(item.id_produto)
+        v_unitario = item.valor_unitario if item.valor_unitario is not None else prices.get(item.id_produto, 0)
+        subtotal = item.qtde * v_unitario
+        total_calculado += subtotal
+        itens_processados.append({
+            "id_produto": item.id_produto,
+            "qtde": item.qtde,
+            "valor_unitario": v_unitario,
+            "subtotal": subtotal,
+        })
+    return itens_processados, total_calculado, missing
+
+
+def initial_payment_amount(status_pagamento, valor_total, valor_entrada) -> Decimal:
+    if status_pagamento == models.StatusPagamento.pago:
+        return valor_total
+    if valor_entrada and valor_entrada > 0:
+        return valor_entrada
+    return Decimal(0)
+
+
+def sale_values(sale_in: schemas.SaleCreate, total_calculado: Decimal) -> Tuple[dict, Decimal]:
+    # Colunas de vendas para o pedido e o valor do pagamento inicial
+    sale_data = sale_in.dict(exclude={"itens", "valor_entrada"})
+    if sale_data.get("data_venda") is None:
+        sale_data.pop("data_venda", None)
+    # Se valor_total for None ou 0, usa o calculado
+    final_total = sale_data.get("valor_total") or total_calculado
+    sale_data["valor_total"] = final_total
+
+    amount_to_record = initial_payment_amount(sale_data.get("status_pagamento"), final_total, sale_in.valor_entrada)
+    sale_data.update(receivables.opening_balance(final_total, amount_to_record))
+    return sale_data, amount_to_record
+
+
+def initial_payment_values(sale_id: int, amount, forma_pagamento) -> dict:
+    return {
+        "id_vendas": sale_id,
+        "valor_pago": amount,
+        "forma_pagamento": forma_pagamento,
+        "observacao": "Pagamento inicial / Entrada",
+    }
+
+
+def add_sale(
+    db: Session,
+    sale_in: schemas.SaleCreate,
+    itens_processados: List[dict],
+    total_calculado: Decimal,
+) -> models.Sale:
+    # Grava cabeçalho, itens (executemany) e entrada na transação corrente,
+    # sem commit: quem chama decide o limite da transação.
+    sale_data, amount_to_record = sale_values(sale_in, total_calculado)
+    sale = models.Sale(**sale_data)
+    db.add(sale)
+    db.flush()
+
+    add_items(db, sale.id_vendas, itens_processados)
+    if amount_to_record > 0:
+        db.add(models.SalePayment(**initial_payment_values(sale.id_vendas, amount_to_record, sale.forma_pagamento)))
+    rollups.sales_changed(db, [sale.id_vendas])
+    return sale
+
+
+def add_items(db: Session, sale_id: int, itens_processados: List[dict]) -> None:
+    if itens_processados:
+        db.execute(
+            insert(models.SaleItem),
+            [dict(item, id_vendas=sale_id) for item in itens_processados],
+        )
+        versions.bump(db, "venda_itens")
+
+
+def get_sale(db: Session, sale_id: int) -> Optional[models.Sale]:
+    query = loading.load_for(db.query(models.Sale), schemas.Sale)
+    return query.filter(models.Sale.id_vendas == sale_id).first()
+
+
+BATCH_CHUNK_SIZE = 500
+
+
+def _existing_keys(db: Session, keys: List[str]) -> Dict[str, int]:
+    rows = (
+        db.query(models.Sale.chave_idempotencia, models.Sale.id_vendas)
+        .filter(models.Sale.chave_idempotencia.in_(keys))
+        .all()
+    )
+    return dict(rows)
+
+
+def _existing_clients(db: Session, client_ids: List[int]) -> set:
+    if not client_ids:
+        return set()
+    rows = db.query(models.Client.id_cliente).filter(models.Client.id_cliente.in_(set(client_ids))).all()
+    return {id_cliente for id_cliente, in rows}
+
+
+def _fail(results: Dict[str, dict], venda: schemas.SaleBatchItem, erro: str) -> None:
+    results[venda.chave_idempotencia] = {"chave_idempotencia": venda.chave_idempotencia, "status": "erro", "erro": erro}
+
+
+def _import_chunk(db: Session, chunk: List[schemas.SaleBatchItem], results: Dict[str, dict]) -> None:
+    keys = [venda.chave_idempotencia for venda in chunk]
+    for key, sale_id in _existing_keys(db, keys).items():
+        results[key] = {"chave_idempotencia": key, "status": "duplicada", "id_vendas": sale_id}
+
+    pending = [venda for venda in chunk if venda.chave_idempotencia not in results]
+    if not pending:
+        return
+
+    prices = fetch_prices(db, [item.id_produto for venda in pending for item in venda.itens or []])
+    clients = _existing_clients(db, [venda.id_cliente for venda in pending if venda.id_cliente is not None])
+    headers, items_by_key, payments_by_key = [], {}, {}
+    for venda in pending:
+        itens_processados, total_calculado, missing = price_items(venda.itens, prices)
+        if missing:
+            _fail(results, venda, f"Produto com ID {missing[0]} não encontrado")
+            continue
+        if venda.id_cliente is not None and venda.id_cliente not in clients:
+            _fail(results, venda, f"Cliente com ID {venda.id_cliente} não encontrado")
+            continue
+        sale_data, amount_to_record = sale_values(venda, total_calculado)
+        headers.append(sale_data)
+        items_by_key[venda.chave_idempotencia] = itens_processados
+        if amount_to_record > 0:
+            payments_by_key[venda.chave_idempotencia] = (amount_to_record, sale_data.get("forma_pagamento"))
+
+    if not headers:
+        return
+
+    # Cabeçalhos em executemany; os ids gerados voltam por uma consulta pela chave
+    db.execute(insert(models.Sale), headers)
+    ids = _existing_keys(db, list(items_by_key))
+
+    item_rows = [
+        dict(item, id_vendas=ids[key])
+        for key, itens_processados in items_by_key.items()
+        for item in itens_processados
+    ]
+    if item_rows:
+        db.execute(insert(models.SaleItem), item_rows)
+    payment_rows = [
+        initial_payment_values(ids[key], amount, forma)
+        for key, (amount, forma) in payments_by_key.items()
+    ]
+    if payment_rows:
+        db.execute(insert(models.SalePayment), payment_rows)
+    rollups.sales_changed(db, [ids[key] for key in items_by_key])
+    versions.bump(db, "vendas")
+
+    for key in items_by_key:
+        results[key] = {"chave_idempotencia": key, "status": "criada", "id_vendas": ids[key]}
+
+
+def import_sales(db: Session, vendas: List[schemas.SaleBatchItem], chunk_size: int = BATCH_CHUNK_SIZE) -> dict:
+    # Importa vendas feitas offline no PDV. Cada lote de `chunk_size` vendas
+    # é uma transação; chaves já gravadas (ou repetidas no próprio envio) são
+    # devolvidas como "duplicada", então o PDV pode reenviar tudo com segurança.
+    results: Dict[str, dict] = {}
+    unique, seen = [], set()
+    for venda in vendas:
+        if venda.chave_idempotencia not in seen:
+            seen.add(venda.chave_idempotencia)
+            unique.append(venda)
+
+    for start in range(0, len(unique), chunk_size):
+        chunk = unique[start:start + chunk_size]
+        try:
+            _import_chunk(db, chunk, results)
+            db.commit()
+        except IntegrityError:
+            # Outro envio gravou alguma destas chaves ao mesmo tempo:
+            # refaz o lote, que agora as encontra como duplicadas.
+            db.rollback()
+            for venda in chunk:
+                results.pop(venda.chave_idempotencia, None)
+            try:
+                _import_chunk(db, chunk, results)
+                db.commit()
+            except IntegrityError:
+                # Não era concorrência: as vendas do lote que iam ser criadas
+                # voltam como erro e os lotes seguintes continuam
+                db.rollback()
+                for venda in chunk:
+                    if results.get(venda.chave_idempotencia, {}).get("status") in (None, "criada"):
+                        _fail(results, venda, "Venda não gravada: erro de integridade no lote")
+
+    # Chaves repetidas no mesmo envio apontam para a venda criada pela primeira
+    resultados, reported = [], set()
+    for venda in vendas:
+        result = dict(results[venda.chave_idempotencia])
+        if venda.chave_idempotencia in reported and result["status"] == "criada":
+            result["status"] = "duplicada"
+        reported.add(venda.chave_idempotencia)
+        resultados.append(result)
+
+    return {
+        "criadas": sum(1 for r in resultados if r["status"] == "criada"),
+        "duplicadas": sum(1 for r in resultados if r["status"] == "duplicada"),
+        "erros": sum(1 for r in resultados if r["status"] == "erro"),
+        "resultados": resultados,
+    }
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import models
+from app.core import security
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.services import cashflow, rollups, sync
+
+# Tarefas periódicas executadas dentro da aplicação (iniciadas no startup de
+# app/main.py). As exclusivas rodam em um worker por vez: a cada ciclo os
+# workers tentam pegar a tarefa com um UPDATE condicional em
+# tarefas_agendadas (dono + prazo em expira_em) e só quem conseguiu executa.
+# A próxima execução fica na mesma linha e vale para todos os workers.
+# As locais (caches em memória do processo) rodam em todo worker.
+
+logger = logging.getLogger(__name__)
+
+Jobs = models.ScheduledJob.__table__
+
+
+class JobNotRegistered(Exception):
+    # A linha da tarefa exclusiva não existe em tarefas_agendadas nem pôde ser criada
+    pass
+
+
+class Job(NamedTuple):
+    nome: str
+    intervalo: timedelta
+    # Executa a tarefa e devolve um resumo do que foi feito
+    executar: Callable[[Session], str]
+    exclusiva: bool = True
+
+
+def _mark_overdue_payables(db: Session) -> str:
+    return f"{cashflow.mark_overdue_payables(db)} conta(s) com status atualizado"
+
+
+def _warm_daily_aggregates(db: Session) -> str:
+    # Vencimentos e projeção do caixa do dia já em cache antes da primeira consulta
+    cashflow.payables_aging(db)
+    cashflow.cash_flow(db)
+    return "vencimentos e projeção do caixa calculados"
+
+
+def _rebuild_recent_rollups(db: Session) -> str:
+    # Refaz os resumos de ontem em diante (e o mês corrente), corrigindo
+    # qualquer diferença deixada por gravações concorrentes
+    counts = rollups.rebuild(db, date.today() - timedelta(days=1))
+    db.commit()
+    return ", ".join(f"{tabela}: {linhas}" for tabela, linhas in counts.items())
+
+
+def _prune_caches(db: Session) -> str:
+    removed = security.principal_cache.prune() + cashflow.cache.prune()
+    return f"{removed} entrada(s) expirada(s) removida(s)"
+
+
+def _prune_tombstones(db: Session) -> str:
+    return f"{sync.prune_tombstones(db)} exclusão(ões) antiga(s) removida(s)"
+
+
+JOBS: List[Job] = [
+    Job("contas_atrasadas", timedelta(hours=1), _mark_overdue_payables),
+    Job("agregados_diarios", timedelta(minutes=15), _warm_daily_aggregates, exclusiva=False),
+    Job("limpeza_caches", timedelta(minutes=5), _prune_caches, exclusiva=False),
+    Job("exclusoes_antigas", timedelta(days=1), _prune_tombstones),
+    Job("resumos_vendas", timedelta(hours=6), _rebuild_recent_rollups),
+]
+
+
+class Scheduler:
+    def __init__(self, jobs: List[Job], tick: float, lease: float):
+        self.jobs = {job.nome: job for job in jobs}
+        self.tick = tick
+        self.lease = timedelta(seconds=lease)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        # Execuções feitas neste processo (as exclusivas também ficam no banco)
+        self.local: Dict[str, dict] = {
+            job.nome: {"execucoes": 0, "falhas": 0, "proxima_execucao": None} for job in jobs
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _loop(self) -> None:
+        # Banco em uma thread do executor (asyncio.to_thread só existe a partir do Python 3.9)
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.seed)
+                break
+            except SQLAlchemyError:
+                logger.exception("Tarefas agendadas: banco indisponível")
+                await asyncio.sleep(self.tick)
+        while True:
+            for job in self.jobs.values():
+                try:
+                    await loop.run_in_executor(None, self.run, job.nome)
+                except (SQLAlchemyError, JobNotRegistered):
+                    logger.exception("Tarefa %s: falha ao obter a concessão", job.nome)
+            await asyncio.sleep(self.tick)
+
+    def seed(self) -> None:
+        # Uma linha por tarefa exclusiva; a primeira execução é no próximo ciclo
+        with engine.begin() as conn:
+            existing = set(conn.execute(select(Jobs.c.nome)).scalars())
+        missing = [
+            {"nome": job.nome, "proxima_execucao": datetime.utcnow()}
+            for job in self.jobs.values()
+            if job.exclusiva and job.nome not in existing
+        ]
+        for row in missing:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Jobs), row)
+            except IntegrityError:
+                # Outro worker criou a mesma linha
+                pass
+
+    def _registered(self, job: Job) -> bool:
+        with engine.begin() as conn:
+            return conn.execute(select(Jobs.c.nome).where(Jobs.c.nome == job.nome)).first() is not None
+
+    def _try_acquire(self, job: Job, agora: datetime, force: bool) -> bool:
+        conditions = [Jobs.c.nome == job.nome, or_(Jobs.c.expira_em.is_(None), Jobs.c.expira_em < agora)]
+        if not force:
+            conditions.append(or_(Jobs.c.proxima_execucao.is_(None), Jobs.c.proxima_execucao <= agora))
+        with engine.begin() as conn:
+            result = conn.execute(update(Jobs).where(*conditions).values(dono=self.worker, expira_em=agora + self.lease))
+        return result.rowcount == 1
+
+    def _acquire(self, job: Job, agora: datetime, force: bool) -> bool:
+        if self._try_acquire(job, agora, force):
+            return True
+        if self._registered(job):
+            return False
+        # Linha ainda não criada (agendador desligado ou antes do primeiro ciclo)
+        self.seed()
+        if not self._registered(job):
+            raise JobNotRegistered(job.nome)
+        return self._try_acquire(job, agora, force)
+
+    def _release(self, job: Job, run: dict) -> None:
+        with engine.begin() as conn:
+            conn.execute(
+                update(Jobs)
+                .where(Jobs.c.nome == job.nome, Jobs.c.dono == self.worker)
+                .values(
+                    dono=None,
+                    expira_em=None,
+                    proxima_execucao=run["proxima_execucao"],
+                    ultima_execucao=run["ultima_execucao"],
+                    ultima_duracao_ms=run["ultima_duracao_ms"],
+                    ultimo_status=run["ultimo_status"],
+                    ultimo_resultado=run["ultimo_resultado"],
+                    execucoes=Jobs.c.execucoes + 1,
+                    falhas=Jobs.c.falhas + (1 if run["ultimo_status"] == "erro" else 0),
+                )
+            )
+
+    def run(self, nome: str, force: bool = False) -> Optional[dict]:
+        # Executa a tarefa se estiver na hora (ou `force`); None se não executou
+        job = self.jobs[nome]
+        local = self.local[nome]
+        agora = datetime.utcnow()
+        if job.exclusiva:
+            if not self._acquire(job, agora, force):
+                return None
+        elif not force and local["proxima_execucao"] is not None and local["proxima_execucao"] > agora:
+            return None
+
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            status, resultado = "ok", job.executar(db)
+        except Exception as error:
+            db.rollback()
+            logger.exception("Tarefa %s falhou", nome)
+            status, resultado = "erro", f"{type(error).__name__}: {error}"
+        finally:
+            db.close()
+
+        run = {
+            "ultima_execucao": agora,
+            "ultima_duracao_ms": round((time.perf_counter() - start) * 1000, 1),
+            "ultimo_status": status,
+            "ultimo_resultado": resultado[:500],
+            "proxima_execucao": agora + job.intervalo,
+        }
+        local.update(run, execucoes=local["execucoes"] + 1, falhas=local["falhas"] + (status == "erro"))
+        if job.exclusiva:
+            self._release(job, run)
+        return run
+
+    def status(self, db: Session) -> dict:
+        shared = {row.nome: row._asdict() for row in db.execute(select(Jobs))}
+        tarefas = []
+        for job in self.jobs.values():
+            row = {"nome": job.nome, "exclusiva": job.exclusiva, "intervalo_segundos": int(job.intervalo.total_seconds())}
+            if job.exclusiva:
+                row.update(shared.get(job.nome, {}), neste_worker=self.local[job.nome]["execucoes"])
+            else:
+                row.update(self.local[job.nome], dono=None, expira_em=None)
+            tarefas.append(row)
+        return {"worker": self.worker, "ativo": self.running, "tarefas": tarefas}
+
+
+scheduler = Scheduler(JOBS, tick=settings.SCHEDULER_TICK_SECONDS, lease=settings.SCHEDULER_LEASE_SECONDS)
@@ -0,0 +1,227 @@
+import sqlite3
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core.config import settings
+from app.core.text import prefix_upper_bound, search_key
+from app.services import loading, receivables
+
+# Busca textual (GET /search) por trechos do nome, telefone ou email dos
+# clientes e do nome dos produtos. O índice depende do banco: FTS5 com
+# tokenizer trigram no SQLite (tabela virtual mantida por triggers) e pg_trgm
+# no PostgreSQL; nos demais, LIKE sem índice. Nomes são indexados pela coluna
+# nome_busca, já sem acentos e em minúsculas, e a consulta passa por search_key.
+
+# tabela: (chave, colunas indexadas, peso de cada coluna no ranking)
+INDEXED = {
+    "clientes": ("id_cliente", ("nome_busca", "telefone", "email"), (10.0, 5.0, 2.0)),
+    "produtos": ("id_produto", ("nome_busca",), (1.0,)),
+}
+
+MODELS = {
+    "clientes": (models.Client, schemas.ClientSearchResult),
+    "produtos": (models.Product, schemas.ProductSearchResult),
+}
+
+# Trechos menores que isso não usam o índice: vira busca por prefixo do nome
+MIN_TERM_LENGTH = 3
+
+
+def _escape_like(term: str) -> str:
+    # "!" como escape: "\\" tem significados diferentes entre os bancos
+    return term.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+class SearchBackend:
+    # LIKE '%trecho%' em cada coluna, sem índice (MySQL e bancos sem suporte)
+    name = "like"
+
+    def install(self, conn: Connection) -> None:
+        pass
+
+    def rebuild(self, conn: Connection) -> None:
+        pass
+
+    def search(self, db: Session, table: str, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        key, columns, _ = INDEXED[table]
+        params = {"limit": limit, "prefixo": _escape_like(terms[0]) + "%"}
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"t{i}"] = f"%{_escape_like(term)}%"
+            conditions.append(
+                "(" + " OR ".join(f"LOWER({column}) LIKE :t{i} ESCAPE '!'" for column in columns) + ")"
+            )
+        rows = db.execute(text(
+            f"SELECT {key}, CASE WHEN nome_busca LIKE :prefixo ESCAPE '!' THEN 1.0 ELSE 0.5 END AS relevancia"
+            f" FROM {table} WHERE {' AND '.join(conditions)}"
+            f" ORDER BY relevancia DESC, {key} LIMIT :limit"
+        ), params)
+        return [(row[0], float(row[1])) for row in rows]
+
+    def search_prefix(self, db: Session, table: str, key_text: str, limit: int) -> List[Tuple[int, float]]:
+        # Consultas curtas: faixa em nome_busca (índice B-tree em qualquer banco)
+        key = INDEXED[table][0]
+        rows = db.execute(text(
+            f"SELECT {key} FROM {table} WHERE nome_busca >= :inicio AND nome_busca < :fim"
+            f" ORDER BY nome_busca, {key} LIMIT :limit"
+        ), {"inicio": key_text, "fim": prefix_upper_bound(key_text), "limit": limit})
+        return [(row[0], 1.0) for row in rows]
+
+
+class Fts5Search(SearchBackend):
+    # Tabela FTS5 de conteúdo externo (não duplica os textos): triggers de
+    # insert/update/delete mantêm o índice; o ranking é o bm25 do SQLite.
+    # O tokenizer trigram (SQLite 3.34+) acha qualquer trecho com 3+ caracteres;
+    # sem ele, unicode61 busca por prefixo de palavra.
+    name = "fts5"
+    trigram = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+    def _statements(self, table: str) -> List[str]:
+        key, columns, _ = INDEXED[table]
+        fts = f"{table}_busca"
+        tokenizer = "trigram" if self.trigram else "unicode61 remove_diacritics 2"
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{column}" for column in columns)
+        old = ", ".join(f"old.{column}" for column in columns)
+        delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.{key}, {old});"
+        insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.{key}, {new});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{names}, content='{table}', content_rowid='{key}', tokenize='{tokenizer}')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+            # Só as colunas indexadas: atualizado_em e saldos não reindexam
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table}"
+            f" BEGIN {delete} {insert} END",
+        ]
+
+    def install(self, conn: Connection) -> None:
+        for table in INDEXED:
+            for statement in self._statements(table):
+                conn.exec_driver_sql(statement)
+        self.rebuild(conn)
+
+    def rebuild(self, conn: Connection) -> None:
+        for table in INDEXED:
+            conn.exec_driver_sql(f"INSERT INTO {table}_busca({table}_busca) VALUES ('rebuild')")
+
+    def search(self, db: Session, table: str, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        key, _, weights = INDEXED[table]
+        fts = f"{table}_busca"
+        suffix = "" if self.trigram else "*"
+        match = " ".join('"' + term.replace('"', '""') + '"' + suffix for term in terms)
+        bm25 = f"bm25({fts}, {', '.join(str(w) for w in weights)})"
+        rows = db.execute(text(
+            f"SELECT rowid, {bm25} AS rank FROM {fts} WHERE {fts} MATCH :consulta"
+            f" ORDER BY rank, rowid LIMIT :limit"
+        ), {"consulta": match, "limit": limit})
+        # bm25 é negativo (menor = melhor): a relevância exposta é o inverso
+        return [(row[0], -float(row[1])) for row in rows]
+
+
+class TrigramSearch(SearchBackend):
+    # pg_trgm: índice GIN sobre o texto concatenado atende ILIKE '%trecho%' e o
+    # ranking usa word_similarity. A expressão da consulta precisa ser idêntica
+    # à do índice.
+    name = "trigram"
+
+    def _document(self, table: str) -> str:
+        columns = INDEXED[table][1]
+        return "(" + " || ' ' || ".join(f"COALESCE(LOWER({column}), '')" for column in columns) + ")"
+
+    def install(self, conn: Connection) -> None:
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table in INDEXED:
+            conn.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_busca_trgm ON {table}"
+                f" USING gin ({self._document(table)} gin_trgm_ops)"
+            )
+
+    def rebuild(self, conn: Connection) -> None:
+        for table in INDEXED:
+            conn.exec_driver_sql(f"REINDEX INDEX ix_{table}_busca_trgm")
+
+    def search(self, db: Session, table: str, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        key = INDEXED[table][0]
+        document = self._document(table)
+        params = {"consulta": " ".join(terms), "limit": limit}
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"t{i}"] = f"%{_escape_like(term)}%"
+            conditions.append(f"{document} ILIKE :t{i} ESCAPE '!'")
+        rows = db.execute(text(
+            f"SELECT {key}, word_similarity(:consulta, {document}) AS relevancia FROM {table}"
+            f" WHERE {' AND '.join(conditions)} ORDER BY relevancia DESC, {key} LIMIT :limit"
+        ), params)
+        return [(row[0], float(row[1])) for row in rows]
+
+
+BACKENDS = {backend.name: backend for backend in (SearchBackend(), Fts5Search(), TrigramSearch())}
+DIALECT_BACKENDS = {"sqlite": "fts5", "postgresql": "trigram"}
+
+
+@lru_cache(maxsize=None)
+def _fts5_available() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(c)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def backend_for(bind) -> SearchBackend:
+    # SEARCH_BACKEND=auto escolhe pelo dialeto do banco
+    name = settings.SEARCH_BACKEND
+    if name == "auto":
+        name = DIALECT_BACKENDS.get(bind.dialect.name, "like")
+    if name == "fts5" and not _fts5_available():
+        name = "like"
+    return BACKENDS[name]
+
+
+def install(conn: Connection) -> None:
+    backend_for(conn).install(conn)
+
+
+def rebuild(conn: Connection) -> None:
+    backend_for(conn).rebuild(conn)
+
+
+def search(db: Session, consulta: str, tabelas: Sequence[str], limit: int) -> Dict[str, list]:
+    # Resultados por tabela, do mais para o menos relevante
+    key_text = search_key(consulta)
+    terms = [term for term in key_text.split() if len(term) >= MIN_TERM_LENGTH]
+    backend = backend_for(db.get_bind())
+    results: Dict[str, list] = {}
+    for table in tabelas:
+        if not key_text:
+            results[table] = []
+            continue
+        ranked = backend.search(db, table, terms, limit) if terms else backend.search_prefix(db, table, key_text, limit)
+        results[table] = _load(db, table, ranked)
+
+    clients = results.get("clientes", [])
+    balances = receivables.get_client_balances(db, [client.id_cliente for client in clients])
+    for client in clients:
+        client.saldo_devedor = balances.get(client.id_cliente, receivables.money(0))
+    return results
+
+
+def _load(db: Session, table: str, ranked: List[Tuple[int, float]]) -> list:
+    if not ranked:
+        return []
+    model, schema = MODELS[table]
+    key = INDEXED[table][0]
+    query = loading.load_for(db.query(model), schema).filter(getattr(model, key).in_([id for id, _ in ranked]))
+    by_id = {getattr(obj, key): obj for obj in query}
+    found = []
+    # Linha excluída depois da consulta ao índice: ignorada
+    for id_registro, relevancia in ranked:
+        obj = by_id.get(id_registro)
+        if obj is not None:
+            obj.relevancia = round(relevancia, 4)
+            found.append(obj)
+    return found
@@ -0,0 +1,221 @@
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, event, insert, inspect, or_, update
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core.config import settings
+from app.services import loading, pagination, receivables
+
+# Sincronização incremental do estado do frontend (GET /sync). Cada entidade
+# tem atualizado_em e cada exclusão deixa um registro em `exclusoes`. O token
+# é o instante da consulta anterior; como transações longas podem gravar um
+# atualizado_em anterior ao próprio commit, a busca recua SYNC_OVERLAP_SECONDS
+# e o cliente recebe algumas linhas repetidas (aplicar é idempotente).
+# As respostas vêm em páginas continuadas por `cursor`, tabela a tabela: o
+# estado completo (sem token) em ordem de id e o delta em ordem de
+# (atualizado_em, id). O token e as exclusões só vêm na última página; o token
+# é o instante da primeira, então o que mudou durante a cópia chega no próximo delta.
+
+# (chave na resposta, model, schema de resposta)
+SYNCED = (
+    ("categorias", models.Category, schemas.Category),
+    ("produtos", models.Product, schemas.Product),
+    ("clientes", models.Client, schemas.Client),
+    ("fornecedores", models.Supplier, schemas.Supplier),
+    ("funcionarios", models.Employee, schemas.Employee),
+    ("adiantamentos", models.Advance, schemas.Advance),
+    ("contas_pagar", models.AccountsPayable, schemas.AccountsPayable),
+    ("vendas", models.Sale, schemas.Sale),
+)
+
+_SYNCED_MODELS = {model: name for name, model, _ in SYNCED}
+
+# Itens e pagamentos vão dentro do registro pai: alterá-los atualiza o pai
+CHILDREN = {
+    models.SaleItem: (models.Sale, "id_vendas"),
+    models.SalePayment: (models.Sale, "id_vendas"),
+    models.AccountsPayableItem: (models.AccountsPayable, "id_contas_pagar"),
+}
+
+
+def _primary_key(model):
+    return inspect(model).primary_key[0]
+
+
+def encode_token(moment: datetime) -> str:
+    raw = json.dumps({"t": moment.isoformat()})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return datetime.fromisoformat(json.loads(raw)["t"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Token de sincronização inválido")
+
+
+class Cursor(NamedTuple):
+    # Instante da primeira página (vira o token), tabela atual (índice em
+    # SYNCED) e a última linha devolvida dela; `desde` só no delta
+    inicio: datetime
+    tabela: int = 0
+    ultimo_id: Optional[int] = None
+    ultimo_em: Optional[datetime] = None
+    desde: Optional[datetime] = None
+
+
+def _isoformat(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment else None
+
+
+def _fromisoformat(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = json.dumps({
+        "t": cursor.inicio.isoformat(),
+        "e": cursor.tabela,
+        "k": cursor.ultimo_id,
+        "a": _isoformat(cursor.ultimo_em),
+        "d": _isoformat(cursor.desde),
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        tabela, ultimo_id = int(raw["e"]), raw["k"]
+        if not 0 <= tabela < len(SYNCED) or not (ultimo_id is None or isinstance(ultimo_id, int)):
+            raise ValueError(cursor)
+        return Cursor(
+            datetime.fromisoformat(raw["t"]), tabela, ultimo_id, _fromisoformat(raw.get("a")), _fromisoformat(raw.get("d"))
+        )
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise pagination.invalid_cursor()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    agora = datetime.utcnow()
+    tombstones = []
+    parents = defaultdict(set)
+    for obj in session.deleted:
+        name = _SYNCED_MODELS.get(type(obj))
+        if name:
+            tombstones.append({
+                "tabela": name,
+                "id_registro": getattr(obj, _primary_key(type(obj)).key),
+                "excluido_em": agora,
+            })
+    for obj in session.new | session.dirty | session.deleted:
+        parent = CHILDREN.get(type(obj))
+        if parent and getattr(obj, parent[1]) is not None:
+            parents[parent[0]].add(getattr(obj, parent[1]))
+
+    for model, ids in parents.items():
+        session.connection().execute(
+            update(model.__table__).where(_primary_key(model).in_(ids)).values(atualizado_em=agora)
+        )
+    if tombstones:
+        session.connection().execute(insert(models.Tombstone), tombstones)
+
+
+def _with_balances(db: Session, clients: list) -> None:
+    balances = receivables.get_client_balances(db, [client.id_cliente for client in clients])
+    for client in clients:
+        client.saldo_devedor = balances.get(client.id_cliente, receivables.money(0))
+
+
+def _rows(db: Session, cursor: Cursor, indice: int, limite: int) -> list:
+    # Até `limite` linhas da tabela, depois da última linha do cursor
+    _, model, schema = SYNCED[indice]
+    key = _primary_key(model)
+    query = loading.load_for(db.query(model), schema)
+    continua = indice == cursor.tabela and cursor.ultimo_id is not None
+    if cursor.desde is None:
+        if continua:
+            query = query.filter(key > cursor.ultimo_id)
+        return query.order_by(key).limit(limite).all()
+    query = query.filter(model.atualizado_em >= cursor.desde)
+    if continua:
+        query = query.filter(or_(
+            model.atualizado_em > cursor.ultimo_em,
+            and_(model.atualizado_em == cursor.ultimo_em, key > cursor.ultimo_id),
+        ))
+    return query.order_by(model.atualizado_em, key).limit(limite).all()
+
+
+def page(db: Session, cursor: Cursor, limite: Optional[int] = None) -> dict:
+    # Uma página: até `limite` linhas, seguindo as tabelas na ordem de SYNCED
+    limite = limite or settings.SYNC_PAGE_SIZE
+    alteracoes: Dict[str, list] = {}
+    restante, proximo = limite, None
+    for indice in range(cursor.tabela, len(SYNCED)):
+        if restante == 0:
+            proximo = cursor._replace(tabela=indice, ultimo_id=None, ultimo_em=None)
+            break
+        name, model, _ = SYNCED[indice]
+        rows = _rows(db, cursor, indice, restante + 1)
+        if len(rows) > restante:
+            rows = rows[:restante]
+            ultimo = rows[-1]
+            proximo = cursor._replace(
+                tabela=indice, ultimo_id=getattr(ultimo, _primary_key(model).key), ultimo_em=ultimo.atualizado_em
+            )
+        alteracoes[name] = rows
+        restante -= len(rows)
+        if proximo:
+            break
+
+    clients = alteracoes.setdefault("clientes", [])
+    if cursor.desde is not None:
+        # O saldo devedor muda com as vendas: inclui os clientes das vendas alteradas
+        known = {client.id_cliente for client in clients}
+        extra = {sale.id_cliente for sale in alteracoes.get("vendas", []) if sale.id_cliente is not None} - known
+        if extra:
+            clients += db.query(models.Client).filter(models.Client.id_cliente.in_(extra)).all()
+    _with_balances(db, clients)
+
+    exclusoes: Dict[str, List[int]] = defaultdict(list)
+    if cursor.desde is not None and proximo is None:
+        rows = (
+            db.query(models.Tombstone.tabela, models.Tombstone.id_registro)
+            .filter(models.Tombstone.excluido_em >= cursor.desde)
+            .order_by(models.Tombstone.id_exclusao)
+            .all()
+        )
+        for tabela, id_registro in rows:
+            exclusoes[tabela].append(id_registro)
+
+    return {
+        "token": None if proximo else encode_token(cursor.inicio),
+        "cursor": encode_cursor(proximo) if proximo else None,
+        "completo": cursor.desde is None,
+        "alteracoes": alteracoes,
+        "exclusoes": dict(exclusoes),
+    }
+
+
+def changes_since(db: Session, since: Optional[datetime], limite: Optional[int] = None) -> dict:
+    # Primeira página do delta; sem token (ou com um token mais antigo que as
+    # exclusões guardadas), do estado completo
+    agora = datetime.utcnow()
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if since is None or since < agora - retention:
+        return page(db, Cursor(agora), limite)
+    return page(db, Cursor(agora, desde=since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)), limite)
+
+
+def prune_tombstones(db: Session) -> int:
+    # Clientes com token mais antigo que a retenção recebem o estado completo
+    limite = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.query(models.Tombstone).filter(models.Tombstone.excluido_em < limite).delete()
+    db.commit()
+    return result
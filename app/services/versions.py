@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+
+# Tabela -> contador em versoes_tabelas. Itens e pagamentos contam como
+# alteração da venda. Alterações feitas pelo ORM são contadas automaticamente
+# no flush; comandos Core (insert()/update() em lote) devem chamar bump() antes
+# do commit. O contador só sobe depois do commit, em uma transação curta à
+# parte: gravações concorrentes não ficam esperando pela mesma linha. Se essa
+# transação falhar, a tabela fica pendente no processo: é tentada de novo no
+# próximo commit ou leitura de versão e, enquanto isso, não responde 304.
+VERSIONED_TABLES = {
+    "categorias": "categorias",
+    "produtos": "produtos",
+    "clientes": "clientes",
+    "fornecedores": "fornecedores",
+    "funcionarios": "funcionarios",
+    "adiantamentos": "adiantamentos",
+    "contas_pagar": "contas_pagar",
+    "contas_pagar_itens": "contas_pagar",
+    "vendas": "vendas",
+    "venda_itens": "vendas",
+    "venda_pagamentos": "vendas",
+}
+
+_TOUCHED = "tabelas_alteradas"
+
+# Tentativas de subir o contador logo após o commit
+BUMP_ATTEMPTS = 3
+
+# Tabelas cujo contador não subiu (gravadas, mas com a versão antiga no banco)
+_pending: set = set()
+_pending_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+# Chamados após o commit com o conjunto de tabelas alteradas no processo
+_listeners: List[Callable[[set], None]] = []
+
+
+def on_change(listener: Callable[[set], None]) -> Callable[[set], None]:
+    _listeners.append(listener)
+    return listener
+
+
+def seed(conn: Connection) -> None:
+    table = models.TableVersion.__table__
+    existing = set(conn.execute(select(table.c.tabela)).scalars())
+    counters = sorted(set(VERSIONED_TABLES.values()))
+    missing = [{"tabela": name, "versao": 0} for name in counters if name not in existing]
+    if missing:
+        conn.execute(table.insert(), missing)
+
+
+def _bump_statement():
+    table = models.TableVersion.__table__
+    return (
+        update(table)
+        .where(table.c.tabela == bindparam("b_tabela"))
+        .values(versao=table.c.versao + 1, atualizado_em=bindparam("b_agora"))
+    )
+
+
+def bump(db: Session, *tables: str) -> None:
+    # Só anota a tabela na sessão; o contador sobe no commit (ver _notify)
+    touched = db.info.setdefault(_TOUCHED, set())
+    touched.update(VERSIONED_TABLES[name] for name in tables if name in VERSIONED_TABLES)
+
+
+def _increment(bind, tables: List[str]) -> None:
+    params = [{"b_tabela": name, "b_agora": datetime.utcnow()} for name in tables]
+    if isinstance(bind, Connection):
+        bind.execute(_bump_statement(), params)
+    else:
+        with bind.begin() as conn:
+            conn.execute(_bump_statement(), params)
+
+
+def _publish(bind, tables: set, tentativas: int = BUMP_ATTEMPTS) -> bool:
+    # Sobe os contadores de `tables` e dos pendentes; se falhar, ficam pendentes
+    with _pending_lock:
+        tables = tables | _pending
+        _pending.clear()
+    for tentativa in range(1, tentativas + 1):
+        try:
+            _increment(bind, sorted(tables))
+            return True
+        except Exception:
+            if tentativa == tentativas:
+                logger.exception("Falha ao atualizar versoes_tabelas: %s", sorted(tables))
+            else:
+                time.sleep(0.05 * tentativa)
+    with _pending_lock:
+        _pending.update(tables)
+    return False
+
+
+def pending(tables: Iterable[str]) -> set:
+    # Tabelas (entre `tables`) com a versão no banco desatualizada
+    return _pending.intersection(tables)
+
+
+def current(db: Session, tables: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    if _pending:
+        # Uma tentativa só: a leitura não espera o banco voltar
+        _publish(db.get_bind(), set(), tentativas=1)
+    table = models.TableVersion.__table__
+    tables = list(tables)
+    rows = db.execute(
+        select(table.c.tabela, table.c.versao, table.c.atualizado_em).where(table.c.tabela.in_(tables))
+    ).all()
+    found = {tabela: (versao, atualizado_em) for tabela, versao, atualizado_em in rows}
+    return {name: found.get(name, (0, None)) for name in tables}
+
+
+@event.listens_for(Session, "after_flush")
+def _count_changes(session: Session, flush_context) -> None:
+    touched = set()
+    for obj in session.new | session.deleted:
+        touched.add(getattr(obj, "__tablename__", None))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            touched.add(getattr(obj, "__tablename__", None))
+    bump(session, *sorted(name for name in touched if name))
+
+
+@event.listens_for(Session, "after_commit")
+def _notify(session: Session) -> None:
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        # Os dados já foram gravados: não falha a requisição por causa do contador
+        _publish(session.get_bind(), touched)
+        for listener in _listeners:
+            listener(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_TOUCHED, None)
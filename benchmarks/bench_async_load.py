@@ -0,0 +1,91 @@
+# Requisições/s e latência com 200 conexões simultâneas, com o banco síncrono
+# (threadpool) e com DB_ASYNC=true (AsyncEngine). Sobe um uvicorn para cada
+# modo sobre o mesmo banco SQLite de teste. Requer httpx.
+#
+#   python benchmarks/bench_async_load.py --concurrency 200 --duration 15
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, print_table
+
+ENDPOINTS = ["/clients/?limit=50", "/sales/?limit=20", "/sales/1"]
+
+
+async def wait_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/openapi.json")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("servidor não respondeu")
+
+
+async def load(base_url, concurrency, duration):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker(n):
+            nonlocal errors
+            i = n
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(ENDPOINTS[i % len(ENDPOINTS)])
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except httpx.HTTPError:
+                    errors += 1
+                i += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0
+    return len(latencies) / duration, pct(0.5), pct(0.99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=int, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    engine, _, path = make_session()
+    seed_products(engine, 500)
+    seed_receivables(engine, 2000, 50000)
+    seed_sale_items(engine, 50000, 500)
+    engine.dispose()
+
+    results = []
+    for mode in ("false", "true"):
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}", DB_ASYNC=mode, DEBUG="false")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run(wait_ready(base_url))
+            rps, p50, p99, errors = asyncio.run(load(base_url, args.concurrency, args.duration))
+            results.append((f"DB_ASYNC={mode}", f"{rps:.0f}", f"{p50:.1f}", f"{p99:.1f}", errors))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(("modo", "req/s", "p50 ms", "p99 ms", "erros"), results)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Latência de gravação de uma venda por tamanho de carrinho: fluxo antigo
+# (uma consulta por produto, dois commits) contra app.services.sales
+# (uma consulta IN, executemany e um commit).
+#
+#   python benchmarks/bench_cart_size.py --sizes 10 50 200 500
+import argparse
+import os
+import random
+from decimal import Decimal
+
+from common import make_session, seed_products, timer, print_table
+
+from app import models, schemas
+from app.core.profiling import count_queries
+from app.services import sales as sale_service
+
+
+def legacy_create_sale(db, sale_in):
+    items_data = sale_in.itens
+    sale_data = sale_in.dict(exclude={"itens", "valor_entrada"})
+    total_calculado = 0
+    itens_processados = []
+    for item in items_data:
+        product = db.query(models.Product).filter(models.Product.id_produto == item.id_produto).first()
+        v_unitario = item.valor_unitario if item.valor_unitario is not None else product.preco_venda
+        subtotal = item.qtde * v_unitario
+        total_calculado += subtotal
+        itens_processados.append({"id_produto": item.id_produto, "qtde": item.qtde, "valor_unitario": v_unitario, "subtotal": subtotal})
+    sale_data["valor_total"] = sale_data.get("valor_total") or total_calculado
+    sale = models.Sale(**sale_data)
+    db.add(sale)
+    db.commit()
+    db.refresh(sale)
+    for item_data in itens_processados:
+        db.add(models.SaleItem(id_vendas=sale.id_vendas, **item_data))
+    db.add(models.SalePayment(id_vendas=sale.id_vendas, valor_pago=sale.valor_total, forma_pagamento=sale.forma_pagamento))
+    db.commit()
+    db.refresh(sale)
+    return sale
+
+
+def bulk_create_sale(db, sale_in):
+    prices = sale_service.fetch_prices(db, [item.id_produto for item in sale_in.itens])
+    itens_processados, total_calculado, _ = sale_service.price_items(sale_in.itens, prices)
+    sale = sale_service.add_sale(db, sale_in, itens_processados, total_calculado)
+    db.commit()
+    return sale
+
+
+def make_cart(size, n_products, rnd):
+    return schemas.SaleCreate(
+        status_pagamento=models.StatusPagamento.pago,
+        forma_pagamento=models.FormaPagamento.dinheiro,
+        itens=[schemas.SaleItemCreate(id_produto=rnd.randint(1, n_products), qtde=Decimal(rnd.randint(1, 3))) for _ in range(size)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, SessionLocal, path = make_session()
+    seed_products(engine, args.products)
+    rnd = random.Random(7)
+
+    results = []
+    for size in args.sizes:
+        row = [size]
+        for fn in (legacy_create_sale, bulk_create_sale):
+            total_ms, total_queries = 0.0, 0
+            for _ in range(args.repeat):
+                cart = make_cart(size, args.products, rnd)
+                db = SessionLocal()
+                try:
+                    with count_queries(engine) as counter, timer() as t:
+                        fn(db, cart)
+                finally:
+                    db.close()
+                total_ms += t["ms"]
+                total_queries += counter.count
+            row += [total_queries // args.repeat, f"{total_ms / args.repeat:.1f}"]
+        results.append(row)
+
+    print_table(("itens", "antigo queries", "antigo ms", "bulk queries", "bulk ms"), results)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
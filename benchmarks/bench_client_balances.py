@@ -0,0 +1,60 @@
+# Compara o cálculo de saldo devedor dos clientes: laço por cliente (antigo)
+# contra a consulta agregada de app.services.receivables.
+#
+#   python benchmarks/bench_client_balances.py --clients 10000 --sales 500000
+import argparse
+import os
+
+from common import make_session, seed_receivables, timer, print_table
+
+from app import models
+from app.core.profiling import count_queries
+from app.services import receivables
+
+
+def legacy_balances(db, clients):
+    balances = {}
+    for client in clients:
+        sales = db.query(models.Sale).filter(
+            models.Sale.id_cliente == client.id_cliente,
+            models.Sale.status_pagamento != models.StatusPagamento.pago
+        ).all()
+        total_debt = 0
+        for sale in sales:
+            total_paid = sum([p.valor_pago for p in sale.pagamentos])
+            total_debt += (sale.valor_total - total_paid)
+        balances[client.id_cliente] = total_debt
+    return balances
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--sales", type=int, default=500000)
+    parser.add_argument("--page", type=int, default=100, help="clientes por página (limit de read_clients)")
+    args = parser.parse_args()
+
+    engine, SessionLocal, path = make_session()
+    print(f"Populando {args.clients} clientes e {args.sales} vendas em {path} ...")
+    seed_receivables(engine, args.clients, args.sales)
+
+    results = []
+    for label, fn in (
+        ("laço por cliente", legacy_balances),
+        ("consulta agregada", lambda db, cs: receivables.get_client_balances(db, [c.id_cliente for c in cs])),
+    ):
+        db = SessionLocal()
+        try:
+            clients = db.query(models.Client).limit(args.page).all()
+            with count_queries(engine) as counter, timer() as t:
+                balances = fn(db, clients)
+            results.append((label, counter.count, f"{t['ms']:.1f}", f"{sum(balances.values()):.2f}"))
+        finally:
+            db.close()
+
+    print_table(("estratégia", "queries", "ms", "saldo total"), results)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
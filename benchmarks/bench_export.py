@@ -0,0 +1,72 @@
+# Exportação de vendas (GET /exports): tempo até o primeiro byte, tempo total e
+# pico de memória Python do CSV em lotes (yield_per) contra carregar todas as
+# linhas com .all() antes de escrever.
+#
+#   python benchmarks/bench_export.py --sales 1000000
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+# A exportação abre a própria sessão (app.core.database): aponta para o banco do benchmark
+fd, PATH = tempfile.mkstemp(suffix=".db", prefix="meu-caixa-bench-")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{PATH}"
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, print_table
+
+from app.services import exports
+
+
+def run(label, chunks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first, size = None, 0
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (label, f"{first * 1000:.0f}", f"{total:.1f}", f"{peak / 2**20:.1f}", f"{size / 2**20:.1f}")
+
+
+def load_all(SessionLocal, dataset):
+    # Como seria sem streaming: todas as linhas em memória, depois o arquivo inteiro
+    db = SessionLocal()
+    try:
+        rows = db.execute(exports.DATASETS[dataset](None, None)).all()
+    finally:
+        db.close()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([exports._csv_value(value) for value in row] for row in rows)
+    yield buffer.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=1000000)
+    args = parser.parse_args()
+
+    engine, SessionLocal, path = make_session(PATH)
+    print(f"Populando {args.sales} vendas em {path} ...")
+    seed_products(engine, 500)
+    seed_receivables(engine, 5000, args.sales)
+    seed_sale_items(engine, args.sales, 500)
+
+    results = []
+    for dataset in ("vendas", "venda_itens"):
+        results.append(run(f"{dataset} .all()", load_all(SessionLocal, dataset)))
+        results.append(run(f"{dataset} yield_per", exports.stream_csv(dataset, None, None)))
+
+    print_table(("exportação CSV", "1º byte ms", "total s", "pico MB", "arquivo MB"), results)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Importação de produtos por CSV (POST /imports/produtos): primeira carga
+# (inserts, categorias pelo nome) e reimportação do mesmo arquivo (updates),
+# com o índice FTS5 da busca mantido pelos triggers.
+#
+#   python benchmarks/bench_import.py --rows 100000
+import argparse
+import io
+import os
+import random
+
+from common import make_session, timer, print_table
+
+from app.services import imports, search
+
+WORDS = ["Pão", "Água", "Açúcar", "Café", "Feijão", "Maçã", "Limão", "Óleo", "Queijo", "Presunto"]
+
+
+def make_csv(n_rows, n_categories, seed=42):
+    rnd = random.Random(seed)
+    lines = ["nome;categoria;preco_custo;preco_venda"]
+    for i in range(1, n_rows + 1):
+        custo = rnd.uniform(1, 50)
+        lines.append(
+            f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i};Categoria {rnd.randint(1, n_categories)};"
+            f"{custo:.2f}".replace(".", ",") + f";{custo * 1.6:.2f}".replace(".", ",")
+        )
+    # Algumas linhas inválidas, para o relatório
+    lines += ["Sem preço;Categoria 1;1;", "Preço inválido;Categoria 1;1;abc"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    content = make_csv(args.rows, args.categories)
+    engine, SessionLocal, path = make_session()
+    # Com os triggers da busca textual, como no banco da aplicação
+    with engine.begin() as conn:
+        search.BACKENDS["fts5"].install(conn)
+    results = []
+    for label in ("primeira carga", "reimportação (updates)"):
+        db = SessionLocal()
+        try:
+            with timer() as t:
+                report = imports.import_csv(db, "produtos", io.StringIO(content, newline=""), args.chunk_size)
+        finally:
+            db.close()
+        results.append((
+            label, report["inseridos"], report["atualizados"], report["erros"],
+            f"{t['ms'] / 1000:.2f}", f"{report['linhas'] / (t['ms'] / 1000):.0f}",
+        ))
+
+    print_table(("passada", "inseridos", "atualizados", "erros", "segundos", "linhas/s"), results)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Latência das rotas de vendas enquanto vários caixas fazem login ao mesmo tempo
+# (troca de turno). Mede o p99 de /sales/ sem logins e durante a "tempestade",
+# com o bcrypt em pool de processos e em pool de threads. Requer httpx.
+#
+#   python benchmarks/bench_login_storm.py --cashiers 50 --rounds 12 --duration 10
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from passlib.context import CryptContext
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, bulk_insert, print_table
+from app import models
+
+SALES_ENDPOINTS = ["/sales/?limit=20", "/sales/1", "/clients/?limit=50"]
+
+
+async def wait_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/openapi.json")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("servidor não respondeu")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+
+async def run_phase(base_url, readers, cashiers, duration):
+    sales_latencies, logins, rejected = [], [], 0
+    limits = httpx.Limits(max_connections=readers + cashiers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        deadline = time.monotonic() + duration
+
+        async def reader(n):
+            i = n
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.get(SALES_ENDPOINTS[i % len(SALES_ENDPOINTS)])
+                response.raise_for_status()
+                sales_latencies.append((time.perf_counter() - start) * 1000)
+                i += 1
+
+        async def cashier(n):
+            nonlocal rejected
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/login/access-token", data={"username": f"caixa{n}@loja.com", "password": "senha123"}
+                )
+                if response.status_code == 429:
+                    rejected += 1
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+                    continue
+                response.raise_for_status()
+                logins.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(
+            *(reader(n) for n in range(readers)), *(cashier(n) for n in range(cashiers))
+        )
+    return sales_latencies, logins, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cashiers", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--duration", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    engine, _, path = make_session()
+    seed_products(engine, 500)
+    seed_receivables(engine, 2000, 20000)
+    seed_sale_items(engine, 20000, 500)
+    senha = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds).hash("senha123")
+    bulk_insert(engine, models.User, [
+        {"nome": f"Caixa {n}", "email": f"caixa{n}@loja.com", "senha": senha} for n in range(args.cashiers)
+    ])
+    engine.dispose()
+
+    results = []
+    for workers in ("2", "0"):
+        env = dict(
+            os.environ, DATABASE_URL=f"sqlite:///{path}", DEBUG="false",
+            BCRYPT_ROUNDS=str(args.rounds), PASSWORD_HASH_WORKERS=workers,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run(wait_ready(base_url))
+            label = f"PASSWORD_HASH_WORKERS={workers}"
+            for phase, cashiers in (("sem logins", 0), ("troca de turno", args.cashiers)):
+                sales, logins, rejected = asyncio.run(run_phase(base_url, args.readers, cashiers, args.duration))
+                results.append((
+                    label, phase,
+                    f"{percentile(sales, 0.5):.1f}", f"{percentile(sales, 0.99):.1f}",
+                    len(logins), f"{percentile(logins, 0.99):.0f}", rejected,
+                ))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(
+        ("modo", "fase", "vendas p50 ms", "vendas p99 ms", "logins", "login p99 ms", "429"), results
+    )
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Vendas por produto e categoria (GET /reports/products): laço em Python sobre
+# as linhas de venda_itens contra a consulta agrupada em resumo_dia_produto +
+# cálculo em colunas com NumPy (margem, curva ABC, crescimento, categorias).
+#
+#   python benchmarks/bench_product_sales.py --items 5000000
+import argparse
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, timer, print_table
+
+from sqlalchemy import select
+
+from app import models
+from app.services import product_analytics, rollups
+
+Sale, SaleItem, Product = models.Sale, models.SaleItem, models.Product
+
+
+def python_loop(db, anterior_inicio, inicio, fim):
+    # Uma linha por item do período atual e do anterior, somadas em dicionários
+    rows = db.execute(
+        select(Sale.data_venda, SaleItem.id_produto, SaleItem.qtde, SaleItem.subtotal, Product.id_categoria, Product.preco_custo)
+        .join(Sale, Sale.id_vendas == SaleItem.id_vendas)
+        .join(Product, Product.id_produto == SaleItem.id_produto)
+        .where(Sale.data_venda >= anterior_inicio, Sale.data_venda < fim + timedelta(days=1))
+    )
+    inicio = datetime.combine(inicio, datetime.min.time())
+    produtos = defaultdict(lambda: {"qtde": Decimal(0), "valor": Decimal(0), "custo": Decimal(0), "anterior": Decimal(0)})
+    categorias = defaultdict(lambda: {"valor": Decimal(0), "custo": Decimal(0), "anterior": Decimal(0)})
+    for data_venda, id_produto, qtde, subtotal, id_categoria, preco_custo in rows:
+        produto, categoria = produtos[id_produto], categorias[id_categoria]
+        if data_venda >= inicio:
+            custo = qtde * (preco_custo or 0)
+            produto["qtde"] += qtde
+            produto["valor"] += subtotal
+            produto["custo"] += custo
+            categoria["valor"] += subtotal
+            categoria["custo"] += custo
+        else:
+            produto["anterior"] += subtotal
+            categoria["anterior"] += subtotal
+
+    total = sum(produto["valor"] for produto in produtos.values())
+    acumulado = Decimal(0)
+    for id_produto, produto in sorted(produtos.items(), key=lambda item: -item[1]["valor"]):
+        antes = acumulado / total * 100 if total else 100
+        produto["classe_abc"] = "A" if antes < 80 else "B" if antes < 95 else "C"
+        produto["margem"] = produto["valor"] - produto["custo"]
+        produto["crescimento"] = (produto["valor"] - produto["anterior"]) / produto["anterior"] if produto["anterior"] else None
+        acumulado += produto["valor"]
+    return produtos, categorias
+
+
+def best_of(fn, runs):
+    best = None
+    for _ in range(runs):
+        with timer() as t:
+            fn()
+        best = t["ms"] if best is None else min(best, t["ms"])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5000000)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    n_sales = args.items // 3
+    engine, SessionLocal, path = make_session()
+    print(f"Populando {n_sales} vendas ({n_sales * 3} itens) em {path} ...")
+    seed_products(engine, args.products)
+    seed_receivables(engine, args.clients, n_sales)
+    seed_sale_items(engine, n_sales, args.products)
+
+    # Período de `--days` dias terminando na última venda (antes de hoje) e o anterior
+    ultima = (datetime(2020, 1, 1) + timedelta(minutes=5 * n_sales)).date()
+    fim = min(ultima, date.today() - timedelta(days=1))
+    inicio = fim - timedelta(days=args.days - 1)
+    anterior_inicio = inicio - timedelta(days=args.days)
+
+    db = SessionLocal()
+    try:
+        with timer() as build:
+            rollups.rebuild(db)
+            db.commit()
+
+        loop_ms = best_of(lambda: python_loop(db, anterior_inicio, inicio, fim), 1)
+        fetch_ms = best_of(lambda: product_analytics._fetch(db, anterior_inicio, inicio, fim), args.runs)
+        report_ms = best_of(lambda: product_analytics.product_sales(db, inicio, fim), args.runs)
+        report = product_analytics.product_sales(db, inicio, fim)
+    finally:
+        db.close()
+
+    print(f"período {inicio} a {fim} (anterior desde {anterior_inicio}); resumos montados em {build['ms'] / 1000:.1f} s")
+    print_table(("estratégia", "ms"), [
+        ("laço Python sobre venda_itens", f"{loop_ms:.1f}"),
+        ("resumos: consulta agrupada", f"{fetch_ms:.1f}"),
+        ("resumos + NumPy (relatório completo)", f"{report_ms:.1f}"),
+    ])
+    classes = defaultdict(int)
+    for produto in report["produtos"]:
+        classes[produto["classe_abc"]] += 1
+    print(f"{len(report['produtos'])} produtos ({dict(sorted(classes.items()))}), {len(report['categorias'])} categorias")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
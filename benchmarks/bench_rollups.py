@@ -0,0 +1,102 @@
+# Relatórios de vendas (GET /reports): GROUP BY sobre vendas, venda_itens e
+# venda_pagamentos inteiros contra a leitura dos resumos (resumo_dia_forma,
+# resumo_dia_produto, resumo_mes_cliente) + o dia/mês corrente das tabelas.
+# Mede também a reconstrução completa e o custo de manter os resumos por venda.
+#
+#   python benchmarks/bench_rollups.py --sales 1000000
+import argparse
+import os
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, timer, print_table
+
+from sqlalchemy import func, select
+
+from app import models
+from app.services import rollups
+from app.services.periods import period_bucket
+
+Sale, SaleItem, SalePayment = models.Sale, models.SaleItem, models.SalePayment
+
+
+def raw_receipts(db):
+    return db.execute(
+        select(SalePayment.forma_pagamento, func.count(), func.sum(SalePayment.valor_pago))
+        .group_by(SalePayment.forma_pagamento)
+    ).all()
+
+
+def raw_monthly(db):
+    mes = period_bucket(db, Sale.data_venda, "mes")
+    return db.execute(select(mes, func.count(), func.sum(Sale.valor_total)).group_by(mes).order_by(mes)).all()
+
+
+def raw_top_products(db):
+    valor = func.sum(SaleItem.subtotal)
+    return db.execute(
+        select(SaleItem.id_produto, func.sum(SaleItem.qtde), valor)
+        .group_by(SaleItem.id_produto)
+        .order_by(valor.desc())
+        .limit(20)
+    ).all()
+
+
+def best_of(fn, runs):
+    best = None
+    for _ in range(runs):
+        with timer() as t:
+            fn()
+        best = t["ms"] if best is None else min(best, t["ms"])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=1000000)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, SessionLocal, path = make_session()
+    print(f"Populando {args.sales} vendas em {path} ...")
+    seed_products(engine, args.products)
+    seed_receivables(engine, args.clients, args.sales)
+    seed_sale_items(engine, args.sales, args.products)
+
+    db = SessionLocal()
+    try:
+        with timer() as build:
+            counts = rollups.rebuild(db)
+            db.commit()
+
+        reports = [
+            ("recebimentos por forma", raw_receipts, lambda db: rollups.receipts(db, agrupamento="mes")),
+            ("faturamento mensal", raw_monthly, rollups.monthly_revenue),
+            ("produtos mais vendidos", raw_top_products, rollups.top_products),
+        ]
+        results = []
+        for label, raw, rollup in reports:
+            results.append((
+                label,
+                f"{best_of(lambda: raw(db), args.runs):.1f}",
+                f"{best_of(lambda: rollup(db), args.runs):.1f}",
+            ))
+
+        # Manutenção incremental: subtrai e soma de novo cada venda (sem commit)
+        sample = list(range(1, min(args.sales, 1000) + 1))
+        with timer() as upkeep:
+            for id_venda in sample:
+                rollups.sales_changed(db, [id_venda], -1)
+                rollups.sales_changed(db, [id_venda])
+        db.rollback()
+    finally:
+        db.close()
+
+    print_table(("relatório", "tabelas ms", "resumos ms"), results)
+    print(f"reconstrução completa: {build['ms'] / 1000:.1f} s ({', '.join(f'{k}: {v}' for k, v in counts.items())})")
+    print(f"manutenção por venda (retirar + somar): {upkeep['ms'] / len(sample) / 2:.2f} ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
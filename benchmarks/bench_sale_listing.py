@@ -0,0 +1,58 @@
+# Quantidade de consultas para listar e serializar vendas (itens -> produto ->
+# categoria, pagamentos) com carregamento preguiçoso e com as opções de
+# app.services.loading.
+#
+#   python benchmarks/bench_sale_listing.py --limit 100
+import argparse
+import os
+
+from common import make_session, seed_products, seed_receivables, seed_sale_items, timer, print_table
+
+from app import models, schemas
+from app.core.profiling import assert_max_queries, count_queries
+from app.services import loading
+
+
+def list_sales(db, limit, eager):
+    query = db.query(models.Sale)
+    if eager:
+        query = loading.load_for(query, schemas.Sale)
+    sales = query.order_by(models.Sale.id_vendas).limit(limit).all()
+    return [schemas.Sale.model_validate(sale) for sale in sales]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    engine, SessionLocal, path = make_session()
+    seed_products(engine, args.products)
+    seed_receivables(engine, 200, args.sales)
+    seed_sale_items(engine, args.sales, args.products)
+
+    results = []
+    for label, eager in (("lazy", False), ("eager (loading.load_for)", True)):
+        db = SessionLocal()
+        try:
+            with count_queries(engine) as counter, timer() as t:
+                list_sales(db, args.limit, eager)
+            results.append((label, counter.count, f"{t['ms']:.1f}"))
+        finally:
+            db.close()
+    print_table(("estratégia", "queries", "ms"), results)
+
+    # A listagem com eager loading não pode depender do tamanho da página
+    db = SessionLocal()
+    try:
+        with assert_max_queries(engine, 4):
+            list_sales(db, args.limit, eager=True)
+    finally:
+        db.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
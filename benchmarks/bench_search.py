@@ -0,0 +1,110 @@
+# Busca textual por trechos (GET /search): LIKE '%trecho%' sem índice contra o
+# FTS5 com tokenizer trigram, em clientes (nome/telefone/email) e produtos.
+# Mede também a construção do índice e o custo dos triggers nas inserções.
+#
+#   python benchmarks/bench_search.py --rows 1000000
+import argparse
+import os
+import random
+import time
+
+from common import bulk_insert, make_session, timer, print_table
+
+from app import models
+from app.core.text import search_key
+from app.services import search
+
+WORDS = [
+    "Pão", "Água", "Açúcar", "Café", "Feijão", "Maçã", "Limão", "Óleo", "Queijo", "Presunto",
+    "Refrigerante", "Sabão", "Biscoito", "Macarrão", "Farinha", "Leite", "Manteiga", "Cebola",
+]
+FIRST = ["José", "João", "Antônio", "Márcia", "Lúcia", "Conceição", "Sebastião", "Inês", "André", "Luís"]
+LAST = ["Silva", "Souza", "Conceição", "Araújo", "Gonçalves", "Simões", "Patrício", "Estêvão", "Brandão"]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def client_rows(rnd, start, n):
+    return [
+        {
+            "id_cliente": i,
+            "nome": f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {rnd.choice(LAST)}",
+            "telefone": f"({rnd.randint(11, 99)}) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+            "email": f"cliente{i}@exemplo.com.br",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def fragment(rnd):
+    # Trecho do meio de uma palavra, como o caixa digita
+    kind = rnd.random()
+    if kind < 0.4:
+        word = search_key(rnd.choice(FIRST + LAST))
+    elif kind < 0.8:
+        word = search_key(rnd.choice(WORDS))
+    else:
+        return str(rnd.randint(1000, 9999))
+    size = rnd.randint(3, min(6, len(word)))
+    start = rnd.randint(0, len(word) - size)
+    return word[start:start + size]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    engine, SessionLocal, path = make_session()
+    print(f"Populando {args.rows} clientes e {args.rows} produtos em {path} ...")
+    bulk_insert(engine, models.Category, [{"id_categoria": 1, "nome": "Geral"}])
+    bulk_insert(engine, models.Product, [
+        {"id_produto": i, "nome": f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i}", "id_categoria": 1, "preco_venda": 1}
+        for i in range(1, args.rows + 1)
+    ])
+    bulk_insert(engine, models.Client, client_rows(rnd, 1, args.rows))
+
+    fts = search.BACKENDS["fts5"]
+    with timer() as build:
+        with engine.begin() as conn:
+            fts.install(conn)
+
+    # Inserções com os triggers ativos (índice já populado)
+    extra = min(50000, args.rows)
+    start = time.perf_counter()
+    bulk_insert(engine, models.Client, client_rows(rnd, args.rows + 1, extra))
+    per_row_us = (time.perf_counter() - start) / extra * 1e6
+
+    queries = [[fragment(rnd) for _ in range(rnd.choice((1, 1, 2)))] for _ in range(args.queries)]
+    db = SessionLocal()
+    results = []
+    try:
+        for backend in (search.BACKENDS["like"], fts):
+            for table in search.INDEXED:
+                timings, hits = [], 0
+                for terms in queries:
+                    with timer() as t:
+                        hits += len(backend.search(db, table, terms, args.limit))
+                    timings.append(t["ms"])
+                results.append((
+                    backend.name, table,
+                    f"{percentile(timings, 0.5):.1f}", f"{percentile(timings, 0.99):.1f}",
+                    f"{hits / len(queries):.1f}",
+                ))
+    finally:
+        db.close()
+
+    print_table(("backend", "tabela", "p50 ms", "p99 ms", "resultados/consulta"), results)
+    print(f"construção do índice FTS5 ({fts.name}, trigram={fts.trigram}): {build['ms'] / 1000:.1f} s")
+    print(f"insert de cliente com triggers: {per_row_us:.0f} µs/linha")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
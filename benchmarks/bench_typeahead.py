@@ -0,0 +1,80 @@
+# Latência da busca por prefixo de nome (type-ahead do PDV): filtro em lista
+# (como o frontend fazia) contra o índice em memória do catálogo de produtos e
+# contra a faixa em clientes.nome_busca no banco.
+#
+#   python benchmarks/bench_typeahead.py --rows 100000
+import argparse
+import os
+import random
+
+from common import bulk_insert, make_session, timer, print_table
+
+from app import models
+from app.core.text import search_key
+from app.services import catalog, receivables
+
+WORDS = [
+    "Pão", "Água", "Açúcar", "Café", "Feijão", "Maçã", "Limão", "Óleo", "Queijo", "Presunto",
+    "Refrigerante", "Sabão", "Biscoito", "Macarrão", "Farinha", "Leite", "Manteiga", "Cebola",
+]
+NAMES = ["José", "João", "Antônio", "Márcia", "Lúcia", "Conceição", "Sebastião", "Inês", "André", "Luís"]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    engine, SessionLocal, path = make_session()
+    print(f"Populando {args.rows} produtos e {args.rows} clientes em {path} ...")
+    bulk_insert(engine, models.Category, [{"id_categoria": 1, "nome": "Geral"}])
+    bulk_insert(engine, models.Product, [
+        {"id_produto": i, "nome": f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i}", "id_categoria": 1, "preco_venda": 1}
+        for i in range(1, args.rows + 1)
+    ])
+    bulk_insert(engine, models.Client, [
+        {"id_cliente": i, "nome": f"{rnd.choice(NAMES)} {rnd.choice(NAMES)} {i}"}
+        for i in range(1, args.rows + 1)
+    ])
+
+    queries = [
+        rnd.choice(WORDS + NAMES)[: rnd.randint(2, 5)].lower().replace("ã", "a")
+        for _ in range(args.queries)
+    ]
+    db = SessionLocal()
+    try:
+        current = catalog.load_catalog(db)
+        scenarios = (
+            ("lista filtrada (frontend)", lambda q: [
+                p for p in current.product_rows if q in p["nome"].lower()
+            ][:10]),
+            ("catálogo em memória (bisect)", lambda q: current.find_products(nome=q)[:10]),
+            ("clientes.nome_busca no banco", lambda q: receivables.filter_clients(
+                db.query(models.Client), nome=q
+            ).order_by(models.Client.id_cliente).limit(10).all()),
+        )
+        results = []
+        for label, fn in scenarios:
+            timings = []
+            for q in queries:
+                with timer() as t:
+                    fn(q)
+                timings.append(t["ms"])
+            results.append((label, f"{percentile(timings, 0.5):.2f}", f"{percentile(timings, 0.99):.2f}"))
+    finally:
+        db.close()
+
+    print_table(("busca", "p50 ms", "p99 ms"), results)
+    print(f"exemplo: {queries[0]!r} -> chave {search_key(queries[0])!r}")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app import models
+
+
+def make_session(path=None):
+    # Banco SQLite descartável, separado do banco configurado no .env
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="meu-caixa-bench-")
+        os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine), path
+
+
+def chunked(rows, size=50000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def bulk_insert(engine, model, rows):
+    with engine.begin() as conn:
+        for chunk in chunked(rows):
+            conn.execute(insert(model), chunk)
+
+
+def seed_products(engine, n_products, seed=42):
+    rnd = random.Random(seed)
+    bulk_insert(engine, models.Category, [{"id_categoria": i, "nome": f"Categoria {i}"} for i in range(1, 21)])
+    bulk_insert(engine, models.Product, [
+        {
+            "id_produto": i,
+            "nome": f"Produto {i}",
+            "id_categoria": rnd.randint(1, 20),
+            "preco_custo": round(rnd.uniform(1, 50), 2),
+            "preco_venda": round(rnd.uniform(51, 100), 2),
+        }
+        for i in range(1, n_products + 1)
+    ])
+
+
+def seed_receivables(engine, n_clients, n_sales, seed=42):
+    # Clientes, vendas e pagamentos com a mesma distribuição de status do balcão:
+    # um terço pago, um terço parcial e um terço pendente.
+    rnd = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    bulk_insert(engine, models.Client, [
+        {"id_cliente": i, "nome": f"Cliente {i}", "telefone": f"{i:010d}", "limite_credito": 500}
+        for i in range(1, n_clients + 1)
+    ])
+
+    sales, payments = [], []
+    for id_venda in range(1, n_sales + 1):
+        total = round(rnd.uniform(5, 300), 2)
+        status = rnd.choice(list(models.StatusPagamento))
+        sales.append({
+            "id_vendas": id_venda,
+            "id_cliente": rnd.randint(1, n_clients),
+            "data_venda": start + timedelta(minutes=5 * id_venda),
+            "status_pagamento": status,
+            "forma_pagamento": rnd.choice(list(models.FormaPagamento)),
+            "valor_total": total,
+        })
+        if status == models.StatusPagamento.pago:
+            paid = total
+        elif status == models.StatusPagamento.parcial:
+            paid = round(total / 2, 2)
+        else:
+            continue
+        payments.append({
+            "id_vendas": id_venda,
+            "data_pagamento": start + timedelta(minutes=5 * id_venda + 1),
+            "valor_pago": paid,
+            "forma_pagamento": rnd.choice(list(models.FormaPagamento)),
+        })
+
+    bulk_insert(engine, models.Sale, sales)
+    bulk_insert(engine, models.SalePayment, payments)
+
+
+@contextmanager
+def timer():
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["ms"] = (time.perf_counter() - start) * 1000
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
+
+
+def seed_sale_items(engine, n_sales, n_products, items_per_sale=3, seed=42):
+    # Grava em lotes para não manter milhões de itens em memória
+    rnd = random.Random(seed)
+    items = []
+    for id_venda in range(1, n_sales + 1):
+        if len(items) >= 50000:
+            bulk_insert(engine, models.SaleItem, items)
+            items = []
+        for _ in range(items_per_sale):
+            qtde = rnd.randint(1, 5)
+            valor = round(rnd.uniform(1, 100), 2)
+            items.append({
+                "id_vendas": id_venda,
+                "id_produto": rnd.randint(1, n_products),
+                "qtde": qtde,
+                "valor_unitario": valor,
+                "subtotal": round(qtde * valor, 2),
+            })
+    bulk_insert(engine, models.SaleItem, items)
@@ -0,0 +1,194 @@
+import argparse
+import sys
+import os
+from datetime import date
+sys.path.append(os.getcwd())
+
+from app.core.database import Base, SessionLocal, engine
+from app.core import migrations
+from app.services import imports, query_plans, receivables, rollups, search, sync
+from app.services.scheduler import scheduler
+
+
+def migrate(args):
+    Base.metadata.create_all(bind=engine)
+    if args.status:
+        applied = migrations.applied_versions(engine)
+        for versao, nome, _ in migrations.MIGRATIONS:
+            print(f"{versao:04d} {'aplicada' if versao in applied else 'pendente':9} {nome}")
+        return 0
+    applied = migrations.run_migrations(engine)
+    for versao, nome in applied:
+        print(f"Aplicada {versao:04d}: {nome}")
+    print(f"{len(applied)} migração(ões) aplicada(s).")
+    return 0
+
+
+def check_indexes(args):
+    # Falha se algum caminho quente não usar o índice esperado (EXPLAIN)
+    failures = 0
+    for result in query_plans.check_hot_queries(engine):
+        status = "OK " if result["usa_indice"] else "FALHA"
+        print(f"[{status}] {result['consulta']} -> {result['indice']}")
+        if not result["usa_indice"] or args.verbose:
+            print("    " + result["plano"].replace("\n", "\n    "))
+        failures += not result["usa_indice"]
+    return 1 if failures else 0
+
+
+def reconcile_sales(args):
+    db = SessionLocal()
+    try:
+        drift = receivables.find_balance_drift(db)
+        for row in drift:
+            print(
+                f"Venda {row['id_vendas']}: pago gravado {row['valor_pago_total']} / real {row['valor_pago_real']}, "
+                f"saldo gravado {row['saldo_aberto']} / real {row['saldo_real']}"
+            )
+        print(f"{len(drift)} venda(s) com divergência.")
+        if drift and args.fix:
+            updated = receivables.reconcile_sale_balances(db)
+            print(f"Saldos recalculados para {updated} venda(s).")
+    finally:
+        db.close()
+    return 1 if drift and not args.fix else 0
+
+
+def prune_tombstones(args):
+    db = SessionLocal()
+    try:
+        removed = sync.prune_tombstones(db)
+    finally:
+        db.close()
+    print(f"{removed} exclusão(ões) antiga(s) removida(s).")
+    return 0
+
+
+def rebuild_search(args):
+    # Recria o índice da busca textual a partir das tabelas
+    with engine.begin() as conn:
+        backend = search.backend_for(conn)
+        backend.rebuild(conn)
+    print(f"Índice de busca ({backend.name}) reconstruído.")
+    return 0
+
+
+def import_csv(args):
+    db = SessionLocal()
+    try:
+        with open(args.arquivo, "rb") as binary:
+            report = imports.import_csv(db, args.entidade, imports.text_stream(binary), args.chunk_size)
+    finally:
+        db.close()
+    for erro in report["linhas_com_erro"]:
+        print(f"Linha {erro['linha']}: {'; '.join(erro['erros'])}")
+    print(
+        f"{report['linhas']} linha(s): {report['inseridos']} inserida(s), "
+        f"{report['atualizados']} atualizada(s), {report['erros']} com erro."
+    )
+    return 1 if report["erros"] else 0
+
+
+def rebuild_rollups(args):
+    # Recalcula os resumos de vendas a partir das vendas e pagamentos
+    desde = date.fromisoformat(args.desde) if args.desde else None
+    db = SessionLocal()
+    try:
+        counts = rollups.rebuild(db, desde)
+        db.commit()
+    finally:
+        db.close()
+    for tabela, linhas in counts.items():
+        print(f"{tabela}: {linhas} linha(s)")
+    return 0
+
+
+def check_rollups(args):
+    # Confere os resumos de vendas contra uma reconstrução a partir das tabelas
+    db = SessionLocal()
+    try:
+        drift = rollups.find_drift(db)
+        for row in drift:
+            chave, gravado, real = (
+                ", ".join(f"{k}={v}" for k, v in row[campo].items()) or "-" for campo in ("chave", "gravado", "real")
+            )
+            print(f"{row['tabela']} ({chave}): gravado {gravado} / real {real}")
+        print(f"{len(drift)} linha(s) de resumo com divergência.")
+        if drift and args.fix:
+            counts = rollups.rebuild(db)
+            db.commit()
+            print(f"Resumos reconstruídos ({', '.join(f'{k}: {v}' for k, v in counts.items())}).")
+    finally:
+        db.close()
+    return 1 if drift and not args.fix else 0
+
+
+def run_job(args):
+    # Executa agora uma tarefa agendada (respeita a concessão de outro worker)
+    Base.metadata.create_all(bind=engine)
+    run = scheduler.run(args.nome, force=True)
+    if run is None:
+        print(f"Tarefa {args.nome} em execução em outro worker.")
+        return 1
+    print(f"{args.nome}: {run['ultimo_status']} em {run['ultima_duracao_ms']} ms - {run['ultimo_resultado']}")
+    return 0 if run["ultimo_status"] == "ok" else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comandos de manutenção do Meu Caixa")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Aplica as migrações pendentes do banco")
+    migrate_parser.add_argument("--status", action="store_true", help="Apenas lista as migrações")
+    migrate_parser.set_defaults(func=migrate)
+
+    indexes = subparsers.add_parser(
+        "check-indexes",
+        help="Confere com EXPLAIN se as consultas de recebíveis usam os índices",
+    )
+    indexes.add_argument("--verbose", action="store_true", help="Mostra o plano de todas as consultas")
+    indexes.set_defaults(func=check_indexes)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-sales",
+        help="Compara valor_pago_total/saldo_aberto das vendas com venda_pagamentos",
+    )
+    reconcile.add_argument("--fix", action="store_true", help="Recalcula os saldos divergentes")
+    reconcile.set_defaults(func=reconcile_sales)
+
+    prune = subparsers.add_parser(
+        "prune-tombstones",
+        help="Remove registros de exclusão mais antigos que SYNC_TOMBSTONE_RETENTION_DAYS",
+    )
+    prune.set_defaults(func=prune_tombstones)
+
+    reindex = subparsers.add_parser("rebuild-search", help="Reconstrói o índice da busca textual")
+    reindex.set_defaults(func=rebuild_search)
+
+    importer = subparsers.add_parser("import-csv", help="Importa produtos, clientes ou fornecedores de um CSV")
+    importer.add_argument("entidade", choices=sorted(imports.SPECS))
+    importer.add_argument("arquivo")
+    importer.add_argument("--chunk-size", type=int, default=None, help="Linhas por transação")
+    importer.set_defaults(func=import_csv)
+
+    rollup = subparsers.add_parser("rebuild-rollups", help="Recalcula os resumos de vendas")
+    rollup.add_argument("--desde", help="Só a partir desta data (AAAA-MM-DD)")
+    rollup.set_defaults(func=rebuild_rollups)
+
+    check = subparsers.add_parser(
+        "check-rollups",
+        help="Confere os resumos de vendas contra as vendas e pagamentos",
+    )
+    check.add_argument("--fix", action="store_true", help="Reconstrói os resumos se houver divergência")
+    check.set_defaults(func=check_rollups)
+
+    job = subparsers.add_parser("run-job", help="Executa agora uma tarefa agendada")
+    job.add_argument("nome", choices=list(scheduler.jobs))
+    job.set_defaults(func=run_job)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()